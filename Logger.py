@@ -1,9 +1,128 @@
 import os
+import re
+import sys
 import json
 import csv
 import zipfile
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Iterator, Dict, Optional
+from operator import itemgetter
+from typing import Iterator, Dict, Optional, List
+
+from storage.columnar import ColumnarStore
+from storage.rollups import RollupStore
+
+INDEX_SUFFIX = ".idx"
+
+
+def _csv_records(f) -> Iterator[tuple]:
+    """
+    Iteruje po rekordach CSV z pliku otwartego binarnie (także członka ZIP).
+    Zwraca pary (wiersz, przesunięcie w bajtach za końcem rekordu).
+    """
+    position = f.tell()
+
+    def lines():
+        nonlocal position
+        for line in f:
+            position += len(line)
+            yield line.decode('utf-8')
+
+    for row in csv.reader(lines()):
+        yield row, position
+
+
+def _parse_row(row) -> Dict:
+    return {
+        "timestamp": datetime.fromisoformat(row[0]),
+        "sensor_id": row[1],
+        "value": float(row[2]),
+        "unit": row[3],
+        "level": row[4] if len(row) > 4 else "",
+        "message": row[5] if len(row) > 5 else ""
+    }
+
+
+def _is_data_row(row) -> bool:
+    return bool(row) and 'KONIEC SESJI' not in row[0]
+
+
+def _scan_rows(f, index: Optional[Dict], start: datetime, end: datetime,
+               sensor_id: Optional[str]) -> Iterator[Dict]:
+    """Filtruje wiersze pliku; z indeksem przeskakuje do punktu kontrolnego i kończy przed końcem pliku."""
+    every = None
+    checkpoint = 0
+    if index:
+        every = index["every"]
+        checkpoints = index["checkpoints"]
+        # Ostatni punkt, przed którym wszystkie wiersze są wcześniejsze niż start
+        for i, (_, before_max, _) in enumerate(checkpoints):
+            if before_max is not None and datetime.fromisoformat(before_max) >= start:
+                break
+            checkpoint = i
+        f.seek(checkpoints[checkpoint][0])
+        records = _csv_records(f)
+    else:
+        records = _csv_records(f)
+        next(records, None)  # pomiń nagłówek
+
+    row_number = checkpoint * every if every else 0
+    for row, _ in records:
+        if every and row_number % every == 0 and row_number // every > checkpoint:
+            after_min = checkpoints[row_number // every][2]
+            # Wszystkie dalsze wiersze są późniejsze niż koniec zakresu
+            if after_min is None or datetime.fromisoformat(after_min) > end:
+                return
+        row_number += 1
+        if not _is_data_row(row):
+            continue
+        entry = _parse_row(row)
+        if start <= entry["timestamp"] <= end:
+            if sensor_id is None or entry["sensor_id"] == sensor_id:
+                yield entry
+
+
+def _scan_archive(archive_path: str, index: Optional[Dict], start: datetime, end: datetime,
+                  sensor_id: Optional[str]) -> Iterator[Dict]:
+    try:
+        zipf = zipfile.ZipFile(archive_path, 'r')
+    except FileNotFoundError:
+        return  # usunięte przez retencję
+    with zipf:
+        for zipinfo in zipf.infolist():
+            if zipinfo.filename.endswith('.csv'):
+                member_index = index
+                if member_index and (member_index.get("member") != zipinfo.filename
+                                     or member_index["size"] != zipinfo.file_size):
+                    member_index = None
+                with zipf.open(zipinfo) as f:
+                    yield from _scan_rows(f, member_index, start, end, sensor_id)
+
+
+def _scan_file_task(path: str, inode: Optional[int], index: Optional[Dict], start: datetime, end: datetime,
+                    sensor_id: Optional[str]) -> Optional[List[Dict]]:
+    """
+    Zadanie procesu roboczego read_logs_parallel: filtruje jeden plik (CSV lub ZIP)
+    i zwraca wpisy posortowane po czasie. None - plik CSV zniknął lub został podmieniony.
+    """
+    if path.endswith('.zip'):
+        entries = list(_scan_archive(path, index, start, end, sensor_id))
+    else:
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            if os.fstat(f.fileno()).st_ino != inode:
+                return None
+            entries = list(_scan_rows(f, index, start, end, sensor_id))
+    entries.sort(key=itemgetter("timestamp"))
+    return entries
+
 
 class Logger:
     def __init__(self, config_path: str):
@@ -23,18 +142,90 @@ class Logger:
         self.max_size_mb = config["max_size_mb"]
         self.rotate_after_lines = config["rotate_after_lines"]
         self.retention_days = config["retention_days"]
+        # Co ile wierszy indeks czasowy zapisuje punkt kontrolny (przesunięcie w pliku)
+        self.index_every_rows = config.get("index_every_rows", 1000)
+        # Kompresja i czyszczenie archiwów w wątku w tle (rotacja nie blokuje log_reading)
+        self.async_archive = config.get("async_archive", True)
+        # Tryb współbieżny: producenci tylko wrzucają wiersze do kolejki, zapisuje jeden wątek
+        self.concurrent = config.get("concurrent", False)
+        # Polityka zapisu: bufor trafia do pliku po buffer_size wierszach lub najpóźniej
+        # po flush_interval_ms od pierwszego wiersza w buforze (0 - tylko po buffer_size);
+        # fsync_every_flushes > 0 wymusza fsync co tyle zapisów (oraz przy zamknięciu pliku)
+        self.flush_interval_ms = config.get("flush_interval_ms", 0)
+        self.fsync_every_flushes = config.get("fsync_every_flushes", 0)
 
         # Utwórz katalogi log_dir/ i log_dir/archive/ jeśli nie istnieją
         os.makedirs(self.log_dir, exist_ok=True)
         os.makedirs(os.path.join(self.log_dir, "archive"), exist_ok=True)
 
+        # Dodatkowe magazyny zapisywane obok CSV (write_rows / flush / remove_older_than)
+        self.backends = []
+        self.columnar = None
+        columnar = config.get("columnar")
+        if columnar:
+            self.columnar = ColumnarStore(
+                os.path.join(self.log_dir, "columnar"),
+                segment_rows=columnar.get("segment_rows", 65536),
+                compression_level=columnar.get("compression_level", 6)
+            )
+            self.backends.append(self.columnar)
+        # Agregaty 1 min / 1 h / 1 dzień per czujnik (read_aggregates), domyślnie wyłączone;
+        # wątek zapisu w tle utrwala je co flush_interval_ms (bez niego - co sekundę)
+        self.rollups = None
+        if config.get("rollups", False):
+            self.rollups = RollupStore(os.path.join(self.log_dir, "rollups"))
+            self.backends.append(self.rollups)
+
         # Inicjalizacja bufora i innych zmiennych pomocniczych
         self.buffer = []
         self.current_file = None
+        self.current_file_path = None
         self.current_lines = 0
         self.current_file_start_time = None
+        # Stan rotacji aktualizowany przy zapisie bufora - bez stat() i datetime.now() na każdy odczyt
+        self.current_size = 0
+        self._rotate_deadline = None  # time.monotonic(), po którym następuje rotacja czasowa
+
+        # Bufor, plik i rotacja są chronione blokadą; w trybie współbieżnym używa jej
+        # tylko wątek zapisujący (raz na partię wierszy z kolejki) oraz stop()
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._writer_thread = None
+
+        # Wątek zapisu w tle (gdy włączony flush_interval_ms lub fsync_every_flushes)
+        self._flusher_thread = None
+        self._flusher_running = False
+        self._flusher_wakeup = threading.Event()
+        self._first_buffered = None  # time.monotonic() pierwszego wiersza w buforze
+        self._flush_count = 0
+        self._fsync_due = False
+
+        # Archiwizacja: zamknięty plik jest przenoszony do archive/<nazwa archiwum>.csv,
+        # a wątek w tle pakuje go do <nazwa archiwum>.zip. Podmiana CSV -> ZIP oraz listowanie
+        # plików w read_logs odbywają się pod tą samą blokadą, więc odczyt widzi dokładnie jeden z nich.
+        self._archive_lock = threading.Lock()
+        self._archive_queue = queue.Queue()
+        self._archive_thread = None
+        # i-węzeł przeniesionego pliku -> (ścieżka w archive/, rozmiar, mtime_ns); wpis jest usuwany po
+        # spakowaniu, a gdy trwają odczyty z wcześniejszej migawki - dopiero po ich zakończeniu (_retired)
+        self._detached: Dict[int, tuple] = {}
+        self._readers = 0
+        self._retired: List[tuple] = []
+        self._recover_pending_archives()
 
     def start(self) -> None:
+        with self._lock:
+            self._open_current()
+        if self.concurrent and self._writer_thread is None:
+            self._writer_thread = threading.Thread(target=self._writer_loop, name="LogWriter", daemon=True)
+            self._writer_thread.start()
+        background = self.flush_interval_ms or self.fsync_every_flushes or self.rollups is not None
+        if background and self._flusher_thread is None:
+            self._flusher_running = True
+            self._flusher_thread = threading.Thread(target=self._flusher_loop, name="LogFlusher", daemon=True)
+            self._flusher_thread.start()
+
+    def _open_current(self) -> None:
         now = datetime.now()
         filename = now.strftime(self.filename_pattern)
         self.current_file_path = os.path.join(self.log_dir, filename)
@@ -59,20 +250,39 @@ class Logger:
             self.current_file.flush()
 
         self.current_file_start_time = now
+        self.current_size = os.fstat(self.current_file.fileno()).st_size
+        self._rotate_deadline = time.monotonic() + self.rotate_every_hours * 3600
 
     def stop(self) -> None:
         """
         Wymusza zapis bufora i zamyka bieżący plik.
+        Czeka też na zapis wierszy z kolejki (tryb współbieżny) i na archiwizację zleconą przy rotacji.
         """
+        if self._writer_thread is not None:
+            self._queue.put(None)  # wątek zapisujący kończy po opróżnieniu kolejki
+            self._writer_thread.join()
+            self._writer_thread = None
+        if self._flusher_thread is not None:
+            self._flusher_running = False
+            self._flusher_wakeup.set()
+            self._flusher_thread.join()
+            self._flusher_thread = None
+        with self._lock:
+            self._close_current()
+        self._archive_queue.join()
+
+    def _close_current(self) -> None:
         # Zapisz wszystkie dane z bufora
         if self.buffer:
-            self.csv_writer.writerows(self.buffer)
-            self.current_file.flush()
-            self.buffer.clear()
+            self._flush()
+        for backend in self.backends:
+            backend.flush()
         # Zamknij plik
         if self.current_file:
             self.current_file.write('----- KONIEC SESJI -----\n')
             self.current_file.flush()
+            if self.fsync_every_flushes:
+                os.fsync(self.current_file.fileno())
             self.current_file.close()
             self.current_file = None
 
@@ -85,91 +295,441 @@ class Logger:
             row[4] = additional_info.get("level", "")
             row[5] = additional_info.get("message", "")
 
+        if self.concurrent:
+            self._queue.put(row)
+            return
+        with self._lock:
+            self._append(row)
+
+    def log_readings(self, records: List[tuple]) -> None:
+        """
+        Konsument partii (register_batch_callback): dodaje krotki (sensor_id, timestamp, value, unit)
+        jednym przejęciem blokady lub jednym wpisem do kolejki trybu współbieżnego.
+        """
+        rows = []
+        last_timestamp = last_iso = None
+        for sensor_id, timestamp, value, unit in records:
+            if timestamp is not last_timestamp:  # partie mają zwykle wspólny znacznik czasu
+                last_timestamp, last_iso = timestamp, timestamp.isoformat()
+            rows.append([last_iso, sensor_id, value, unit, "", ""])
+        if not rows:
+            return
+
+        if self.concurrent:
+            self._queue.put(tuple(rows))
+            return
+        with self._lock:
+            for row in rows:
+                self._append(row)
+
+    def _append(self, row: list) -> None:
         self.buffer.append(row)
+        if len(self.buffer) == 1:
+            self._first_buffered = time.monotonic()
 
-        # Reszta metody bez zmian
         if len(self.buffer) >= self.buffer_size:
-            lines_to_add = len(self.buffer)
-            self.csv_writer.writerows(self.buffer)
-            self.current_file.flush()
-            self.current_lines += lines_to_add
-            self.buffer.clear()
+            # Z wątkiem zapisu w tle producent tylko go budzi; zapisuje sam dopiero,
+            # gdy bufor urósł kilkukrotnie ponad limit (wątek w tle nie nadąża)
+            if self._flusher_thread is None or self.concurrent or len(self.buffer) >= 4 * self.buffer_size:
+                self._flush()
+            elif len(self.buffer) == self.buffer_size:
+                self._flusher_wakeup.set()
 
         if self._should_rotate():
             print("[DEBUG] Rotacja!")
             self._rotate()
 
+    def _writer_loop(self) -> None:
+        """Wątek zapisujący trybu współbieżnego: pobiera wiersze z kolejki partiami."""
+        while True:
+            rows = [self._queue.get()]
+            try:
+                while len(rows) < self.buffer_size:
+                    rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            stopping = False
+            with self._lock:
+                for row in rows:
+                    if row is None:
+                        stopping = True
+                    elif type(row) is tuple:  # partia z log_readings
+                        for batch_row in row:
+                            self._append(batch_row)
+                    else:
+                        self._append(row)
+            if stopping:
+                return
+
+    def _flusher_loop(self) -> None:
+        """
+        Wątek zapisu w tle: zapisuje bufor po buffer_size wierszach lub po flush_interval_ms,
+        wykonuje zaległy fsync (poza blokadą) i rotację czasową także bez nowych odczytów
+        oraz utrwala agregaty (rollups) co flush_interval_ms.
+        """
+        interval = self.flush_interval_ms / 1000 if self.flush_interval_ms else None
+        persist_interval = interval or 1.0
+        next_persist = time.monotonic() + persist_interval
+        while self._flusher_running:
+            timeout = interval
+            first_buffered = self._first_buffered
+            if interval and self.buffer and first_buffered is not None:
+                timeout = max(0.0, first_buffered + interval - time.monotonic())
+            if self.rollups is not None:
+                until_persist = max(0.0, next_persist - time.monotonic())
+                timeout = until_persist if timeout is None else min(timeout, until_persist)
+            self._flusher_wakeup.wait(timeout)
+            self._flusher_wakeup.clear()
+
+            fd = None
+            with self._lock:
+                if self.current_file is None:
+                    continue
+                if self.buffer and (len(self.buffer) >= self.buffer_size or (
+                        interval and time.monotonic() - self._first_buffered >= interval)):
+                    self._flush()
+                if self._should_rotate():
+                    print("[DEBUG] Rotacja!")
+                    self._rotate()
+                if self._fsync_due:
+                    self._fsync_due = False
+                    fd = os.dup(self.current_file.fileno())  # kopia deskryptora - plik może zostać zamknięty
+            if fd is not None:
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+            # Poza blokadą loggera - RollupStore ma własną
+            if self.rollups is not None and time.monotonic() >= next_persist:
+                next_persist = time.monotonic() + persist_interval
+                try:
+                    self.rollups.flush()
+                except OSError as e:
+                    print(f"Błąd zapisu agregatów: {str(e)}", file=sys.stderr)
+
+    def _flush(self) -> None:
+        """Zapisuje bufor do pliku CSV i dodatkowych magazynów."""
+        self.csv_writer.writerows(self.buffer)
+        self.current_file.flush()
+        self.current_lines += len(self.buffer)
+        self.current_size = os.fstat(self.current_file.fileno()).st_size
+        for backend in self.backends:
+            backend.write_rows(self.buffer)
+        self.buffer.clear()
+
+        self._flush_count += 1
+        if self.fsync_every_flushes and self._flush_count % self.fsync_every_flushes == 0:
+            if self._flusher_thread is not None:
+                self._fsync_due = True  # fsync w wątku w tle, bez trzymania blokady
+                self._flusher_wakeup.set()
+            else:
+                os.fsync(self.current_file.fileno())
+
+    def read_columns(self, start: datetime, end: datetime, sensor_id: Optional[str] = None) -> Dict:
+        """
+        Odczyt kolumnowy z magazynu "columnar" (wymaga klucza "columnar" w konfiguracji).
+        Zwraca kolumny timestamp/value/sensor_id/unit (tablice NumPy, jeśli jest dostępny).
+        """
+        if self.columnar is None:
+            raise RuntimeError("Magazyn kolumnowy nie jest włączony (klucz \"columnar\" w konfiguracji).")
+        return self.columnar.read(start, end, sensor_id)
+
+    def read_aggregates(self, start: datetime, end: datetime, sensor_id: Optional[str] = None,
+                        resolution: str = "1min") -> List[Dict]:
+        """
+        Zwraca agregaty (count, min, max, mean) per czujnik i przedział ("1min", "1h" lub "1d")
+        z tabel utrzymywanych przy zapisie - bez skanowania surowych logów.
+        """
+        if self.rollups is None:
+            raise RuntimeError("Agregaty są wyłączone (klucz \"rollups\" w konfiguracji).")
+        return self.rollups.read(start, end, sensor_id, resolution)
+
     def read_logs(self, start: datetime, end: datetime, sensor_id: Optional[str] = None) -> Iterator[Dict]:
         """
         Pobiera wpisy z logów zadanego zakresu i opcjonalnie konkretnego czujnika.
+        Pliki z indeksem czasowym (.idx) spoza zakresu lub bez danego czujnika są pomijane,
+        a odczyt zaczyna się od punktu kontrolnego najbliższego początkowi zakresu.
+        """
+        csv_files, archives = self._list_log_files()
+        try:
+            for file_path, inode in csv_files:
+                yield from self._read_csv(file_path, inode, start, end, sensor_id)
+            for archive_path in archives:
+                yield from self._read_archive(archive_path, start, end, sensor_id)
+        finally:
+            self._end_read()
+
+    def read_logs_parallel(self, start: datetime, end: datetime, sensor_id: Optional[str] = None,
+                           workers: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Równoległa wersja read_logs: pliki są filtrowane w procesach roboczych (ProcessPoolExecutor),
+        a wyniki scalane strumieniowo (k-way merge) - wpisy zwracane są w kolejności czasu.
+        Pierwsze wpisy są dostępne, gdy skończą się pliki o najwcześniejszych danych (wg indeksu).
+
+        Domyślną metodą odczytu pozostaje read_logs: proces nadrzędny i tak odbudowuje i scala
+        każdy wpis, więc ta wersja opłaca się dopiero przy długich skanach na wielu rdzeniach
+        (na jednym rdzeniu jest wolniejsza - patrz benchmarks/bench_parallel_read.py).
+        :param workers: Liczba procesów (domyślnie liczba rdzeni)
+        """
+        csv_files, archives = self._list_log_files()
+        try:
+            current_path = os.path.abspath(self.current_file_path) if self.current_file else None
+
+            tasks = []  # (najwcześniejszy możliwy czas wpisu, ścieżka, i-węzeł, indeks)
+            for path, inode in csv_files:
+                index = None
+                try:
+                    size = os.path.getsize(path)
+                except FileNotFoundError:
+                    pass  # przeniesiony - zadanie zwróci None i plik zostanie odczytany jak w read_logs
+                else:
+                    if os.path.dirname(path) != self.log_dir:
+                        index = self._load_index(path + INDEX_SUFFIX, size)  # plik czekający na spakowanie
+                    elif os.path.abspath(path) != current_path:
+                        index = self._get_index(path, size)  # jak w read_logs: brakujący indeks jest budowany
+                tasks.append((path, inode, index))
+            for path in archives:
+                tasks.append((path, None, self._load_index(path + INDEX_SUFFIX)))
+
+            bounded = []
+            for path, inode, index in tasks:
+                if index and not self._index_may_match(index, start, end, sensor_id):
+                    continue
+                lower_bound = max(start, datetime.fromisoformat(index["min"])) if index else start
+                bounded.append((lower_bound, path, inode, index))
+            bounded.sort(key=itemgetter(0))
+
+            pool = ProcessPoolExecutor(max_workers=workers)
+            try:
+                futures = [pool.submit(_scan_file_task, path, inode, index, start, end, sensor_id)
+                           for _, path, inode, index in bounded]
+                heap = []
+                next_file = 0
+                while heap or next_file < len(bounded):
+                    # Dołącz pliki, które mogą zawierać wpisy wcześniejsze niż najmniejszy oczekujący
+                    while next_file < len(bounded) and (not heap or bounded[next_file][0] <= heap[0][0]):
+                        entries = futures[next_file].result()
+                        if entries is None:
+                            _, path, inode, _ = bounded[next_file]
+                            entries = sorted(self._read_csv(path, inode, start, end, sensor_id),
+                                             key=itemgetter("timestamp"))
+                        iterator = iter(entries)
+                        entry = next(iterator, None)
+                        if entry is not None:
+                            heapq.heappush(heap, (entry["timestamp"], next_file, entry, iterator))
+                        next_file += 1
+                    if not heap:
+                        continue
+
+                    _, number, entry, iterator = heapq.heappop(heap)
+                    yield entry
+                    entry = next(iterator, None)
+                    if entry is not None:
+                        heapq.heappush(heap, (entry["timestamp"], number, entry, iterator))
+            finally:
+                pool.shutdown(cancel_futures=True)
+        finally:
+            self._end_read()
+
+    def _list_log_files(self):
+        """
+        Zwraca spójną migawkę plików do odczytu: [(ścieżka CSV, i-węzeł)] oraz [ścieżka ZIP].
+        Obejmuje pliki CSV w log_dir, pliki czekające na archiwizację (archive/X.csv bez X.zip)
+        i gotowe archiwa. Każde wywołanie musi zakończyć się _end_read().
         """
-
-        def parse_line(row):
-            return {
-                "timestamp": datetime.fromisoformat(row[0]),
-                "sensor_id": row[1],
-                "value": float(row[2]),
-                "unit": row[3],
-                "level": row[4] if len(row) > 4 else "",
-        "message": row[5] if len(row) > 5 else ""
-            }
-
-        # Przeglądaj pliki CSV w log_dir
-        for filename in os.listdir(self.log_dir):
-            if filename.endswith('.csv'):
-                file_path = os.path.join(self.log_dir, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    reader = csv.reader(f)
-                    next(reader, None)  # pomiń nagłówek
-                    for row in reader:
-                        if not row or 'KONIEC SESJI' in row[0]:
-                            continue
-                        entry = parse_line(row)
-                        if start <= entry["timestamp"] <= end:
-                            if sensor_id is None or entry["sensor_id"] == sensor_id:
-                                yield entry
-
-        # Przeglądaj archiwa ZIP w log_dir/archive
         archive_dir = os.path.join(self.log_dir, 'archive')
-        if os.path.exists(archive_dir):
-            for archive_name in os.listdir(archive_dir):
-                if archive_name.endswith('.zip'):
-                    archive_path = os.path.join(archive_dir, archive_name)
-                    with zipfile.ZipFile(archive_path, 'r') as zipf:
-                        for zipinfo in zipf.infolist():
-                            if zipinfo.filename.endswith('.csv'):
-                                with zipf.open(zipinfo) as f:
-                                    reader = csv.reader((line.decode('utf-8') for line in f))
-                                    next(reader, None)  # pomiń nagłówek
-                                    for row in reader:
-                                        if not row or 'KONIEC SESJI' in row[0]:
-                                            continue
-                                        entry = parse_line(row)
-                                        if start <= entry["timestamp"] <= end:
-                                            if sensor_id is None or entry["sensor_id"] == sensor_id:
-                                                yield entry
+        with self._archive_lock:
+            self._readers += 1
+            paths = [os.path.join(self.log_dir, name) for name in os.listdir(self.log_dir) if name.endswith('.csv')]
+            names = set(os.listdir(archive_dir)) if os.path.exists(archive_dir) else set()
+            paths += [os.path.join(archive_dir, name) for name in names
+                      if name.endswith('.csv') and name[:-4] + '.zip' not in names]
+            csv_files = []
+            for path in paths:
+                try:
+                    csv_files.append((path, os.stat(path).st_ino))
+                except FileNotFoundError:
+                    pass
+            archives = [os.path.join(archive_dir, name) for name in names if name.endswith('.zip')]
+        return csv_files, archives
+
+    def _end_read(self) -> None:
+        """Kończy odczyt z migawki; po ostatnim usuwa wpisy _detached plików spakowanych w jego trakcie."""
+        with self._archive_lock:
+            self._readers -= 1
+            if self._readers:
+                return
+            for inode, detached in self._retired:
+                if self._detached.get(inode) == detached:  # i-węzeł mógł zostać użyty ponownie
+                    del self._detached[inode]
+            self._retired = []
+
+    def _read_csv(self, file_path: str, inode: int, start: datetime, end: datetime,
+                  sensor_id: Optional[str]) -> Iterator[Dict]:
+        """Czyta plik CSV z migawki, także gdy w międzyczasie został przeniesiony lub spakowany."""
+        path = file_path
+        expected = None  # (rozmiar, mtime_ns) przeniesionego pliku - i-węzły bywają używane ponownie
+        while True:
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                f = None
+            if f is not None:
+                stat = os.fstat(f.fileno())
+                if stat.st_ino == inode and (expected is None or (stat.st_size, stat.st_mtime_ns) == expected):
+                    break
+                f.close()  # pod tą ścieżką jest już nowy plik (rotacja)
+            detached = self._detached.get(inode)
+            if detached is None:
+                return
+            moved, size, mtime_ns = detached
+            if path == moved:
+                # Plik został już spakowany - archiwum nie było w migawce, więc nie będzie czytane dwa razy
+                yield from self._read_archive(os.path.splitext(moved)[0] + '.zip', start, end, sensor_id)
+                return
+            path, expected = moved, (size, mtime_ns)
+
+        with f:
+            index = None
+            size = os.fstat(f.fileno()).st_size
+            if os.path.dirname(path) != self.log_dir:
+                index = self._load_index(path + INDEX_SUFFIX, size)  # plik czekający na spakowanie
+            elif not (self.current_file and os.path.abspath(path) == os.path.abspath(self.current_file_path)):
+                index = self._get_index(path, size)  # bieżący plik wciąż rośnie - bez indeksu
+            if index and not self._index_may_match(index, start, end, sensor_id):
+                return
+            yield from _scan_rows(f, index, start, end, sensor_id)
+
+    def _read_archive(self, archive_path: str, start: datetime, end: datetime,
+                      sensor_id: Optional[str]) -> Iterator[Dict]:
+        index = self._load_index(archive_path + INDEX_SUFFIX)
+        if index and not self._index_may_match(index, start, end, sensor_id):
+            return
+        yield from _scan_archive(archive_path, index, start, end, sensor_id)
+
+    @staticmethod
+    def _index_may_match(index: Dict, start: datetime, end: datetime, sensor_id: Optional[str]) -> bool:
+        if index["min"] is None:
+            return False  # plik bez odczytów
+        if datetime.fromisoformat(index["max"]) < start or datetime.fromisoformat(index["min"]) > end:
+            return False
+        return sensor_id is None or sensor_id in index["sensors"]
+
+    def _build_index(self, f) -> Dict:
+        """
+        Buduje indeks czasowy pliku CSV (otwartego binarnie): zakres znaczników czasu,
+        zbiór czujników oraz punkty kontrolne co `index_every_rows` wierszy.
+        Punkt kontrolny to [przesunięcie, maks. czas wierszy przed nim, min. czas wierszy od niego] -
+        dzięki temu indeks jest poprawny także dla wierszy zapisanych nie po kolei.
+        """
+        every = self.index_every_rows
+        records = _csv_records(f)
+        header = next(records, None)
+        offset = header[1] if header else f.tell()  # początek pierwszego wiersza danych
+        sensors = set()
+        offsets: List[int] = []
+        before_max: List[Optional[datetime]] = []
+        block_min: List[Optional[datetime]] = []
+        running_max = None
+        rows = 0
+
+        for row, position_after in records:
+            if rows % every == 0:
+                offsets.append(offset)
+                before_max.append(running_max)
+                block_min.append(None)
+            rows += 1
+            offset = position_after
+            if not _is_data_row(row):
+                continue
+            try:
+                timestamp = datetime.fromisoformat(row[0])
+            except ValueError:
+                continue
+            sensors.add(row[1] if len(row) > 1 else "")
+            if running_max is None or timestamp > running_max:
+                running_max = timestamp
+            if block_min[-1] is None or timestamp < block_min[-1]:
+                block_min[-1] = timestamp
+
+        # Minimum od każdego punktu kontrolnego do końca pliku
+        after_min: List[Optional[datetime]] = [None] * len(block_min)
+        current = None
+        for i in range(len(block_min) - 1, -1, -1):
+            if block_min[i] is not None and (current is None or block_min[i] < current):
+                current = block_min[i]
+            after_min[i] = current
+
+        def iso(value):
+            return value.isoformat() if value is not None else None
+
+        return {
+            "version": 1,
+            "size": offset,
+            "rows": rows,
+            "min": iso(after_min[0]) if after_min else None,
+            "max": iso(running_max),
+            "sensors": sorted(sensors),
+            "every": every,
+            "checkpoints": [[o, iso(b), iso(a)] for o, b, a in zip(offsets, before_max, after_min)],
+        }
+    def _write_index(self, index: Dict, index_path: str) -> None:
+        """Zapisuje indeks atomowo (plik tymczasowy + os.replace)."""
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+
+    @staticmethod
+    def _load_index(index_path: str, size: Optional[int] = None) -> Optional[Dict]:
+        """Wczytuje indeks; None gdy go brak, jest uszkodzony lub nieaktualny (inny rozmiar pliku)."""
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get("version") != 1 or (size is not None and index.get("size") != size):
+            return None
+        return index
+
+    def _get_index(self, csv_path: str, size: int) -> Optional[Dict]:
+        """Zwraca aktualny indeks zamkniętego pliku CSV, budując go przy pierwszym zapytaniu."""
+        index_path = csv_path + INDEX_SUFFIX
+        index = self._load_index(index_path, size)
+        if index is None:
+            try:
+                with open(csv_path, 'rb') as f:
+                    index = self._build_index(f)
+                self._write_index(index, index_path)
+            except OSError:
+                return None
+        return index
 
     def _should_rotate(self):
-        #print(f"[DEBUG] Sprawdzam rotację: current_lines={self.current_lines}, rotate_after_lines={self.rotate_after_lines}")
-        # Rotacja po czasie
-        if self.current_file_start_time and (
-                datetime.now() - self.current_file_start_time >= timedelta(hours=self.rotate_every_hours)):
+        # Rotacja po czasie (termin wyliczony w start())
+        if self._rotate_deadline is not None and time.monotonic() >= self._rotate_deadline:
+            return True
+        # Rotacja po rozmiarze pliku (rozmiar aktualizowany przy zapisie bufora)
+        if self.current_size >= self.max_size_mb * 1024 * 1024:
             return True
-        # Rotacja po rozmiarze pliku
-        if self.current_file_path and os.path.exists(self.current_file_path):
-             size_mb = os.path.getsize(self.current_file_path) / (1024 * 1024)
-             if size_mb >= self.max_size_mb:
-                     return True
         # Rotacja po liczbie linii
         if self.current_lines >= self.rotate_after_lines:
             return True
         return False
 
     def _rotate(self):
-        self.stop()
-        self._archive()
-        self._clean_old_archives()
-        self.start()
+        # Zamknięty plik jest tylko przenoszony - kompresja i retencja odbywają się w tle
+        self._close_current()
+        pending = self._detach_current()
+        self._open_current()
+        if self.async_archive:
+            self._schedule_archive(pending)
+        else:
+            if pending:
+                self._archive_file(*pending)
+            self._clean_old_archives()
 
     def _get_unique_archive_name(self, base_name: str) -> str:
         """Generuje unikalną nazwę archiwum ZIP z numeracją przyrostową."""
@@ -178,28 +738,119 @@ class Logger:
         counter = 1
         archive_dir = os.path.join(self.log_dir, "archive")
 
-        while os.path.exists(os.path.join(archive_dir, archive_name)):
+        # Nazwa jest zajęta także przez plik czekający na spakowanie (archive/<nazwa>.csv)
+        while (os.path.exists(os.path.join(archive_dir, archive_name))
+               or os.path.exists(os.path.join(archive_dir, archive_name[:-4] + ".csv"))):
             archive_name = f"{base_name}({counter}).zip"
             counter += 1
 
         return archive_name
 
     def _archive(self):
+        """Archiwizuje zamknięty bieżący plik synchronicznie."""
+        pending = self._detach_current()
+        if pending:
+            self._archive_file(*pending)
+
+    def _detach_current(self) -> Optional[tuple]:
+        """
+        Przenosi zamknięty bieżący plik do archive/<nazwa archiwum>.csv (rezerwując nazwę archiwum).
+        Zwraca (ścieżka przeniesionego pliku, nazwa pliku w archiwum) albo None.
+        """
         if not self.current_file_path or not os.path.exists(self.current_file_path):
-            return
+            return None
 
         base_filename = os.path.basename(self.current_file_path)
         archive_name = self._get_unique_archive_name(base_filename)
-        archive_path = os.path.join(self.log_dir, "archive", archive_name)
+        pending_path = os.path.join(self.log_dir, "archive", archive_name[:-4] + ".csv")
 
-        print(f"[DEBUG] Tworzenie archiwum: {archive_path}")
+        with self._archive_lock:
+            stat = os.stat(self.current_file_path)
+            os.replace(self.current_file_path, pending_path)
+            self._detached[stat.st_ino] = (pending_path, stat.st_size, stat.st_mtime_ns)
+            if os.path.exists(self.current_file_path + INDEX_SUFFIX):
+                os.replace(self.current_file_path + INDEX_SUFFIX, pending_path + INDEX_SUFFIX)
+        return pending_path, base_filename
 
-        # Utwórz archiwum ZIP bez przenoszenia pliku CSV
-        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(self.current_file_path, arcname=base_filename)
+    def _archive_file(self, pending_path: str, arcname: str) -> None:
+        """Pakuje przeniesiony plik do ZIP i podmienia go atomowo (archive/X.csv -> archive/X.zip)."""
+        archive_path = os.path.splitext(pending_path)[0] + ".zip"
+        tmp_path = archive_path + ".tmp"
 
-        print(f"[DEBUG] Usuwanie starego pliku CSV: {self.current_file_path}")
-        os.remove(self.current_file_path)
+        print(f"[DEBUG] Tworzenie archiwum: {archive_path}")
+
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            zipf.write(pending_path, arcname=arcname)
+
+        # Indeks czasowy obok archiwum (przesunięcia dotyczą rozpakowanego pliku CSV)
+        with open(pending_path, 'rb') as f:
+            index = self._build_index(f)
+        index["member"] = arcname
+        self._write_index(index, archive_path + INDEX_SUFFIX)
+
+        print(f"[DEBUG] Usuwanie starego pliku CSV: {pending_path}")
+        with self._archive_lock:
+            os.replace(tmp_path, archive_path)
+            self._forget_detached(pending_path)
+            try:
+                os.remove(pending_path)
+                if os.path.exists(pending_path + INDEX_SUFFIX):
+                    os.remove(pending_path + INDEX_SUFFIX)
+            except OSError as e:
+                # Np. plik otwarty przez czytelnika w Windows - odczyt i tak pomija X.csv, gdy istnieje X.zip
+                print(f"Nie można usunąć {pending_path}: {e}", file=sys.stderr)
+
+    def _forget_detached(self, pending_path: str) -> None:
+        """Usuwa wpis spakowanego pliku z _detached - od razu albo po zakończeniu trwających odczytów (pod blokadą)."""
+        for inode, detached in list(self._detached.items()):
+            if detached[0] != pending_path:
+                continue
+            if self._readers:
+                self._retired.append((inode, detached))  # czytelnik z wcześniejszej migawki może go jeszcze szukać
+            else:
+                del self._detached[inode]
+
+    def _schedule_archive(self, pending: Optional[tuple]) -> None:
+        """Zleca archiwizację (i czyszczenie starych archiwów) wątkowi w tle; zadania wykonywane są po kolei."""
+        self._archive_queue.put(pending)
+        if self._archive_thread is None or not self._archive_thread.is_alive():
+            self._archive_thread = threading.Thread(target=self._archive_worker, name="LogArchiver", daemon=True)
+            self._archive_thread.start()
+
+    def _archive_worker(self) -> None:
+        while True:
+            pending = self._archive_queue.get()
+            try:
+                if pending:
+                    self._archive_file(*pending)
+                self._clean_old_archives()
+            except Exception as e:
+                print(f"Błąd archiwizacji: {str(e)}", file=sys.stderr)
+            finally:
+                self._archive_queue.task_done()
+
+    def _recover_pending_archives(self) -> None:
+        """Dokańcza archiwizację przerwaną przy poprzednim uruchomieniu (archive/X.csv bez X.zip)."""
+        archive_dir = os.path.join(self.log_dir, "archive")
+        names = set(os.listdir(archive_dir))
+        for name in names:
+            path = os.path.join(archive_dir, name)
+            if name.endswith(".zip.tmp"):
+                os.remove(path)
+            elif name.endswith(".csv"):
+                if name[:-4] + ".zip" in names:
+                    os.remove(path)
+                    if name + INDEX_SUFFIX in names:
+                        os.remove(path + INDEX_SUFFIX)
+                    continue
+                stat = os.stat(path)
+                self._detached[stat.st_ino] = (path, stat.st_size, stat.st_mtime_ns)
+                # Nazwa w archiwum bez numeru dodanego przez _get_unique_archive_name
+                pending = (path, re.sub(r"\(\d+\)$", "", name[:-4]) + ".csv")
+                if self.async_archive:
+                    self._schedule_archive(pending)
+                else:
+                    self._archive_file(*pending)
 
     def _clean_old_archives(self):
         archive_dir = os.path.join(self.log_dir, "archive")
@@ -210,6 +861,10 @@ class Logger:
                 file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
                 if now - file_mtime > timedelta(days=self.retention_days):
                     os.remove(file_path)
+                    if os.path.exists(file_path + INDEX_SUFFIX):
+                        os.remove(file_path + INDEX_SUFFIX)
+        for backend in self.backends:
+            backend.remove_older_than(self.retention_days)
 
     def info(self, message: str) -> None:
         """Rejestruje informacyjny wpis w logu."""
@@ -9,7 +9,7 @@ class AirQualitySensor(Sensor):
         if self.last_value is None:
             self.last_value = random.uniform(self.min_value, self.max_value)
 
-    def read_value(self):
+    def read_value(self, timestamp=None):
         if not self.active:
             raise Exception(f"Czujnik {self.name} jest wyłączony.")
 
@@ -37,5 +37,5 @@ class AirQualitySensor(Sensor):
         new_value = max(self.min_value, min(self.max_value, new_value))
 
         self.last_value = round(new_value, 2)
-        self._notify_callbacks(self.last_value)
+        self._notify_callbacks(self.last_value, timestamp)
         return self.last_value
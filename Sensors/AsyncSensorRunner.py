@@ -0,0 +1,142 @@
+import asyncio
+import inspect
+import math
+import sys
+from datetime import datetime
+
+
+class AsyncSensorRunner:
+    """
+    Środowisko uruchomieniowe czujników na asyncio: jeden proces i jedna pętla zdarzeń
+    obsługują wiele czujników i wiele połączeń (np. AsyncNetworkClient) bez wątków.
+
+    Czujniki o tym samym okresie tworzą grupę odczytywaną w jednym zadaniu, w terminach
+    bezwzględnych start + k * okres, z jednym znacznikiem czasu na takt. Zaległe takty są
+    pomijane (jak polityka "skip" SensorScheduler). Partie odczytów trafiają do callbacków
+    partii (register_batch_callback) - zwykłych funkcji albo korutyn; korutyny (np.
+    AsyncNetworkClient.send_readings) uruchamiane są jako zadania, więc wysyłki do wielu
+    serwerów trwają współbieżnie. Przy max_pending trwających wysyłkach odczyty czekają
+    na zakończenie którejś z nich.
+
+    Callbacki zarejestrowane na samych czujnikach (register_callback) nadal są wywoływane.
+    """
+
+    def __init__(self, max_pending=64):
+        """:param max_pending: Maksymalna liczba jednocześnie trwających wywołań callbacków-korutyn"""
+        self.max_pending = max_pending
+        self._groups = {}  # (okres, slow) -> lista czujników
+        self._batch_callbacks = []
+        self._pending = set()
+        self._stopping = None
+        self.reads = 0
+        self.skipped = 0
+        self.errors = 0
+
+    def add(self, sensor, frequency=None, slow=False):
+        """
+        Dodaje czujnik (przed run()).
+
+        :param frequency: Okres odczytów w sekundach (None - sensor.frequency)
+        :param slow: Odczyt w wątku (asyncio.to_thread), aby nie blokować pętli zdarzeń
+        """
+        period = frequency if frequency is not None else sensor.frequency
+        if period <= 0:
+            raise ValueError(f"Okres odczytów czujnika {sensor.sensor_id} musi być dodatni")
+        self._groups.setdefault((period, slow), []).append(sensor)
+
+    def register_batch_callback(self, callback):
+        """Rejestruje callback partii: callback(records) - funkcję lub korutynę."""
+        self._batch_callbacks.append(callback)
+
+    async def run(self, duration=None):
+        """
+        Uruchamia odczyty na `duration` sekund (None - do stop() lub anulowania).
+        Po zakończeniu czeka na trwające wysyłki; anulowanie run() anuluje także je.
+        """
+        self._stopping = asyncio.Event()
+        tasks = [asyncio.ensure_future(self._run_group(period, sensors, slow))
+                 for (period, slow), sensors in self._groups.items()]
+        cancelled = False
+        try:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), duration)
+            except asyncio.TimeoutError:
+                pass
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if cancelled:
+                for task in self._pending:
+                    task.cancel()
+            if self._pending:
+                await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def stop(self):
+        """Kończy run() (wywoływane z pętli zdarzeń)."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _run_group(self, period, sensors, slow):
+        loop = asyncio.get_running_loop()
+        origin = loop.time()
+        tick = 0
+        while True:
+            # Także przy zaległym takcie (delay <= 0) oddaj sterowanie - inaczej wolne odczyty zagłodzą pętlę zdarzeń
+            await asyncio.sleep(max(0.0, origin + tick * period - loop.time()))
+
+            timestamp = datetime.now()
+            active = [sensor for sensor in sensors if sensor.active]
+            if slow:
+                values = await asyncio.gather(*(asyncio.to_thread(sensor.read_value, timestamp) for sensor in active),
+                                              return_exceptions=True)
+            else:
+                values = []
+                for sensor in active:
+                    try:
+                        values.append(sensor.read_value(timestamp))
+                    except Exception as e:
+                        values.append(e)
+
+            records = []
+            for sensor, value in zip(active, values):
+                if isinstance(value, Exception):
+                    self.errors += 1
+                    print(f"Błąd odczytu czujnika {sensor.sensor_id}: {value}", file=sys.stderr)
+                else:
+                    records.append((sensor.sensor_id, timestamp, value, sensor.unit))
+            self.reads += len(records)
+            if records:
+                await self._deliver(records)
+
+            # Kolejny takt; z zaległych wykonywany jest tylko najnowszy
+            tick += 1
+            overdue = math.floor((loop.time() - origin) / period) - tick + 1
+            if overdue > 1:
+                tick += overdue - 1
+                self.skipped += (overdue - 1) * len(sensors)
+
+    async def _deliver(self, records):
+        for callback in self._batch_callbacks:
+            if not inspect.iscoroutinefunction(callback):
+                try:
+                    callback(records)
+                except Exception as e:
+                    print(f"Błąd callbacku: {e}", file=sys.stderr)
+                continue
+            while len(self._pending) >= self.max_pending:
+                await asyncio.wait(self._pending, return_when=asyncio.FIRST_COMPLETED)
+            task = asyncio.ensure_future(callback(records))
+            self._pending.add(task)
+            task.add_done_callback(self._delivered)
+
+    def _delivered(self, task):
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Błąd callbacku: {task.exception()}", file=sys.stderr)
+
+    def __str__(self):
+        return f"AsyncSensorRunner(groups={len(self._groups)}, sensors={sum(map(len, self._groups.values()))})"
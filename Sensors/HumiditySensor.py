@@ -10,7 +10,7 @@ class HumiditySensor(Sensor):
         # Startowa wilgotność na początku symulacji
         self.last_value = round(random.uniform(40, 80), 2)
 
-    def read_value(self):
+    def read_value(self, timestamp=None):
         if not self.active:
             raise Exception(f"Czujnik {self.name} jest wyłączony.")
 
@@ -37,5 +37,5 @@ class HumiditySensor(Sensor):
 
         # Zapisz aktualną temperaturę na przyszłość
         self.last_temp = current_temp
-        self._notify_callbacks(self.last_value)
+        self._notify_callbacks(self.last_value, timestamp)
         return self.last_value
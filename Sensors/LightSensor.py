@@ -22,7 +22,7 @@ class LightSensor(Sensor):
 
         print(f"Symulacja dla: {self.time_of_day.upper()}")
 
-    def read_value(self):
+    def read_value(self, timestamp=None):
         if not self.active:
             raise Exception(f"Czujnik {self.name} jest wyłączony.")
 
@@ -36,5 +36,5 @@ class LightSensor(Sensor):
             new_value = max(self.night_min, min(self.night_max, new_value))
 
         self.last_value = round(new_value, 2)
-        self._notify_callbacks(self.last_value)
+        self._notify_callbacks(self.last_value, timestamp)
         return self.last_value
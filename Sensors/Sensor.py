@@ -24,27 +24,45 @@ class Sensor:
         self.active = True
         self.last_value = None
         self._callbacks = []
+        self._batch_callbacks = []
 
     def register_callback(self, callback):
         """Rejestruje funkcję callback (np. logger.log_reading)."""
         self._callbacks.append(callback)
 
-    def _notify_callbacks(self, value):
-        """Wywołuje wszystkie callbacki po odczycie."""
+    def register_batch_callback(self, callback):
+        """
+        Rejestruje callback partii: callback(records) z listą krotek
+        (sensor_id, timestamp, value, unit) - np. logger.log_readings.
+        """
+        self._batch_callbacks.append(callback)
+
+    def _notify_callbacks(self, value, timestamp=None):
+        """Wywołuje wszystkie callbacki po odczycie (jeden znacznik czasu dla wszystkich)."""
+        if not self._callbacks and not self._batch_callbacks:
+            return
+        if timestamp is None:
+            timestamp = datetime.now()
         for callback in self._callbacks:
-            callback(self.sensor_id, datetime.now(), value, self.unit)
+            callback(self.sensor_id, timestamp, value, self.unit)
+        if self._batch_callbacks:
+            records = [(self.sensor_id, timestamp, value, self.unit)]
+            for callback in self._batch_callbacks:
+                callback(records)
 
-    def read_value(self):
+    def read_value(self, timestamp=None):
         """
         Symuluje pobranie odczytu z czujnika.
         W klasie bazowej zwraca losową wartość z przedziału [min_value, max_value].
+
+        :param timestamp: Znacznik czasu przekazywany callbackom (None - datetime.now())
         """
         if not self.active:
             raise Exception(f"Czujnik {self.name} jest wyłączony.")
 
         value = random.uniform(self.min_value, self.max_value)
         self.last_value = round(value, 2)
-        self._notify_callbacks(self.last_value)
+        self._notify_callbacks(self.last_value, timestamp)
         return self.last_value
 
     def calibrate(self, calibration_factor):
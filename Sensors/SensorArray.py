@@ -0,0 +1,135 @@
+from datetime import datetime
+from itertools import repeat
+
+try:
+    import numpy as np
+except ImportError:  # NumPy jest opcjonalny - potrzebny tylko do symulacji floty
+    np = None
+
+# Zakresy jak w pojedynczych czujnikach (TemperatureSensor, LightSensor)
+TEMPERATURE_BOUNDS = {"day": (15, 35), "night": (-5, 20)}
+LIGHT_BOUNDS = {"day": (200, 10000), "night": (0, 200)}
+HUMIDITY_BOUNDS = (0, 100)
+AIR_QUALITY_BOUNDS = (0, 500)
+SHOCK_PROBABILITY = 0.05
+
+
+class SensorArray:
+    """
+    Flota `count` stacji, każda z czujnikiem temperatury, wilgotności, światła
+    i jakości powietrza - stan wszystkich czujników w tablicach NumPy.
+
+    step() przesuwa całą flotę o jeden krok symulacji jedną serią operacji
+    wektorowych, z tymi samymi regułami co klasy z Sensors/*: granice dnia/nocy,
+    sprzężenie wilgotności z temperaturą stacji i skoki AQI. Odczyty wydawane są
+    partiami (batch) zamiast pojedynczo.
+
+    Identyfikatory: T00000, H00000, L00000, AQ00000 (numer stacji).
+    """
+
+    KINDS = ("temperature", "humidity", "light", "air_quality")
+    UNITS = {"temperature": "°C", "humidity": "%", "light": "lx", "air_quality": "AQI"}
+    PREFIXES = {"temperature": "T", "humidity": "H", "light": "L", "air_quality": "AQ"}
+
+    def __init__(self, count, time_of_day="day", frequency=1, seed=None):
+        """
+        :param count: Liczba stacji (czujników każdego rodzaju)
+        :param time_of_day: 'day' lub 'night' - granice temperatury i światła
+        :param frequency: Częstotliwość odczytów (sekundy)
+        :param seed: Ziarno generatora (powtarzalne symulacje)
+        """
+        if np is None:
+            raise ImportError("SensorArray wymaga pakietu numpy (pip install numpy)")
+        if time_of_day not in TEMPERATURE_BOUNDS:
+            raise ValueError(f"Nieznana pora dnia: {time_of_day} (dostępne: day, night)")
+
+        self.count = count
+        self.time_of_day = time_of_day
+        self.frequency = frequency
+        self.rng = np.random.default_rng(seed)
+
+        digits = max(len(str(max(count - 1, 0))), 5)
+        self.sensor_ids = [f"{self.PREFIXES[kind]}{i:0{digits}d}" for kind in self.KINDS for i in range(count)]
+        self.units = [self.UNITS[kind] for kind in self.KINDS for _ in range(count)]
+
+        # Jedna ciągła tablica wartości; rodzaje czujników to jej widoki (bez kopiowania przy wydawaniu partii)
+        self.values = np.empty(len(self.KINDS) * count, dtype=np.float64)
+        self.temperature, self.humidity, self.light, self.air_quality = (
+            self.values[i * count:(i + 1) * count] for i in range(len(self.KINDS)))
+
+        self.temperature[:] = self.rng.uniform(*TEMPERATURE_BOUNDS[time_of_day], count)
+        self.humidity[:] = np.round(self.rng.uniform(40, 80, count), 2)
+        self.light[:] = self.rng.uniform(*LIGHT_BOUNDS[time_of_day], count)
+        self.air_quality[:] = self.rng.uniform(*AIR_QUALITY_BOUNDS, count)
+        # Temperatura z poprzedniego kroku - do sprzężenia z wilgotnością
+        self.last_temperature = self.temperature.copy()
+        self.last_timestamp = None
+        self.last_shocks = 0
+        self._batch_callbacks = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def register_batch_callback(self, callback):
+        """Rejestruje callback partii wywoływany w read_batch(): callback(records), np. logger.log_readings."""
+        self._batch_callbacks.append(callback)
+
+    def step(self):
+        """Wykonuje jeden krok symulacji wszystkich czujników i zwraca tablicę wartości (widok, nie kopia)."""
+        rng, n = self.rng, self.count
+
+        # Temperatura: błądzenie losowe ±2 w granicach pory dnia
+        self.temperature += rng.uniform(-2, 2, n)
+        np.clip(self.temperature, *TEMPERATURE_BOUNDS[self.time_of_day], out=self.temperature)
+        np.round(self.temperature, 2, out=self.temperature)
+
+        # Wilgotność: spada przy wzroście temperatury, rośnie przy spadku
+        difference = self.temperature - self.last_temperature
+        fluctuation = rng.uniform(-0.5, 0.5, n)
+        rising = difference > 0.5
+        falling = difference < -0.5
+        fluctuation[rising] = rng.uniform(-2, -0.5, np.count_nonzero(rising))
+        fluctuation[falling] = rng.uniform(0.5, 2, np.count_nonzero(falling))
+        self.humidity += fluctuation
+        np.clip(self.humidity, *HUMIDITY_BOUNDS, out=self.humidity)
+        np.round(self.humidity, 2, out=self.humidity)
+        self.last_temperature[:] = self.temperature
+
+        # Światło: ±100 lx w granicach pory dnia
+        self.light += rng.uniform(-100, 100, n)
+        np.clip(self.light, *LIGHT_BOUNDS[self.time_of_day], out=self.light)
+        np.round(self.light, 2, out=self.light)
+
+        # Jakość powietrza: 5% szans na skok o co najmniej ±20 (max ±50), w przeciwnym razie ±10
+        shocked = rng.random(n) < SHOCK_PROBABILITY
+        self.last_shocks = int(np.count_nonzero(shocked))
+        shock = rng.uniform(-50, 50, self.last_shocks)
+        small = np.abs(shock) < 20
+        shock[small] = np.where(shock[small] > 0, 20.0, -20.0)
+        change = rng.uniform(-10, 10, n)
+        self.air_quality[shocked] = np.clip(self.air_quality[shocked] + shock, *AIR_QUALITY_BOUNDS)
+        change[shocked] = 0.0
+        self.air_quality += change
+        np.clip(self.air_quality, *AIR_QUALITY_BOUNDS, out=self.air_quality)
+        np.round(self.air_quality, 2, out=self.air_quality)
+
+        return self.values
+
+    def read_batch(self, timestamp=None):
+        """
+        Wykonuje krok symulacji, przekazuje partię odczytów callbackom partii i ją zwraca:
+        lista krotek (sensor_id, timestamp, value, unit) ze wspólnym znacznikiem czasu.
+        """
+        self.step()
+        records = self.batch(timestamp)
+        for callback in self._batch_callbacks:
+            callback(records)
+        return records
+
+    def batch(self, timestamp=None):
+        """Zwraca bieżące wartości jako partię krotek (sensor_id, timestamp, value, unit)."""
+        self.last_timestamp = timestamp or datetime.now()
+        return list(zip(self.sensor_ids, repeat(self.last_timestamp), self.values.tolist(), self.units))
+
+    def __str__(self):
+        return f"SensorArray(count={self.count}, sensors={len(self)}, time_of_day={self.time_of_day})"
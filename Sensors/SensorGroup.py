@@ -0,0 +1,45 @@
+from datetime import datetime
+
+
+class SensorGroup:
+    """
+    Grupa czujników odczytywanych razem: read_all() pobiera odczyt z każdego
+    aktywnego czujnika z jednym wspólnym znacznikiem czasu i przekazuje całą
+    partię krotek (sensor_id, timestamp, value, unit) callbackom partii
+    (register_batch_callback) jednym wywołaniem.
+
+    Callbacki zarejestrowane na samych czujnikach nadal są wywoływane.
+    """
+
+    def __init__(self, sensors=None):
+        self.sensors = list(sensors or [])
+        self._batch_callbacks = []
+
+    def add(self, sensor):
+        """Dodaje czujnik do grupy."""
+        self.sensors.append(sensor)
+
+    def register_batch_callback(self, callback):
+        """Rejestruje callback partii: callback(records), np. logger.log_readings."""
+        self._batch_callbacks.append(callback)
+
+    def read_all(self, timestamp=None):
+        """
+        Odczytuje wszystkie aktywne czujniki (wyłączone są pomijane) i zwraca partię odczytów.
+
+        :param timestamp: Wspólny znacznik czasu partii (None - datetime.now())
+        """
+        if timestamp is None:
+            timestamp = datetime.now()
+        records = [(sensor.sensor_id, timestamp, sensor.read_value(timestamp), sensor.unit)
+                   for sensor in self.sensors if sensor.active]
+        if records:
+            for callback in self._batch_callbacks:
+                callback(records)
+        return records
+
+    def __len__(self):
+        return len(self.sensors)
+
+    def __str__(self):
+        return f"SensorGroup(sensors={len(self.sensors)})"
@@ -0,0 +1,260 @@
+import heapq
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+POLICIES = ("catch_up", "skip")
+
+
+class _Entry:
+    """Stan harmonogramu jednego czujnika: okres, numer kolejnego taktu i statystyki opóźnień."""
+
+    __slots__ = ("sensor", "period", "origin", "tick", "order", "slow", "busy",
+                 "reads", "skipped", "errors", "late_mean", "late_m2", "late_max")
+
+    def __init__(self, sensor, period, origin, order, slow):
+        self.sensor = sensor
+        self.period = period
+        self.origin = origin
+        self.tick = 0
+        self.order = order
+        self.slow = slow
+        self.busy = False  # odczyt w puli wątków jeszcze trwa
+        self.reads = 0
+        self.skipped = 0
+        self.errors = 0
+        self.late_mean = 0.0  # średnia i suma kwadratów odchyleń (Welford)
+        self.late_m2 = 0.0
+        self.late_max = 0.0
+
+    @property
+    def deadline(self):
+        # Termin liczony od początku (origin + k * okres), a nie sumowany - bez kumulacji błędów
+        return self.origin + self.tick * self.period
+
+    def record(self, lateness):
+        self.reads += 1
+        delta = lateness - self.late_mean
+        self.late_mean += delta / self.reads
+        self.late_m2 += delta * (lateness - self.late_mean)
+        if lateness > self.late_max:
+            self.late_max = lateness
+
+
+class SensorScheduler:
+    """
+    Harmonogram odczytów: każdy czujnik odczytywany jest z własną częstotliwością
+    (sensor.frequency) w bezwzględnych terminach origin + k * okres, więc czas
+    wykonania odczytów i callbacków nie kumuluje się w dryf.
+
+    Terminy trzymane są w kopcu (heapq) - koszt zaplanowania odczytu O(log n)
+    niezależnie od liczby czujników. Czujniki z tym samym terminem odczytywane są
+    razem, z jednym znacznikiem czasu, a ich odczyty trafiają do callbacków partii
+    (register_batch_callback) jedną partią.
+
+    Polityki przy opóźnieniu (odczyty nie nadążają):
+    - "catch_up": zaległe takty są wykonywane kolejno (najwyżej max_catch_up najnowszych),
+    - "skip": z zaległych taktów wykonywany jest tylko najnowszy, od razu.
+
+    Czujniki dodane z slow=True odczytywane są w puli wątków (workers > 0), aby wolny
+    odczyt nie opóźniał pozostałych; ich odczyty trafiają do callbacków partii pojedynczo.
+    """
+
+    def __init__(self, policy="skip", max_catch_up=10, workers=0):
+        """
+        :param policy: "catch_up" lub "skip"
+        :param max_catch_up: Maksymalna liczba zaległych taktów wykonywanych w polityce catch_up
+        :param workers: Liczba wątków puli dla czujników slow=True (0 - odczyt w wątku harmonogramu)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Nieznana polityka: {policy} (dostępne: {', '.join(POLICIES)})")
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.workers = workers
+        self._heap = []
+        self._entries = []
+        self._lock = threading.Lock()
+        self._batch_callbacks = []
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        self._pool = None
+        self._origin = time.monotonic()  # wspólny początek - czujniki o tym samym okresie mają te same terminy
+
+    def add(self, sensor, frequency=None, offset=0.0, slow=False):
+        """
+        Dodaje czujnik do harmonogramu.
+
+        :param frequency: Okres odczytów w sekundach (None - sensor.frequency)
+        :param offset: Przesunięcie terminów czujnika względem wspólnego początku (sekundy)
+        :param slow: Odczyt w puli wątków (wymaga workers > 0)
+        """
+        period = frequency if frequency is not None else sensor.frequency
+        if period <= 0:
+            raise ValueError(f"Okres odczytów czujnika {sensor.sensor_id} musi być dodatni")
+        if slow and not self.workers:
+            raise ValueError("Czujniki slow=True wymagają puli wątków (workers > 0)")
+        with self._lock:
+            entry = _Entry(sensor, period, self._origin + offset, len(self._entries), slow)
+            entry.tick = max(0, math.ceil((time.monotonic() - entry.origin) / period))  # najbliższy przyszły takt
+            self._entries.append(entry)
+            heapq.heappush(self._heap, (entry.deadline, entry.order, entry))
+        self._wakeup.set()  # nowy termin może być wcześniejszy niż ten, na który czeka pętla
+        return entry
+
+    def register_batch_callback(self, callback):
+        """Rejestruje callback partii: callback(records) z krotkami (sensor_id, timestamp, value, unit)."""
+        self._batch_callbacks.append(callback)
+
+    def start(self):
+        """Uruchamia harmonogram w osobnym wątku."""
+        if self._running:
+            return
+        self._running = True
+        if self.workers:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="SensorRead")
+        self._thread = threading.Thread(target=self._run_loop, name="SensorScheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Zatrzymuje harmonogram i czeka na zakończenie trwających odczytów."""
+        if not self._running:
+            return
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        if self._pool:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def run(self, duration=None):
+        """Uruchamia harmonogram i blokuje wywołującego przez `duration` sekund (None - do stop())."""
+        self.start()
+        try:
+            if duration is None:
+                self._thread.join()
+            else:
+                time.sleep(duration)
+        finally:
+            self.stop()
+
+    def stats(self):
+        """
+        Statystyki per czujnik: liczba odczytów, pominiętych taktów i błędów oraz
+        opóźnienie odczytu względem terminu (średnie, odchylenie standardowe, maksymalne) w ms.
+        """
+        with self._lock:
+            entries = list(self._entries)
+        result = {}
+        for entry in entries:
+            variance = entry.late_m2 / (entry.reads - 1) if entry.reads > 1 else 0.0
+            result[entry.sensor.sensor_id] = {
+                "frequency": entry.period,
+                "reads": entry.reads,
+                "skipped": entry.skipped,
+                "errors": entry.errors,
+                "late_mean_ms": entry.late_mean * 1000,
+                "late_stddev_ms": math.sqrt(variance) * 1000,
+                "late_max_ms": entry.late_max * 1000,
+            }
+        return result
+
+    def _run_loop(self):
+        while self._running:
+            self._wakeup.clear()  # przed odczytem terminu - add() w trakcie czekania nie zostanie przeoczone
+            with self._lock:
+                deadline = self._heap[0][0] if self._heap else None
+            delay = None if deadline is None else deadline - time.monotonic()
+            if delay is None or delay > 0:
+                self._wakeup.wait(delay)
+                continue
+
+            # Wszystkie czujniki, których termin już minął - jedna partia z jednym znacznikiem czasu
+            now = time.monotonic()
+            due = []
+            with self._lock:
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[2])
+            timestamp = datetime.now()
+
+            records = []
+            for entry in due:
+                self._fire(entry, timestamp, records)
+            if records:
+                for callback in self._batch_callbacks:
+                    self._deliver(callback, records)
+
+            with self._lock:
+                for entry in due:
+                    self._reschedule(entry, time.monotonic())
+                    heapq.heappush(self._heap, (entry.deadline, entry.order, entry))
+
+    def _fire(self, entry, timestamp, records):
+        sensor = entry.sensor
+        if not sensor.active:
+            return
+        # Opóźnienie liczone w chwili tego odczytu - wcześniejsze odczyty partii też się do niego wliczają
+        lateness = time.monotonic() - entry.deadline
+        if entry.slow:
+            with self._lock:  # busy i errors zmienia także wątek puli (_read_slow)
+                if entry.busy:  # poprzedni odczyt wciąż trwa - takt pominięty
+                    entry.skipped += 1
+                    return
+                entry.busy = True
+            entry.record(lateness)
+            self._pool.submit(self._read_slow, entry, timestamp)
+            return
+        try:
+            value = sensor.read_value(timestamp)
+        except Exception as e:
+            with self._lock:
+                entry.errors += 1
+            print(f"Błąd odczytu czujnika {sensor.sensor_id}: {e}", file=sys.stderr)
+            return
+        entry.record(lateness)
+        records.append((sensor.sensor_id, timestamp, value, sensor.unit))
+
+    def _read_slow(self, entry, timestamp):
+        sensor = entry.sensor
+        error = None
+        try:
+            value = sensor.read_value(timestamp)
+        except Exception as e:
+            error = e
+        with self._lock:
+            entry.busy = False
+            if error is not None:
+                entry.errors += 1
+        if error is not None:
+            print(f"Błąd odczytu czujnika {sensor.sensor_id}: {error}", file=sys.stderr)
+            return
+        records = [(sensor.sensor_id, timestamp, value, sensor.unit)]
+        for callback in self._batch_callbacks:
+            self._deliver(callback, records)
+
+    @staticmethod
+    def _deliver(callback, records):
+        try:
+            callback(records)
+        except Exception as e:
+            print(f"Błąd callbacku harmonogramu: {e}", file=sys.stderr)
+
+    def _reschedule(self, entry, now):
+        """Wyznacza kolejny takt według polityki opóźnień."""
+        entry.tick += 1
+        overdue = math.floor((now - entry.deadline) / entry.period) + 1  # terminy, które już minęły
+        keep = 1 if self.policy == "skip" else self.max_catch_up
+        if overdue > keep:
+            entry.tick += overdue - keep
+            entry.skipped += overdue - keep
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return f"SensorScheduler(sensors={len(self._entries)}, policy={self.policy})"
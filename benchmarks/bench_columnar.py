@@ -0,0 +1,90 @@
+# benchmarks/bench_columnar.py
+"""
+Porównanie zapisu CSV+ZIP z magazynem kolumnowym Loggera (storage.columnar).
+
+Zapisuje ROWS odczytów z SENSORS czujników jednocześnie do CSV i segmentów
+kolumnowych, archiwizuje CSV do ZIP, a następnie porównuje rozmiar danych
+oraz czas skanowania: read_logs (wiersz po wierszu) i read_columns.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_columnar
+"""
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from io import StringIO
+
+from Logger import Logger
+from storage import columnar
+
+ROWS = 300_000
+SENSORS = 20
+START = datetime(2025, 6, 1)
+
+
+def make_logger(log_dir: str) -> Logger:
+    config_path = os.path.join(log_dir, "config.json")
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "log_dir": log_dir,
+            "filename_pattern": "bench_%Y%m%d.csv",
+            "buffer_size": 1000,
+            "rotate_every_hours": 24 * 365,
+            "max_size_mb": 1024,
+            "rotate_after_lines": ROWS * 2,
+            "retention_days": 36500,
+            "columnar": {"segment_rows": 65536}
+        }, f)
+    return Logger(config_path)
+
+
+def timed(label: str, run) -> float:
+    start = time.perf_counter()
+    rows = run()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed * 1000:9.1f} ms  ({rows} wierszy)")
+    return elapsed
+
+
+def main() -> None:
+    log_dir = tempfile.mkdtemp(prefix="bench_columnar_")
+    try:
+        logger = make_logger(log_dir)
+        logger.start()
+        rng = random.Random(1)
+        for i in range(ROWS):
+            logger.log_reading(f"S{i % SENSORS:03d}", START + timedelta(milliseconds=100 * i),
+                               round(rng.uniform(15, 30), 2), "°C")
+        logger.stop()
+        with redirect_stdout(StringIO()):
+            logger._archive()
+
+        archive_dir = os.path.join(log_dir, "archive")
+        zip_size = sum(os.path.getsize(os.path.join(archive_dir, name))
+                       for name in os.listdir(archive_dir) if name.endswith(".zip"))
+        columnar_size = logger.columnar.size_bytes()
+        print(f"{ROWS} odczytów, {SENSORS} czujników (NumPy: {'tak' if columnar.np is not None else 'nie'})")
+        print(f"  CSV+ZIP: {zip_size / 1024:.0f} KB, kolumnowy: {columnar_size / 1024:.0f} KB "
+              f"({zip_size / columnar_size:.1f}x mniej)")
+
+        end = START + timedelta(days=30)
+        window = (START + timedelta(hours=4), START + timedelta(hours=5))
+        print("Pełny skan:")
+        rows_time = timed("read_logs", lambda: sum(1 for _ in logger.read_logs(START, end)))
+        columns_time = timed("read_columns", lambda: len(logger.read_columns(START, end)["value"]))
+        print(f"  przyspieszenie: {rows_time / columns_time:.1f}x")
+        print("Jeden czujnik, 1 h:")
+        rows_time = timed("read_logs", lambda: sum(1 for _ in logger.read_logs(*window, "S007")))
+        columns_time = timed("read_columns", lambda: len(logger.read_columns(*window, "S007")["value"]))
+        print(f"  przyspieszenie: {rows_time / columns_time:.1f}x")
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
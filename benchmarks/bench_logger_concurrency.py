@@ -0,0 +1,89 @@
+# benchmarks/bench_logger_concurrency.py
+"""
+Przepustowość Logger.log_reading przy 1, 8 i 64 wątkach producentów.
+
+Porównuje tryb bezpośredni (zapis w wątku wywołującym pod blokadą) z trybem
+współbieżnym ("concurrent": true - kolejka i jeden wątek zapisujący).
+Po zatrzymaniu loggera liczy wiersze w pliku, aby potwierdzić, że żaden nie zginął.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_logger_concurrency
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from Logger import Logger
+
+READINGS = 256_000
+THREADS = (1, 8, 64)
+
+
+def count_rows(log_dir: str) -> int:
+    rows = 0
+    for name in os.listdir(log_dir):
+        if name.endswith(".csv"):
+            with open(os.path.join(log_dir, name), encoding="utf-8") as f:
+                rows += sum(1 for line in f if line.startswith("2025-"))
+    return rows
+
+
+def measure(concurrent: bool, threads: int) -> None:
+    log_dir = tempfile.mkdtemp(prefix="bench_concurrency_")
+    try:
+        config_path = os.path.join(log_dir, "config.json")
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "log_dir": log_dir,
+                "filename_pattern": "bench_%Y%m%d.csv",
+                "buffer_size": 200,
+                "rotate_every_hours": 24,
+                "max_size_mb": 1024,
+                "rotate_after_lines": READINGS * 2,
+                "retention_days": 30,
+                "concurrent": concurrent
+            }, f)
+        logger = Logger(config_path)
+        logger.start()
+        timestamp = datetime(2025, 6, 3, 15, 43, 23, 51336)
+        per_thread = READINGS // threads
+        barrier = threading.Barrier(threads + 1)
+
+        def produce(sensor_id: str) -> None:
+            barrier.wait()
+            for _ in range(per_thread):
+                logger.log_reading(sensor_id, timestamp, 21.37, "°C")
+
+        workers = [threading.Thread(target=produce, args=(f"T{i:03d}",)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        produced = time.perf_counter() - start
+        logger.stop()
+        total = time.perf_counter() - start
+
+        written = count_rows(log_dir)
+        mode = "współbieżny" if concurrent else "bezpośredni"
+        print(f"  {mode:<12} {threads:>3} wątków: producenci {per_thread * threads / produced / 1e3:7.1f} tys./s, "
+              f"z zapisem {per_thread * threads / total / 1e3:7.1f} tys./s, "
+              f"zapisane {written}/{per_thread * threads}")
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+def main() -> None:
+    print(f"log_reading x {READINGS}:")
+    for threads in THREADS:
+        measure(False, threads)
+        measure(True, threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_logger_rotation.py
+"""
+Koszt Logger.log_reading na wiersz: dawne sprawdzanie rotacji (os.path.exists,
+os.path.getsize i datetime.now() przy każdym odczycie) kontra liczniki
+aktualizowane przy zapisie bufora i termin rotacji wyliczony w start().
+
+Przy 100 tys. odczytów/s budżet na jeden wiersz to 10 µs.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_logger_rotation
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from Logger import Logger
+
+READINGS = 200_000
+TARGET_RATE = 100_000  # odczytów/s
+
+
+class LegacyRotationLogger(Logger):
+    """Logger z dawną implementacją _should_rotate (dla porównania)."""
+
+    def _should_rotate(self):
+        if self.current_file_start_time and (
+                datetime.now() - self.current_file_start_time >= timedelta(hours=self.rotate_every_hours)):
+            return True
+        if self.current_file_path and os.path.exists(self.current_file_path):
+            size_mb = os.path.getsize(self.current_file_path) / (1024 * 1024)
+            if size_mb >= self.max_size_mb:
+                return True
+        if self.current_lines >= self.rotate_after_lines:
+            return True
+        return False
+
+
+def measure(label: str, logger_class) -> None:
+    log_dir = tempfile.mkdtemp(prefix="bench_rotation_")
+    try:
+        config_path = os.path.join(log_dir, "config.json")
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "log_dir": log_dir,
+                "filename_pattern": "bench_%Y%m%d.csv",
+                "buffer_size": 200,
+                "rotate_every_hours": 24,
+                "max_size_mb": 1024,
+                "rotate_after_lines": READINGS * 2,
+                "retention_days": 30
+            }, f)
+        logger = logger_class(config_path)
+        logger.start()
+        timestamp = datetime(2025, 6, 3, 15, 43, 23, 51336)
+
+        start = time.perf_counter()
+        for i in range(READINGS):
+            logger.log_reading("T001", timestamp, 21.37, "°C")
+        elapsed = time.perf_counter() - start
+        logger.stop()
+
+        per_row_us = elapsed / READINGS * 1e6
+        verdict = "tak" if per_row_us <= 1e6 / TARGET_RATE else "nie"
+        print(f"  {label:<26} {per_row_us:6.2f} µs/wiersz  {READINGS / elapsed / 1e3:7.1f} tys./s  "
+              f"(100 tys./s: {verdict})")
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+def main() -> None:
+    print(f"log_reading x {READINGS}:")
+    measure("stat() przy każdym odczycie", LegacyRotationLogger)
+    measure("liczniki + termin rotacji", Logger)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_parallel_read.py
+"""
+Skan historyczny: Logger.read_logs kontra read_logs_parallel (ProcessPoolExecutor
+i scalanie k-way) dla DAYS archiwów ZIP po ROWS_PER_DAY odczytów - jak okno
+retencji 30 dni.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_parallel_read
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from io import StringIO
+
+from Logger import Logger
+
+DAYS = 30
+ROWS_PER_DAY = 20_000
+START = datetime(2025, 5, 1)
+
+
+def make_logger(log_dir: str) -> Logger:
+    config_path = os.path.join(log_dir, "config.json")
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "log_dir": log_dir,
+            "filename_pattern": "bench_%Y%m%d.csv",
+            "buffer_size": 1000,
+            "rotate_every_hours": 24 * 365,
+            "max_size_mb": 1024,
+            "rotate_after_lines": ROWS_PER_DAY,
+            "retention_days": 36500
+        }, f)
+    return Logger(config_path)
+
+
+def timed(label: str, run) -> None:
+    start = time.perf_counter()
+    rows = run()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<30} {elapsed:7.2f} s  {rows / elapsed / 1e3:8.1f} tys. wierszy/s")
+
+
+def main() -> None:
+    log_dir = tempfile.mkdtemp(prefix="bench_parallel_")
+    try:
+        logger = make_logger(log_dir)
+        with redirect_stdout(StringIO()):  # komunikaty rotacji
+            logger.start()
+            step = timedelta(days=1) / ROWS_PER_DAY
+            for i in range(DAYS * ROWS_PER_DAY):
+                logger.log_reading(f"S{i % 16:02d}", START + step * i, 20.0 + i % 10, "°C")
+            logger.stop()
+
+        end = START + timedelta(days=DAYS)
+        print(f"{DAYS} archiwów x {ROWS_PER_DAY} wierszy, rdzenie: {os.cpu_count()}")
+        timed("read_logs", lambda: sum(1 for _ in logger.read_logs(START, end)))
+        for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+            timed(f"read_logs_parallel ({workers} proc.)",
+                  lambda: sum(1 for _ in logger.read_logs_parallel(START, end, workers=workers)))
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
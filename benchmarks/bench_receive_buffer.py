@@ -0,0 +1,93 @@
+# benchmarks/bench_receive_buffer.py
+"""
+Mikrobenchmark ścieżki odbiorczej serwera: dzielenie strumienia na linie.
+
+Porównuje dawną pętlę z NetworkServer._handle_client (buffer += data,
+buffer.split(b"\\n", 1)) z ReceiveBuffer (recv_into + skanowanie od przesunięcia)
+dla paczek 1 KB, 64 KB i 1 MB.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_receive_buffer
+"""
+import json
+import time
+from datetime import datetime
+
+from server.buffer import ReceiveBuffer
+
+BURSTS = {"1 KB": 1024, "64 KB": 64 * 1024, "1 MB": 1024 * 1024}
+TOTAL_BYTES = 16 * 1024 * 1024  # ilość danych na jeden pomiar
+
+
+class FakeSocket:
+    """Gniazdo w pamięci: każde recv zwraca co najwyżej `chunk` bajtów ze strumienia."""
+
+    def __init__(self, stream: bytes, chunk: int):
+        self._view = memoryview(stream)
+        self._pos = 0
+        self._chunk = chunk
+
+    def recv(self, size: int) -> bytes:
+        size = min(size, self._chunk, len(self._view) - self._pos)
+        data = bytes(self._view[self._pos:self._pos + size])
+        self._pos += size
+        return data
+
+    def recv_into(self, buffer) -> int:
+        size = min(len(buffer), self._chunk, len(self._view) - self._pos)
+        buffer[:size] = self._view[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+
+def make_burst(size: int) -> bytes:
+    line = (json.dumps({
+        "sensor_id": "T001",
+        "timestamp": datetime(2025, 6, 3, 15, 43, 23, 51336).isoformat(),
+        "value": 21.37,
+        "unit": "°C"
+    }) + "\n").encode()
+    return line * max(1, size // len(line))
+
+
+def legacy_loop(sock, recv_size: int) -> int:
+    """Dawna pętla z _handle_client (bez dekodowania JSON)."""
+    lines = 0
+    buffer = b""
+    while True:
+        data = sock.recv(recv_size)
+        if not data:
+            return lines
+        buffer += data
+        while b"\n" in buffer:
+            message_part, buffer = buffer.split(b"\n", 1)
+            lines += 1
+
+
+def receive_buffer_loop(sock) -> int:
+    lines = 0
+    buffer = ReceiveBuffer()
+    while buffer.recv_into(sock):
+        lines += len(buffer.pop_lines())
+    return lines
+
+
+def measure(label: str, burst: bytes, run) -> None:
+    stream = burst * max(1, TOTAL_BYTES // len(burst))
+    start = time.perf_counter()
+    lines = run(stream)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {len(stream) / elapsed / 1e6:8.1f} MB/s  {lines / elapsed / 1e3:9.1f} tys. linii/s")
+
+
+def main() -> None:
+    for name, size in BURSTS.items():
+        burst = make_burst(size)
+        print(f"Paczka {name} ({len(burst)} B w jednym recv):")
+        measure("split, recv(4096)", burst, lambda s: legacy_loop(FakeSocket(s, len(burst)), 4096))
+        measure("split, recv(paczka)", burst, lambda s: legacy_loop(FakeSocket(s, len(burst)), len(burst)))
+        measure("ReceiveBuffer.recv_into", burst, lambda s: receive_buffer_loop(FakeSocket(s, len(burst))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_scheduler.py
+"""
+Dokładność odczytów w czasie: pętla "odczytaj wszystko, potem time.sleep(okres)"
+(jak dawny main.py) kontra SensorScheduler z terminami bezwzględnymi, oraz
+opóźnienia SensorScheduler przy SENSORS czujnikach o różnych częstotliwościach.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_scheduler
+"""
+import time
+
+from Sensors.Sensor import Sensor
+from Sensors.SensorScheduler import SensorScheduler
+
+PERIOD = 0.01
+DURATION = 3.0
+SENSORS = 5000
+LOOP_COST = 0.002  # symulowany koszt odczytów i callbacków w jednym obiegu
+
+
+def lockstep() -> None:
+    sensor = Sensor("T001", "Temperature", "°C", -20, 50, frequency=PERIOD)
+    start = time.monotonic()
+    reads = 0
+    while time.monotonic() - start < DURATION:
+        sensor.read_value()
+        time.sleep(LOOP_COST)
+        reads += 1
+        time.sleep(sensor.frequency)
+    expected = DURATION / PERIOD
+    drift = (expected - reads) * PERIOD
+    print(f"  pętla z time.sleep:  {reads} odczytów z {expected:.0f} oczekiwanych, dryf {drift:.2f} s")
+
+
+def scheduled() -> None:
+    scheduler = SensorScheduler()
+    scheduler.add(Sensor("T001", "Temperature", "°C", -20, 50, frequency=PERIOD))
+    scheduler.register_batch_callback(lambda records: time.sleep(LOOP_COST))
+    scheduler.run(DURATION)
+    stats = scheduler.stats()["T001"]
+    print(f"  SensorScheduler:     {stats['reads']} odczytów z {DURATION / PERIOD:.0f} oczekiwanych, "
+          f"opóźnienie śr. {stats['late_mean_ms']:.3f} ms, maks. {stats['late_max_ms']:.3f} ms")
+
+
+def fleet() -> None:
+    scheduler = SensorScheduler()
+    for i in range(SENSORS):
+        period = (0.1, 0.25, 0.5, 1.0)[i % 4]
+        scheduler.add(Sensor(f"S{i:05d}", "Sensor", "x", 0, 100, frequency=period), offset=i % 97 / 1000)
+    scheduler.run(DURATION)
+    stats = list(scheduler.stats().values())
+    reads = sum(s["reads"] for s in stats)
+    mean = sum(s["late_mean_ms"] * s["reads"] for s in stats) / reads
+    worst = max(s["late_max_ms"] for s in stats)
+    skipped = sum(s["skipped"] for s in stats)
+    print(f"  {SENSORS} czujników:     {reads} odczytów, opóźnienie śr. {mean:.3f} ms, "
+          f"maks. {worst:.2f} ms, pominięte takty {skipped}")
+
+
+def main() -> None:
+    print(f"Okres {PERIOD * 1000:.0f} ms, koszt obiegu {LOOP_COST * 1000:.0f} ms, {DURATION:.0f} s:")
+    lockstep()
+    scheduled()
+    fleet()
+
+
+if __name__ == "__main__":
+    main()
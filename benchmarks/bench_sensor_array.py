@@ -0,0 +1,55 @@
+# benchmarks/bench_sensor_array.py
+"""
+Krok symulacji floty STATIONS stacji (temperatura, wilgotność, światło, AQI):
+pętla po obiektach Sensors/* (read_value() dla każdego czujnika) kontra
+SensorArray.step() - jedna seria operacji NumPy na całej flocie.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_sensor_array
+"""
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from Sensors.AirQualitySensor import AirQualitySensor
+from Sensors.HumiditySensor import HumiditySensor
+from Sensors.LightSensor import LightSensor
+from Sensors.SensorArray import SensorArray
+from Sensors.TemperatureSensor import TemperatureSensor
+
+STATIONS = 10_000
+STEPS = 20
+
+
+def timed(label: str, steps: int, run) -> float:
+    start = time.perf_counter()
+    for _ in range(steps):
+        run()
+    elapsed = (time.perf_counter() - start) / steps
+    print(f"  {label:<34} {elapsed * 1e3:8.2f} ms/krok  {STATIONS * 4 / elapsed / 1e6:7.2f} mln odczytów/s")
+    return elapsed
+
+
+def main() -> None:
+    with redirect_stdout(StringIO()):  # komunikaty konstruktorów
+        sensors = []
+        for i in range(STATIONS):
+            temperature = TemperatureSensor(f"T{i:05d}", time_of_day="day")
+            sensors += [temperature, HumiditySensor(f"H{i:05d}", temperature),
+                        LightSensor(f"L{i:05d}", time_of_day="day"), AirQualitySensor(f"AQ{i:05d}")]
+    fleet = SensorArray(STATIONS, time_of_day="day", seed=1)
+
+    def read_objects():
+        with redirect_stdout(StringIO()):  # komunikaty o skokach AQI
+            for sensor in sensors:
+                sensor.read_value()
+
+    print(f"{STATIONS} stacji x 4 czujniki:")
+    loop = timed("read_value() po obiektach", STEPS, read_objects)
+    vector = timed("SensorArray.step()", STEPS, fleet.step)
+    timed("SensorArray.read_batch() (krotki)", STEPS, fleet.read_batch)
+    print(f"  przyspieszenie step(): {loop / vector:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,19 @@ from tkinter import ttk, messagebox
 import threading
 import json
 import os
-from datetime import datetime, timedelta
-from collections import defaultdict, deque
+import queue
+import time
+from datetime import datetime
+from collections import defaultdict
 from server.server import NetworkServer
+from gui.windowed import WindowedAverage
 
 
 class ServerGUI:
+    REFRESH_MS = 3000
+    POLL_MS = 100  # co ile ms wątek Tk pobiera odczyty z kolejki
+    AVERAGES_REFRESH_S = 60  # co tyle sekund odświeżane są średnie także czujników bez nowych odczytów
+
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Network Server GUI")
@@ -23,14 +30,29 @@ class ServerGUI:
             'last_value': 0.0,
             'unit': '',
             'timestamp': '',
-            'history': deque(maxlen=1000)  # Bufor na ostatnie 1000 odczytów
+            # Średnie kroczące w stałej pamięci (przedziały 10 s i 2 min)
+            'avg_1h': WindowedAverage(3600),
+            'avg_12h': WindowedAverage(12 * 3600)
         })
 
+        # Wiersze tabeli aktualizowane przyrostowo: czujnik -> element Treeview
+        # (oraz ostatnio wyświetlone wartości); zmienione czujniki trafiają do zbioru dirty
+        self.tree_items = {}
+        self.displayed_values = {}
+        self.dirty_sensors = set()
+        self.last_full_refresh = time.monotonic()
+
+        # Wątki serwera tylko wrzucają partie odczytów do kolejki; stan czujników
+        # zmienia wyłącznie wątek Tk (poll_readings), partiami
+        self.readings = queue.SimpleQueue()
+
         # Wczytaj konfigurację
         self.config = self.load_config()
+        self.max_items_per_tick = self.config.get('max_items_per_tick', 5000)
 
         self.setup_ui()
         self.update_sensor_display()
+        self.poll_readings()
 
     def setup_ui(self):
         """Tworzy interfejs użytkownika."""
@@ -95,7 +117,7 @@ class ServerGUI:
 
             # Utwórz serwer z callbackiem
             self.server = NetworkServer(port=port)
-            self.server.on_data_received = self.on_sensor_data_received
+            self.server.sinks.append(self.enqueue_readings)
 
             self.server_thread = threading.Thread(target=self.run_server, daemon=True)
             self.server_thread.start()
@@ -129,65 +151,88 @@ class ServerGUI:
         self.port_entry.config(state=tk.NORMAL)
         self.status_var.set("Serwer zatrzymany")
 
+    def enqueue_readings(self, messages):
+        """Ujście serwera (wątki sieciowe): przekazuje partię odczytów do wątku Tk."""
+        self.readings.put(messages)
+
     def on_sensor_data_received(self, data):
-        """Callback wywoływany gdy serwer otrzyma dane czujnika."""
-        sensor_id = data.get('sensor_id', 'unknown')
-        value = float(data.get('value', 0))
-        unit = data.get('unit', '')
-        timestamp = data.get('timestamp', datetime.now().isoformat())
-
-        # Aktualizuj dane czujnika
-        self.sensor_data[sensor_id].update({
-            'last_value': value,
-            'unit': unit,
-            'timestamp': timestamp
-        })
+        """Callback dla pojedynczego odczytu (dowolny wątek)."""
+        self.readings.put([data])
 
-        # Dodaj do historii
-        self.sensor_data[sensor_id]['history'].append({
-            'value': value,
-            'timestamp': datetime.fromisoformat(timestamp)
-        })
+    def poll_readings(self):
+        """Pobiera z kolejki co najwyżej max_items_per_tick odczytów i przetwarza je partią."""
+        messages = []
+        try:
+            while len(messages) < self.max_items_per_tick:
+                messages.extend(self.readings.get_nowait())
+        except queue.Empty:
+            pass
+        if messages:
+            self.apply_readings(messages)
+
+        # Zaległości: kolejna porcja zaraz, ale po obsłudze zdarzeń okna
+        self.root.after(1 if not self.readings.empty() else self.POLL_MS, self.poll_readings)
+
+    def apply_readings(self, messages):
+        """Aktualizuje stan czujników (wątek Tk)."""
+        sensor_data = self.sensor_data
+        for data in messages:
+            try:
+                sensor_id = data.get('sensor_id', 'unknown')
+                value = float(data.get('value', 0))
+                timestamp = data.get('timestamp') or datetime.now().isoformat()
+                reading_time = datetime.fromisoformat(timestamp).timestamp()
+            except (AttributeError, TypeError, ValueError):
+                continue
+
+            sensor = sensor_data[sensor_id]
+            sensor['last_value'] = value
+            sensor['unit'] = data.get('unit', '')
+            sensor['timestamp'] = timestamp
+            # Dodaj do średnich kroczących
+            sensor['avg_1h'].add(reading_time, value)
+            sensor['avg_12h'].add(reading_time, value)
+            self.dirty_sensors.add(sensor_id)
 
     def calculate_averages(self, sensor_id):
-        """Oblicza średnie wartości dla czujnika."""
-        history = self.sensor_data[sensor_id]['history']
-        now = datetime.now()
-
-        # Średnia z 1 godziny
-        hour_ago = now - timedelta(hours=1)
-        hour_values = [item['value'] for item in history
-                       if item['timestamp'] >= hour_ago]
-        avg_1h = sum(hour_values) / len(hour_values) if hour_values else 0
-
-        # Średnia z 12 godzin
-        twelve_hours_ago = now - timedelta(hours=12)
-        twelve_hour_values = [item['value'] for item in history
-                              if item['timestamp'] >= twelve_hours_ago]
-        avg_12h = sum(twelve_hour_values) / len(twelve_hour_values) if twelve_hour_values else 0
-
-        return avg_1h, avg_12h
+        """Oblicza średnie wartości dla czujnika (O(1) - bez przeglądania historii)."""
+        data = self.sensor_data[sensor_id]
+        now = time.time()
+        avg_1h = data['avg_1h'].average(now)
+        avg_12h = data['avg_12h'].average(now)
+        return avg_1h or 0, avg_12h or 0
 
     def update_sensor_display(self):
-        """Aktualizuje wyświetlanie tabeli czujników."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # Dodaj aktualne dane czujników
-        for sensor_id, data in self.sensor_data.items():
+        """
+        Aktualizuje tabelę czujników przyrostowo: tylko wiersze czujników z nowymi odczytami
+        (zbiór dirty), a rzadziej wszystkie - aby wygasały średnie czujników bez odczytów.
+        """
+        dirty, self.dirty_sensors = self.dirty_sensors, set()
+        if time.monotonic() - self.last_full_refresh >= self.AVERAGES_REFRESH_S:
+            dirty.update(self.tree_items)
+            self.last_full_refresh = time.monotonic()
+
+        for sensor_id in dirty:
+            data = self.sensor_data[sensor_id]
             avg_1h, avg_12h = self.calculate_averages(sensor_id)
-
-            self.tree.insert('', tk.END, values=(
+            values = (
                 sensor_id,
                 f"{data['last_value']:.2f}",
                 data['unit'],
                 data['timestamp'][:19] if data['timestamp'] else '',  # Tylko data i czas
                 f"{avg_1h:.2f}",
                 f"{avg_12h:.2f}"
-            ))
+            )
+
+            item = self.tree_items.get(sensor_id)
+            if item is None:
+                self.tree_items[sensor_id] = self.tree.insert('', tk.END, values=values)
+            elif self.displayed_values.get(sensor_id) != values:
+                self.tree.item(item, values=values)
+            self.displayed_values[sensor_id] = values
 
         # Zaplanuj kolejną aktualizację za 3 sekundy
-        self.root.after(3000, self.update_sensor_display)
+        self.root.after(self.REFRESH_MS, self.update_sensor_display)
 
     def show_server_error(self, error_msg):
         """Pokazuje błąd serwera."""
@@ -207,8 +252,9 @@ class ServerGUI:
     def save_config(self, config):
         """Zapisuje konfigurację do pliku."""
         try:
+            merged = dict(self.config, **config)  # zachowaj pozostałe klucze (np. max_items_per_tick)
             with open('gui_config.json', 'w') as f:
-                json.dump(config, f)
+                json.dump(merged, f)
             self.config.update(config)
         except Exception as e:
             print(f"Nie udało się zapisać konfiguracji: {e}")
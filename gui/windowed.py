@@ -0,0 +1,60 @@
+from typing import Optional
+
+
+class WindowedAverage:
+    """
+    Średnia krocząca z okna czasowego w stałej pamięci: pierścień przedziałów
+    (liczba i suma odczytów) z bieżącymi sumami całego okna.
+
+    add() i average() kosztują O(1) (zamortyzowane - przesunięcie pierścienia
+    zeruje wygasłe przedziały). Granica okna jest dokładna z rozdzielczością
+    jednego przedziału (window / buckets), niezależnie od częstotliwości odczytów.
+    """
+
+    def __init__(self, window: float, buckets: int = 360):
+        """
+        :param window: Długość okna w sekundach
+        :param buckets: Liczba przedziałów pierścienia
+        """
+        self.window = window
+        self.bucket_width = window / buckets
+        self._counts = [0] * buckets
+        self._sums = [0.0] * buckets
+        self._head = None  # numer najnowszego przedziału (czas / bucket_width)
+        self.count = 0
+        self.total = 0.0
+
+    def _advance(self, bucket: int) -> None:
+        """Przesuwa pierścień do przedziału `bucket`, odejmując przedziały, które wypadły z okna."""
+        if self._head is None:
+            self._head = bucket
+            return
+        if bucket <= self._head:
+            return
+        size = len(self._counts)
+        for number in range(self._head + 1, self._head + 1 + min(bucket - self._head, size)):
+            index = number % size
+            self.count -= self._counts[index]
+            self.total -= self._sums[index]
+            self._counts[index] = 0
+            self._sums[index] = 0.0
+        self._head = bucket
+        if self.count == 0:
+            self.total = 0.0  # bez kumulacji błędów zaokrągleń
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Dodaje odczyt (timestamp - sekundy epoki). Odczyty starsze niż okno są pomijane."""
+        bucket = int(timestamp // self.bucket_width)
+        self._advance(bucket)
+        if bucket <= self._head - len(self._counts):
+            return
+        index = bucket % len(self._counts)
+        self._counts[index] += 1
+        self._sums[index] += value
+        self.count += 1
+        self.total += value
+
+    def average(self, now: float) -> Optional[float]:
+        """Zwraca średnią z okna kończącego się w `now` (None - brak odczytów)."""
+        self._advance(int(now // self.bucket_width))
+        return self.total / self.count if self.count else None
@@ -2,10 +2,9 @@ from Sensors.LightSensor import LightSensor
 from Sensors.TemperatureSensor import TemperatureSensor
 from Sensors.HumiditySensor import HumiditySensor
 from Sensors.AirQualitySensor import AirQualitySensor
+from Sensors.SensorScheduler import SensorScheduler
 from Logger import Logger
-from datetime import datetime, timedelta
 from network.client import NetworkClient
-import time
 import random
 
 def main():
@@ -25,37 +24,31 @@ def main():
     client = NetworkClient(logger=logger)
     client.keep_alive = True
     client.connect()
+    # Wysyłka w osobnym wątku - odczyty czujników nie czekają na sieć
+    # (nadmiar i niewysłane odczyty trafiają do trwałej kolejki outbox)
+    client.start_background(queue_size=10000, overflow="spill" if client.outbox else "drop_oldest")
 
-    # Rejestracja callbacku sieciowego
-    def send_to_network(sensor_id: str, timestamp: datetime, value: float, unit: str):
-        data = {
-            "sensor_id": sensor_id,
-            "timestamp": timestamp.isoformat(),
-            "value": value,
-            "unit": unit
-        }
-        client.send(data)
+    # Harmonogram: każdy czujnik odczytywany z własną częstotliwością (sensor.frequency)
+    # w bezwzględnych terminach; odczyty z tego samego terminu trafiają do callbacków jedną partią
+    scheduler = SensorScheduler(policy="skip")
+    for sensor in (temp_sensor, humidity_sensor, light_sensor, air_quality_sensor):
+        scheduler.add(sensor)
+    scheduler.register_batch_callback(client.send_readings)
+    scheduler.register_batch_callback(logger.log_readings)
 
-    temp_sensor.register_callback(send_to_network)
-    humidity_sensor.register_callback(send_to_network)
-    light_sensor.register_callback(send_to_network)
-    air_quality_sensor.register_callback(send_to_network)
+    def print_readings(records):
+        print(" | ".join(f"{sensor_id}: {value:.2f} {unit}" for sensor_id, _, value, unit in records))
 
-    # Rejestracja callbacków loggera
-    temp_sensor.register_callback(logger.log_reading)
-    humidity_sensor.register_callback(logger.log_reading)
-    light_sensor.register_callback(logger.log_reading)
-    air_quality_sensor.register_callback(logger.log_reading)
+    scheduler.register_batch_callback(print_readings)
 
     print("Symulacja odczytów czujników:")
-    for _ in range(10):
-        temp = temp_sensor.read_value()
-        hum = humidity_sensor.read_value()
-        light = light_sensor.read_value()
-        air_quality = air_quality_sensor.read_value()
-        print(f"{temp_sensor.name}: {temp:.2f} {temp_sensor.unit} | {humidity_sensor.name}: {hum:.2f} {humidity_sensor.unit}")
-        print(f"{light_sensor.name}: {light:.2f} {light_sensor.unit} | {air_quality_sensor.name}: {air_quality:.2f} {air_quality_sensor.unit}")
-        time.sleep(temp_sensor.frequency)
+    scheduler.run(duration=10 * temp_sensor.frequency)
+    print(scheduler.stats())
+
+    # Wysłanie zaległych danych i zamknięcie połączenia sieciowego - przed loggerem,
+    # aby komunikaty wątku wysyłającego z opróżniania kolejki trafiły jeszcze do logu
+    client.stop_background()
+    client.close()
 
     # Zamknięcie loggera
     logger.stop()
@@ -70,8 +63,5 @@ def main():
         print(entry)
     '''
 
-    # Zamknięcie połączenia sieciowego
-    client.close()
-
 if __name__ == "__main__":
     main()
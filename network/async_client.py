@@ -0,0 +1,293 @@
+import asyncio
+import json
+import random
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from .client import records_to_messages
+from .config import load_config
+from .protocol import HELLO, ACK, FRAME_ACK, FRAME_HEADER, BinaryEncoder, parse_hello_reply
+
+
+class AsyncNetworkClient:
+    """
+    Klient sieciowy oparty na strumieniach asyncio - ten sam protokół co NetworkClient
+    (linie JSON z polem 'seq' lub ramki binarne, skumulowane ACK).
+
+    Wiele korutyn może wywoływać send()/send_many() jednocześnie na jednym połączeniu:
+    wiadomości dostają kolejne numery sekwencyjne, a osobne zadanie odczytujące ACK
+    kończy oczekiwania wszystkich potwierdzonych wiadomości. W locie jest najwyżej
+    `window` niepotwierdzonych wiadomości. Po utracie połączenia klient łączy się
+    ponownie z wykładniczym odstępem (backoff) i wysyła jeszcze raz niepotwierdzone
+    wiadomości (co najmniej raz).
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, timeout: float = 5.0, retries: int = 3,
+                 logger=None, config_path: str = "config.yaml", window: int = 64, protocol: str = "json",
+                 backoff: float = 0.5, max_backoff: float = 30.0):
+        """
+        :param timeout: Limit czasu połączenia i oczekiwania na ACK (sekundy)
+        :param retries: Liczba prób połączenia przed zgłoszeniem błędu
+        :param window: Maksymalna liczba niepotwierdzonych wiadomości w locie
+        :param protocol: "json" lub "binary" (negocjowany z serwerem, z powrotem do JSON)
+        :param backoff: Odstęp przed pierwszym ponowieniem połączenia (podwajany, z losowym rozrzutem)
+        :param max_backoff: Maksymalny odstęp między próbami połączenia
+        """
+        if host is None or port is None:
+            config = load_config(config_path)
+            self.host = config["host"]
+            self.port = config["port"]
+            self.timeout = config["timeout"]
+            self.retries = config["retries"]
+            self.window = config.get("window", window)
+            protocol = config.get("protocol", protocol)
+        else:
+            self.host = host
+            self.port = port
+            self.timeout = timeout
+            self.retries = retries
+            self.window = window
+        self.protocol = protocol
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.logger = logger
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._encoder: Optional[BinaryEncoder] = None
+        self._ack_task: Optional[asyncio.Task] = None
+        self._connecting: Optional[asyncio.Task] = None
+        self._window: Optional[asyncio.Semaphore] = None  # tworzony w pętli zdarzeń (connect)
+        self._in_flight = OrderedDict()  # seq -> (dane, future)
+        self._next_seq = 0
+        self._closed = False
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    async def connect(self) -> None:
+        """Nawiązuje połączenie (z ponowieniami i backoff); współbieżne wywołania czekają na tę samą próbę."""
+        if self._window is None:
+            self._window = asyncio.Semaphore(self.window)
+        self._closed = False
+        if self._writer is not None:
+            return
+        if self._connecting is None or self._connecting.done():
+            self._connecting = asyncio.ensure_future(self._connect_with_backoff())
+        await asyncio.shield(self._connecting)
+
+    async def _connect_with_backoff(self) -> None:
+        delay = self.backoff
+        for attempt in range(1, self.retries + 1):
+            try:
+                await self._open()
+                return
+            except (OSError, asyncio.TimeoutError, ConnectionError, ValueError) as e:
+                if self.logger:
+                    self.logger.error(f"Błąd połączenia z {self.host}:{self.port} (próba {attempt}): {e}")
+                if attempt == self.retries or self._closed:
+                    raise ConnectionError(f"Nie udało się połączyć z {self.host}:{self.port}: {e}") from e
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, self.max_backoff)
+
+    async def _open(self) -> None:
+        if self.logger:
+            self.logger.info(f"Łączenie z {self.host}:{self.port}...")
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        encoder = None
+        try:
+            if self.protocol == "binary":
+                writer.write(HELLO)
+                reply = await asyncio.wait_for(reader.readline(), self.timeout)
+                if not reply:
+                    raise ConnectionError("Serwer zamknął połączenie")
+                if parse_hello_reply(reply):
+                    encoder = BinaryEncoder()
+                elif self.logger:
+                    self.logger.info("Serwer nie obsługuje protokołu binarnego - używam JSON.")
+        except BaseException:
+            writer.close()
+            raise
+
+        self._reader, self._writer, self._encoder = reader, writer, encoder
+        self._ack_task = asyncio.ensure_future(self._read_acks(reader))
+        if self.logger:
+            self.logger.info("Połączenie nawiązane.")
+
+        # Po ponownym połączeniu wyślij jeszcze raz wszystko, co nie zostało potwierdzone
+        if self._in_flight:
+            writer.write(self._encode_batch([(seq, data) for seq, (data, _) in self._in_flight.items()]))
+            await writer.drain()
+
+    async def send(self, data: dict, timeout: Optional[float] = None) -> bool:
+        """Wysyła wiadomość i czeka na jej potwierdzenie; False - brak ACK w czasie `timeout` lub błąd połączenia."""
+        return await self.send_many([data], timeout) == 1
+
+    async def send_many(self, items: Iterable[dict], timeout: Optional[float] = None) -> int:
+        """
+        Wysyła wiadomości potokowo (w ramach okna) i czeka na ich potwierdzenie.
+        Zwraca liczbę potwierdzonych wiadomości. Anulowanie korutyny porzuca oczekiwanie
+        na niepotwierdzone wiadomości i zwalnia ich miejsce w oknie.
+
+        :param timeout: Limit czasu oczekiwania na potwierdzenia (None - self.timeout)
+        """
+        if self._window is None:
+            self._window = asyncio.Semaphore(self.window)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.timeout if timeout is None else timeout)
+        futures = []
+        try:
+            chunk = []
+            for data in items:
+                if self._window.locked() and chunk:  # okno pełne - wyślij to, co już jest, zanim zaczniesz czekać
+                    await self._write(chunk)
+                    chunk = []
+                if not self._window.locked():
+                    await self._window.acquire()
+                else:
+                    try:
+                        await asyncio.wait_for(self._window.acquire(), max(0.0, deadline - loop.time()))
+                    except asyncio.TimeoutError:
+                        break
+                future = loop.create_future()
+                future.add_done_callback(self._release_window)
+                self._next_seq += 1
+                self._in_flight[self._next_seq] = (data, future)
+                chunk.append((self._next_seq, data))
+                futures.append((self._next_seq, future))
+            if chunk:
+                await self._write(chunk)
+
+            if futures:
+                await asyncio.wait([future for _, future in futures], timeout=max(0.0, deadline - loop.time()))
+        finally:
+            for seq, future in futures:
+                if not future.done():
+                    self._in_flight.pop(seq, None)
+                    future.cancel()
+        return sum(1 for _, future in futures if not future.cancelled() and future.result())
+
+    async def send_readings(self, records: List[tuple]) -> int:
+        """Konsument partii (register_batch_callback): krotki (sensor_id, timestamp, value, unit)."""
+        return await self.send_many(records_to_messages(records))
+
+    async def _write(self, chunk: list) -> None:
+        """Wysyła wiadomości; bez połączenia najpierw się łączy (wtedy _open wyśle je z kolejki w locie)."""
+        if self._writer is None:
+            try:
+                await self.connect()
+            except ConnectionError:
+                self._fail_in_flight()
+            return
+        try:
+            self._writer.write(self._encode_batch(chunk))
+            await self._writer.drain()
+        except (ConnectionError, OSError) as e:
+            self._connection_lost(e)
+
+    async def _read_acks(self, reader: asyncio.StreamReader) -> None:
+        """Zadanie odczytujące ACK: kończy oczekiwania na wiadomości objęte skumulowanym potwierdzeniem."""
+        try:
+            while True:
+                ack = await self._receive_ack(reader)
+                if ack.get("status") != "ok":
+                    raise ConnectionError(f"Serwer odrzucił wiadomość: {ack}")
+                self._release_acked(ack)
+        except asyncio.CancelledError:
+            raise
+        except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError) as e:
+            if reader is self._reader:
+                self._connection_lost(e)
+
+    async def _receive_ack(self, reader: asyncio.StreamReader) -> dict:
+        if self._encoder:
+            length, kind = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+            payload = await reader.readexactly(length - 1)
+            if kind != FRAME_ACK:
+                return {"status": "error"}
+            seq, count = ACK.unpack(payload)
+            return {"status": "ok", "ack": seq, "count": count}
+
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Serwer zamknął połączenie")
+        return json.loads(line.decode())
+
+    def _release_acked(self, ack: dict) -> None:
+        """Kończy oczekiwania wiadomości objętych ACK (jak NetworkClient._release_acked)."""
+        if "ack" not in ack:
+            # Starszy serwer potwierdza każdą wiadomość osobno i po kolei
+            if self._in_flight:
+                _, (_, future) = self._in_flight.popitem(last=False)
+                if not future.done():
+                    future.set_result(True)
+            return
+        while self._in_flight and next(iter(self._in_flight)) <= ack["ack"]:
+            _, (_, future) = self._in_flight.popitem(last=False)
+            if not future.done():
+                future.set_result(True)
+
+    def _release_window(self, _future) -> None:
+        self._window.release()
+
+    def _connection_lost(self, error: Exception) -> None:
+        """Zamyka zerwane połączenie i, jeśli są niepotwierdzone wiadomości, łączy się ponownie w tle."""
+        if self.logger:
+            self.logger.error(f"Utracono połączenie: {error}")
+        self._drop_connection()
+        if self._in_flight and not self._closed:
+            reconnect = asyncio.ensure_future(self.connect())
+            reconnect.add_done_callback(self._reconnect_done)
+
+    def _reconnect_done(self, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is not None:
+            self._fail_in_flight()
+
+    def _fail_in_flight(self) -> None:
+        """Kończy oczekiwania wszystkich niepotwierdzonych wiadomości wynikiem False."""
+        while self._in_flight:
+            _, (_, future) = self._in_flight.popitem(last=False)
+            if not future.done():
+                future.set_result(False)
+
+    def _drop_connection(self) -> None:
+        if self._ack_task and self._ack_task is not asyncio.current_task():
+            self._ack_task.cancel()
+        self._ack_task = None
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = self._encoder = None
+
+    async def close(self) -> None:
+        """Zamyka połączenie; niepotwierdzone wiadomości kończą się wynikiem False."""
+        self._closed = True
+        if self._connecting and not self._connecting.done():
+            self._connecting.cancel()
+        writer = self._writer
+        self._drop_connection()
+        self._fail_in_flight()
+        if writer is not None:
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            if self.logger:
+                self.logger.info("Połączenie zamknięte.")
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _encode_batch(self, entries: list) -> bytes:
+        """Koduje listę (seq, dane): jedna ramka binarna albo linie JSON z polem 'seq'."""
+        if self._encoder:
+            return self._encoder.encode(entries[-1][0], [data for _, data in entries])
+        return b"".join(self._serialize(dict(data, seq=seq)) for seq, data in entries)
+
+    @staticmethod
+    def _serialize(data: dict) -> bytes:
+        return (json.dumps(data) + "\n").encode("utf-8")
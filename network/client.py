@@ -1,29 +1,90 @@
 import socket
 from datetime import datetime
 import json
+import queue
+import threading
 import time
-from typing import Optional
+from collections import OrderedDict
+from functools import wraps
+from typing import Optional, Iterable
 from .config import load_config
+from .outbox import Outbox
+from .protocol import HELLO, ACK, FRAME_ACK, BinaryEncoder, parse_hello_reply, read_frame
+
+def records_to_messages(records: Iterable[tuple]) -> list:
+    """Zamienia partię krotek (sensor_id, timestamp, value, unit) na wiadomości (słowniki) do wysłania."""
+    items = []
+    last_timestamp = last_iso = None
+    for sensor_id, timestamp, value, unit in records:
+        if timestamp is not last_timestamp:  # partie mają zwykle wspólny znacznik czasu
+            last_timestamp, last_iso = timestamp, timestamp.isoformat()
+        items.append({"sensor_id": sensor_id, "timestamp": last_iso, "value": value, "unit": unit})
+    return items
+
+
+def _synchronized(method):
+    """Wykonuje metodę pod blokadą połączenia klienta (gniazdo, bufor odbioru, numery seq)."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class NetworkClient:
-    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, timeout: float = 5.0, retries: int = 3, logger=None, config_path: str = "config.yaml"):
-        """Inicjalizuje klienta sieciowego."""
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, timeout: float = 5.0, retries: int = 3, logger=None, config_path: str = "config.yaml", window: int = 64, outbox_dir: Optional[str] = None, outbox_max_mb: float = 100, protocol: str = "json"):
+        """
+        Inicjalizuje klienta sieciowego.
+        :param window: Maksymalna liczba niepotwierdzonych wiadomości w locie (send_many)
+        :param outbox_dir: Katalog trwałej kolejki na niewysłane wiadomości (None - brak)
+        :param outbox_max_mb: Limit miejsca na dysku dla trwałej kolejki
+        :param protocol: "json" lub "binary" (negocjowany z serwerem, z powrotem do JSON)
+        """
         if host is None or port is None:
             config = load_config(config_path)
             self.host = config["host"]
             self.port = config["port"]
             self.timeout = config["timeout"]
             self.retries = config["retries"]
+            self.window = config.get("window", window)
+            outbox_dir = config.get("outbox_dir", outbox_dir)
+            outbox_max_mb = config.get("outbox_max_mb", outbox_max_mb)
+            protocol = config.get("protocol", protocol)
         else:
             self.host = host
             self.port = port
             self.timeout = timeout
             self.retries = retries
+            self.window = window
+
+        # Trwała kolejka: wiadomości, których nie udało się wysłać, są odtwarzane po ponownym połączeniu
+        self.outbox: Optional[Outbox] = None
+        if outbox_dir:
+            self.outbox = Outbox(outbox_dir, max_bytes=int(outbox_max_mb * 1024 * 1024))
+        self._replaying = False
 
         self.socket: Optional[socket.socket] = None
         self.logger = logger
         self.keep_alive = False
+        self._recv_buffer = b""
+        self._next_seq = 0
+        self.protocol = protocol
+        self._encoder: Optional[BinaryEncoder] = None  # ustawiany po udanej negocjacji trybu binarnego
+        # Połączenie jest współdzielone przez wątek wywołujący (send) i wątek wysyłający (start_background):
+        # connect/send/send_many/flush_outbox/close wykonują się pod jedną blokadą (RLock - wywołują się nawzajem)
+        self._lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+
+        # Tryb asynchronicznego wysyłania (start_background/enqueue)
+        self._queue: Optional[queue.Queue] = None
+        self._sender_thread: Optional[threading.Thread] = None
+        self._sender_running = False
+        self.batch_size = 256
+        self.overflow = "block"
+        self.dropped = 0
+        self._next_replay = 0.0
 
+    @_synchronized
     def connect(self) -> None:
         """Nawiazuje połączenie z serwerem."""
         if self.socket:
@@ -40,11 +101,38 @@ class NetworkClient:
             self.socket.connect((self.host, self.port))
             if self.logger:
                 self.logger.info("Połączenie nawiązane.")
-        except (socket.timeout, ConnectionRefusedError) as e:
+        except OSError as e:  # także brak trasy (ENETUNREACH/EHOSTUNREACH) i błędy DNS (gaierror)
             if self.logger:
                 self.logger.error(f"Błąd połączenia: {str(e)}")
             raise
 
+        if self.protocol == "binary":
+            self._negotiate_binary()
+
+        # Po (ponownym) połączeniu najpierw wyślij zaległości z trwałej kolejki
+        if self.outbox and not self._replaying:
+            self.flush_outbox()
+            if not self.socket:
+                raise ConnectionError("Utracono połączenie podczas odtwarzania kolejki")
+
+    def _negotiate_binary(self) -> None:
+        """Proponuje serwerowi protokół binarny; przy braku zgody zostaje JSON."""
+        self.socket.sendall(HELLO)
+        self.socket.settimeout(self.timeout)
+        while b"\n" not in self._recv_buffer:
+            data = self.socket.recv(1024)
+            if not data:
+                raise ConnectionError("Serwer zamknął połączenie")
+            self._recv_buffer += data
+        line, self._recv_buffer = self._recv_buffer.split(b"\n", 1)
+        if parse_hello_reply(line):
+            self._encoder = BinaryEncoder()
+            if self.logger:
+                self.logger.info("Wynegocjowano protokół binarny.")
+        elif self.logger:
+            self.logger.info("Serwer nie obsługuje protokołu binarnego - używam JSON.")
+
+    @_synchronized
     def send(self, data: dict) -> bool:
         """Wysyła dane, utrzymując połączenie jeśli keep_alive=True."""
         attempt = 0
@@ -56,7 +144,11 @@ class NetworkClient:
                 if not self.socket:
                     self.connect()
 
-                payload = self._serialize(data)
+                if self._encoder:
+                    self._next_seq += 1
+                    payload = self._encode_batch([(self._next_seq, data)])
+                else:
+                    payload = self._serialize(data)
 
                 # Logowanie próby
                 if self.logger:
@@ -83,7 +175,7 @@ class NetworkClient:
                             additional_info={"level": "INFO", "message": "ACK otrzymany"}
                         )
 
-            except (ConnectionError, TimeoutError, json.JSONDecodeError) as e:
+            except (OSError, json.JSONDecodeError) as e:
                 # Zamknij połączenie przy błędzie i pozwól na ponowne połączenie
                 self.close()
                 if self.logger:
@@ -109,22 +201,305 @@ class NetworkClient:
                 unit="ERROR",
                 additional_info={"level": "ERROR", "message": "Wyczerpano limit prób"}
             )
+        if not success and self.outbox:
+            # Wiadomość nie ginie - zostanie wysłana po ponownym połączeniu
+            self.outbox.append([data])
         return success
 
+    @_synchronized
+    def send_many(self, items: Iterable[dict]) -> int:
+        """
+        Wysyła wiele wiadomości w trybie potokowym.
+
+        W locie utrzymywanych jest maksymalnie `window` niepotwierdzonych wiadomości.
+        Każda dostaje numer sekwencyjny (pole 'seq'), a serwer potwierdza je skumulowanym
+        ACK ({"status": "ok", "ack": <seq>}). Po błędzie połączenia niepotwierdzone
+        wiadomości są wysyłane ponownie (co najmniej raz).
+        Zwraca liczbę potwierdzonych wiadomości.
+        """
+        pending = iter(items)
+        in_flight = OrderedDict()  # seq -> dane
+        exhausted = False
+        acked = 0
+        attempt = 0
+
+        while True:
+            try:
+                if not self.socket:
+                    self.connect()
+                    # Po ponownym połączeniu wyślij jeszcze raz wszystko, co nie zostało potwierdzone
+                    if in_flight:
+                        self.socket.sendall(self._encode_batch(list(in_flight.items())))
+
+                # Uzupełnij okno i wyślij nowe wiadomości jednym wywołaniem sendall
+                chunk = []
+                while not exhausted and len(in_flight) < self.window:
+                    data = next(pending, None)
+                    if data is None:
+                        exhausted = True
+                        break
+                    self._next_seq += 1
+                    in_flight[self._next_seq] = data
+                    chunk.append((self._next_seq, data))
+                if chunk:
+                    self.socket.sendall(self._encode_batch(chunk))
+
+                if not in_flight:
+                    break
+
+                ack = self._receive_ack()
+                if ack.get("status") != "ok":
+                    raise ConnectionError(f"Serwer odrzucił wiadomość: {ack}")
+                acked += self._release_acked(in_flight, ack)
+                attempt = 0
+
+            except (OSError, json.JSONDecodeError) as e:
+                self.close()
+                attempt += 1
+                if self.logger:
+                    self.logger.log_reading(
+                        sensor_id="NETWORK",
+                        timestamp=datetime.now(),
+                        value=0,
+                        unit="ERROR",
+                        additional_info={"level": "ERROR", "message": f"Błąd wysyłania partii (próba {attempt}): {str(e)}"}
+                    )
+                if attempt >= self.retries:
+                    if self.logger:
+                        self.logger.log_reading(
+                            sensor_id="NETWORK",
+                            timestamp=datetime.now(),
+                            value=0,
+                            unit="ERROR",
+                            additional_info={"level": "ERROR", "message": f"Wyczerpano limit prób, niepotwierdzone: {len(in_flight)}"}
+                        )
+                    break
+                time.sleep(0.5)
+
+        if not self.keep_alive:
+            self.close()
+
+        if self.logger:
+            self.logger.log_reading(
+                sensor_id="NETWORK",
+                timestamp=datetime.now(),
+                value=0,
+                unit="STATUS",
+                additional_info={"level": "INFO", "message": f"Potwierdzono {acked} pakietów"}
+            )
+        return acked
+
+    @staticmethod
+    def _release_acked(in_flight: OrderedDict, ack: dict) -> int:
+        """Usuwa z okna wiadomości objęte ACK i zwraca ich liczbę."""
+        if "ack" not in ack:
+            # Starszy serwer potwierdza każdą wiadomość osobno i po kolei
+            in_flight.popitem(last=False)
+            return 1
+
+        released = 0
+        while in_flight and next(iter(in_flight)) <= ack["ack"]:
+            in_flight.popitem(last=False)
+            released += 1
+        return released
+
+    OVERFLOW_POLICIES = ("block", "drop_oldest", "spill")
+    REPLAY_BACKOFF = 5.0  # s przerwy w odtwarzaniu kolejki trwałej po nieudanej wysyłce
+
+    def start_background(self, queue_size: int = 10000, batch_size: int = 256, overflow: str = "block") -> None:
+        """
+        Uruchamia wątek wysyłający, który opróżnia ograniczoną kolejkę partiami (send_many).
+        Po starcie dane należy przekazywać przez enqueue(), a nie send().
+
+        :param queue_size: Maksymalna liczba wiadomości oczekujących w pamięci
+        :param batch_size: Maksymalna liczba wiadomości wysyłanych jedną partią
+        :param overflow: Zachowanie przy pełnej kolejce: "block", "drop_oldest"
+                         lub "spill" (zapis do trwałej kolejki outbox)
+        """
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Nieznana polityka przepełnienia: {overflow}")
+        if overflow == "spill" and not self.outbox:
+            raise ValueError("Polityka 'spill' wymaga skonfigurowania outbox_dir")
+        if self._sender_running:
+            return
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.keep_alive = True
+        self._sender_running = True
+        self._sender_thread = threading.Thread(target=self._sender_loop, name="NetworkClientSender", daemon=True)
+        self._sender_thread.start()
+
+    def enqueue(self, data: dict) -> bool:
+        """
+        Dodaje wiadomość do kolejki wysyłkowej bez czekania na sieć.
+        Zwraca False, jeśli wiadomość trafiła na dysk lub wyparła najstarszą wiadomość.
+        """
+        if not self._sender_running:
+            raise RuntimeError("Wątek wysyłający nie jest uruchomiony (start_background).")
+
+        if self.overflow == "block":
+            self._queue.put(data)
+            return True
+
+        try:
+            self._queue.put_nowait(data)
+            return True
+        except queue.Full:
+            pass
+
+        if self.overflow == "spill":
+            self.outbox.append([data])
+            return False
+
+        # drop_oldest: zrób miejsce usuwając najstarszą wiadomość
+        try:
+            self._queue.get_nowait()
+            self._count_dropped(1)
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(data)
+        except queue.Full:
+            self._count_dropped(1)
+        return False
+
+    def send_readings(self, records: Iterable[tuple]) -> int:
+        """
+        Konsument partii (register_batch_callback): przyjmuje krotki (sensor_id, timestamp, value, unit).
+        Przy uruchomionym wątku wysyłającym trafiają do kolejki (enqueue), w przeciwnym razie
+        są wysyłane potokowo (send_many). Zwraca liczbę przyjętych/potwierdzonych wiadomości.
+        """
+        items = records_to_messages(records)
+        if not self._sender_running:
+            return self.send_many(items)
+        return sum(self.enqueue(item) for item in items)
+
+    def stop_background(self, timeout: Optional[float] = None) -> None:
+        """Wysyła zawartość kolejki i zatrzymuje wątek wysyłający."""
+        if not self._sender_running:
+            return
+        self._sender_running = False
+        self._sender_thread.join(timeout)
+        self._sender_thread = None
+        self.close()
+        if self.outbox:
+            self.outbox.sync()
+
+    def _sender_loop(self) -> None:
+        """Pętla wątku wysyłającego: zbiera partie z kolejki i wysyła je potokowo."""
+        while self._sender_running or not self._queue.empty():
+            # Zaległości z dysku (np. po "spill") sprawdzane co obrót pętli, a nie tylko przy pustej kolejce
+            if self.outbox and not self.outbox.empty() and time.monotonic() >= self._next_replay:
+                try:
+                    self.flush_outbox()
+                except Exception as e:
+                    self._next_replay = time.monotonic() + self.REPLAY_BACKOFF
+                    if self.logger:
+                        self.logger.error(f"Błąd odtwarzania kolejki trwałej: {e}")
+            try:
+                batch = [self._queue.get(timeout=0.2)]
+            except queue.Empty:
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                acked = self.send_many(batch)
+            except Exception as e:  # wątek nie może zginąć - partia trafia do outbox lub jest liczona jako utracona
+                acked = 0
+                self.close()
+                if self.logger:
+                    self.logger.error(f"Błąd wątku wysyłającego: {e}")
+            if acked < len(batch):
+                # Potwierdzenia są skumulowane, więc niepotwierdzony jest zawsze ogon partii
+                self._handle_unsent(batch[acked:])
+                self._next_replay = time.monotonic() + self.REPLAY_BACKOFF
+
+    @_synchronized
+    def flush_outbox(self) -> int:
+        """
+        Wysyła wiadomości z trwałej kolejki (od najstarszej) i zatwierdza potwierdzone.
+        Zwraca liczbę wysłanych wiadomości.
+        """
+        # empty() nie czyta dysku - bez zaległości (częsty przypadek przy każdym połączeniu) nic nie kosztuje
+        if not self.outbox or self._replaying or self.outbox.empty():
+            return 0
+
+        sent = 0
+        keep_alive = self.keep_alive
+        self._replaying = True
+        self.keep_alive = True  # Połączenie ma przetrwać całe odtwarzanie
+        try:
+            while True:
+                items, positions = self.outbox.read(self.batch_size)
+                if not items:
+                    break
+                acked = self.send_many(items)
+                if acked:
+                    self.outbox.commit(positions[acked - 1])
+                    sent += acked
+                if acked < len(items):
+                    self._next_replay = time.monotonic() + self.REPLAY_BACKOFF
+                    break
+        finally:
+            self._replaying = False
+            self.keep_alive = keep_alive
+
+        if sent and self.logger:
+            self.logger.info(f"Wysłano {sent} zaległych wiadomości z kolejki trwałej.")
+        return sent
+
+    def _handle_unsent(self, items: list) -> None:
+        """Obsługuje wiadomości, których nie udało się wysłać."""
+        if self.outbox:
+            self.outbox.append(items)
+        else:
+            self._count_dropped(len(items))
+
+    def _count_dropped(self, count: int) -> None:
+        with self._stats_lock:
+            self.dropped += count
+
+    def _encode_batch(self, entries: list) -> bytes:
+        """Koduje listę (seq, dane): jedna ramka binarna albo linie JSON z polem 'seq'."""
+        if self._encoder:
+            return self._encoder.encode(entries[-1][0], [data for _, data in entries])
+        return b"".join(self._serialize(dict(data, seq=seq)) for seq, data in entries)
+
     def _receive_ack(self) -> dict:
         """Odbiera i parsuje ACK z timeoutem."""
         self.socket.settimeout(self.timeout)
-        ack_buffer = b""
 
-        # Czekaj na kompletny ACK (do \n)
-        while b"\n" not in ack_buffer:
+        if self._encoder:
+            frame, self._recv_buffer = read_frame(self._recv_buffer)
+            while frame is None:
+                data = self.socket.recv(1024)
+                if not data:
+                    raise ConnectionError("Serwer zamknął połączenie")
+                frame, self._recv_buffer = read_frame(self._recv_buffer + data)
+            kind, payload = frame
+            if kind != FRAME_ACK:
+                return {"status": "error"}
+            seq, count = ACK.unpack(payload)
+            return {"status": "ok", "ack": seq, "count": count}
+
+        # Czekaj na kompletny ACK (do \n); nadmiarowe dane zostają w buforze na kolejny ACK
+        while b"\n" not in self._recv_buffer:
             data = self.socket.recv(1024)
             if not data:
                 raise ConnectionError("Serwer zamknął połączenie")
-            ack_buffer += data
+            self._recv_buffer += data
 
-        return json.loads(ack_buffer.decode().split("\n")[0])
+        line, self._recv_buffer = self._recv_buffer.split(b"\n", 1)
+        return json.loads(line.decode())
 
+    @_synchronized
     def close(self) -> None:
         """Zamyka połączenie."""
         if self.socket:
@@ -137,6 +512,8 @@ class NetworkClient:
                     self.logger.error(f"Błąd przy zamykaniu: {str(e)}")
             finally:
                 self.socket = None
+                self._recv_buffer = b""
+                self._encoder = None
 
     # Metody pomocnicze:
     def _serialize(self, data: dict) -> bytes:
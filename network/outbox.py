@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+Position = Tuple[int, int]  # (numer segmentu, przesunięcie w bajtach)
+
+
+class Outbox:
+    """
+    Trwała kolejka wychodząca (write-ahead log) dla NetworkClient.
+
+    Wiadomości są dopisywane jako linie JSON do segmentów <numer>.seg.
+    Pozycja odczytu (segment, przesunięcie) jest zapisywana w checkpoint.json
+    po potwierdzeniu wysyłki, a w pełni wysłane segmenty są usuwane.
+    fsync wykonywany jest partiami (co sync_every wiadomości lub co sync_interval s).
+    Łączny rozmiar segmentów jest ograniczony do max_bytes - po przekroczeniu
+    usuwane są najstarsze segmenty (dropped_segments).
+
+    Liczba linii w każdym segmencie jest trzymana w pamięci, więc empty() i pending()
+    nie czytają dysku (segmenty są liczone raz, przy otwarciu kolejki).
+    """
+
+    SEGMENT_SUFFIX = ".seg"
+    CHECKPOINT_FILE = "checkpoint.json"
+
+    def __init__(self, directory: str, segment_bytes: int = 4 * 1024 * 1024, max_bytes: int = 100 * 1024 * 1024,
+                 sync_every: int = 256, sync_interval: float = 1.0):
+        """
+        :param directory: Katalog na segmenty i checkpoint
+        :param segment_bytes: Rozmiar, po którym otwierany jest nowy segment
+        :param max_bytes: Maksymalny łączny rozmiar segmentów na dysku
+        :param sync_every: Liczba wiadomości między kolejnymi fsync
+        :param sync_interval: Maksymalny czas (s) między kolejnymi fsync
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.dropped_segments = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self._segments = sorted(
+            int(name[:-len(self.SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(self.SEGMENT_SUFFIX) and name[:-len(self.SEGMENT_SUFFIX)].isdigit()
+        ) or [1]
+
+        checkpoint = self._load_checkpoint()
+        if checkpoint and checkpoint[0] in self._segments:
+            self._read_segment, self._read_offset = checkpoint
+        else:
+            self._read_segment, self._read_offset = self._segments[0], 0
+
+        self._write_segment = self._segments[-1]
+        self._writer = open(self._segment_path(self._write_segment), "ab")
+        self._write_size = self._writer.tell()
+
+        # Linie w segmentach i linie przed pozycją odczytu w segmencie odczytu
+        self._lines = {segment: self._count_lines(segment) for segment in self._segments}
+        self._read_lines = self._count_lines(self._read_segment, self._read_offset)
+        self._read_marks = {}  # pozycja z ostatniego read() -> liczba linii przed nią w jej segmencie
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, items: List[dict]) -> None:
+        """Dopisuje wiadomości na koniec kolejki."""
+        if not items:
+            return
+        data = b"".join(json.dumps(item).encode("utf-8") + b"\n" for item in items)
+
+        with self._lock:
+            self._writer.write(data)
+            self._write_size += len(data)
+            self._lines[self._write_segment] += len(items)
+            self._unsynced += len(items)
+
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync_locked()
+            if self._write_size >= self.segment_bytes:
+                self._roll_locked()
+
+    def read(self, max_items: int) -> Tuple[List[dict], List[Position]]:
+        """
+        Zwraca do max_items najstarszych niepotwierdzonych wiadomości
+        oraz pozycję za każdą z nich (do przekazania w commit()).
+        """
+        items, positions = [], []
+
+        with self._lock:
+            if self._pending_locked() == 0:
+                return items, positions
+            self._writer.flush()
+            segment, offset, lines = self._read_segment, self._read_offset, self._read_lines
+            self._read_marks = {}
+
+            while len(items) < max_items:
+                path = self._segment_path(segment)
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        f.seek(offset)
+                        for line in f:
+                            if not line.endswith(b"\n"):
+                                break  # Niekompletny zapis (np. po awarii)
+                            offset += len(line)
+                            lines += 1
+                            try:
+                                items.append(json.loads(line))
+                            except ValueError:
+                                continue  # Uszkodzona linia - pomiń
+                            positions.append((segment, offset))
+                            self._read_marks[(segment, offset)] = lines
+                            if len(items) >= max_items:
+                                break
+
+                if len(items) >= max_items or segment == self._write_segment:
+                    break
+                # Przejdź do następnego segmentu
+                segment = self._segments[self._segments.index(segment) + 1]
+                offset, lines = 0, 0
+
+            if not items:
+                # Na dysku nie ma już kompletnych wiadomości (np. uszkodzony ogon) - licznik zgodny z dyskiem
+                self._lines[segment] = lines
+                self._read_segment, self._read_offset, self._read_lines = segment, offset, lines
+                self._save_checkpoint_locked()
+                for later in self._segments[self._segments.index(segment) + 1:]:
+                    self._lines[later] = 0
+
+        return items, positions
+
+    def commit(self, position: Position) -> None:
+        """Oznacza wszystkie wiadomości do pozycji włącznie jako wysłane."""
+        with self._lock:
+            if position[0] < self._segments[0] or position <= (self._read_segment, self._read_offset):
+                return  # Segment został już usunięty lub pozycja jest nieaktualna
+            lines = self._read_marks.get(position)
+            if lines is None:
+                lines = self._count_lines(position[0], position[1])
+            self._read_segment, self._read_offset = position
+            self._read_lines = lines
+            self._save_checkpoint_locked()
+
+            # Usuń segmenty, które zostały w całości wysłane
+            while self._segments[0] < self._read_segment:
+                self._remove_segment_locked(self._segments.pop(0))
+
+    def empty(self) -> bool:
+        """Sprawdza (bez odczytu dysku), czy wszystkie wiadomości zostały potwierdzone."""
+        with self._lock:
+            return self._pending_locked() == 0
+
+    def pending(self) -> int:
+        """Zwraca liczbę niepotwierdzonych wiadomości (bez odczytu dysku)."""
+        with self._lock:
+            return self._pending_locked()
+
+    def size_bytes(self) -> int:
+        """Zwraca łączny rozmiar segmentów na dysku."""
+        with self._lock:
+            return self._total_bytes_locked()
+
+    def sync(self) -> None:
+        """Wymusza zapis (fsync) dopisanych wiadomości."""
+        with self._lock:
+            self._sync_locked()
+
+    def close(self) -> None:
+        """Zapisuje bufor, checkpoint i zamyka bieżący segment."""
+        with self._lock:
+            if self._writer.closed:
+                return
+            self._sync_locked()
+            self._save_checkpoint_locked()
+            self._writer.close()
+
+    # Metody pomocnicze (wywoływane z założoną blokadą):
+    def _pending_locked(self) -> int:
+        return sum(self._lines[segment] for segment in self._segments
+                   if segment >= self._read_segment) - self._read_lines
+
+    def _sync_locked(self) -> None:
+        self._writer.flush()
+        os.fsync(self._writer.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _roll_locked(self) -> None:
+        self._sync_locked()
+        self._writer.close()
+        self._write_segment += 1
+        self._segments.append(self._write_segment)
+        self._writer = open(self._segment_path(self._write_segment), "ab")
+        self._write_size = 0
+        self._lines[self._write_segment] = 0
+        self._enforce_limit_locked()
+
+    def _enforce_limit_locked(self) -> None:
+        """Usuwa najstarsze segmenty, gdy przekroczono max_bytes."""
+        while len(self._segments) > 1 and self._total_bytes_locked() > self.max_bytes:
+            oldest = self._segments.pop(0)
+            self._remove_segment_locked(oldest)
+            self.dropped_segments += 1
+            if self._read_segment <= oldest:
+                self._read_segment, self._read_offset, self._read_lines = self._segments[0], 0, 0
+                self._save_checkpoint_locked()
+
+    def _total_bytes_locked(self) -> int:
+        total = self._write_size
+        for segment in self._segments:
+            if segment != self._write_segment:
+                path = self._segment_path(segment)
+                if os.path.exists(path):
+                    total += os.path.getsize(path)
+        return total
+
+    def _remove_segment_locked(self, segment: int) -> None:
+        self._lines.pop(segment, None)
+        try:
+            os.remove(self._segment_path(segment))
+        except FileNotFoundError:
+            pass
+
+    def _count_lines(self, segment: int, limit: Optional[int] = None) -> int:
+        """Liczy kompletne linie segmentu (do przesunięcia `limit`) - tylko przy otwarciu i w sytuacjach awaryjnych."""
+        count = 0
+        try:
+            with open(self._segment_path(segment), "rb") as f:
+                remaining = limit
+                while remaining is None or remaining > 0:
+                    chunk = f.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+                    if not chunk:
+                        break
+                    count += chunk.count(b"\n")
+                    if remaining is not None:
+                        remaining -= len(chunk)
+        except FileNotFoundError:
+            pass
+        return count
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:08d}{self.SEGMENT_SUFFIX}")
+
+    def _load_checkpoint(self) -> Optional[Position]:
+        try:
+            with open(os.path.join(self.directory, self.CHECKPOINT_FILE), "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            return int(checkpoint["segment"]), int(checkpoint["offset"])
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def _save_checkpoint_locked(self) -> None:
+        path = os.path.join(self.directory, self.CHECKPOINT_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"segment": self._read_segment, "offset": self._read_offset}, f)
+        os.replace(tmp_path, path)
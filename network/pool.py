@@ -0,0 +1,246 @@
+import socket
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from .client import NetworkClient, records_to_messages
+from .config import load_config
+
+STRATEGIES = ("round_robin", "least_outstanding")
+
+
+class Endpoint:
+    """Serwer docelowy puli: połączenia (NetworkClient), licznik wiadomości w locie i stan zdrowia."""
+
+    def __init__(self, host: str, port: int, connections: List[NetworkClient]):
+        self.host = host
+        self.port = port
+        self.connections = connections
+        self.idle = list(connections)  # połączenia nieużywane w tej chwili
+        self.outstanding = 0  # wiadomości wysyłane lub czekające na ACK
+        self.failures = 0  # kolejne błędy (wysyłki lub sprawdzenia)
+        self.ejected_until: Optional[float] = None  # czas monotoniczny, od którego udane sprawdzenie przywraca serwer
+        self.ejections = 0  # kolejne wyłączenia (wydłużają czas wyłączenia), zerowane po przywróceniu
+        self.ejected_total = 0
+        self.sent = 0
+        self.errors = 0
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def healthy(self) -> bool:
+        """Serwer wyłączony pozostaje niezdrowy do udanego sprawdzenia - sam upływ czasu go nie przywraca."""
+        return self.ejected_until is None
+
+    def may_probe(self, now: float) -> bool:
+        return self.ejected_until is not None and now >= self.ejected_until
+
+
+class ClientPool:
+    """
+    Pula połączeń do wielu serwerów: `pool_size` trwałych połączeń (NetworkClient,
+    keep_alive) na serwer i wybór serwera dla każdej partii - po kolei ("round_robin")
+    albo według najmniejszej liczby wiadomości w locie ("least_outstanding").
+    Wolny serwer nie ogranicza przepustowości: gdy jego połączenia są zajęte, partia
+    trafia do innego.
+
+    Partia niepotwierdzona przez serwer jest wysyłana ponownie do innego serwera
+    (co najmniej raz). Serwer z `eject_after` kolejnymi błędami jest wyłączany z puli
+    na co najmniej eject_seconds (podwajane przy kolejnych wyłączeniach, do max_eject_seconds)
+    i wraca dopiero po udanym sprawdzeniu: wątek sprawdzający co health_interval sekund
+    łączy się z każdym serwerem (TCP), a bez niego (health_interval=0) próbą jest
+    pojedyncza wysyłka po upływie czasu wyłączenia. Udana wysyłka do wyłączonego serwera
+    także go przywraca. Gdy wyłączone są wszystkie, pula próbuje wysyłać mimo to, zamiast odrzucać dane.
+
+    Metody wysyłające są bezpieczne dla wątków.
+    """
+
+    def __init__(self, endpoints: Optional[Iterable] = None, pool_size: int = 2, strategy: str = "least_outstanding",
+                 timeout: float = 5.0, window: int = 64, protocol: str = "json", logger=None,
+                 config_path: str = "config.yaml", eject_after: int = 3, eject_seconds: float = 5.0,
+                 max_eject_seconds: float = 60.0, health_interval: float = 2.0):
+        """
+        :param endpoints: Serwery jako "host:port" lub (host, port); None - z config.yaml
+                          (klucz "endpoints", a bez niego host i port)
+        :param pool_size: Liczba połączeń na serwer
+        :param strategy: "round_robin" lub "least_outstanding"
+        :param eject_after: Liczba kolejnych błędów, po której serwer jest wyłączany z puli
+        :param eject_seconds: Czas pierwszego wyłączenia (sekundy)
+        :param health_interval: Odstęp sprawdzeń stanu serwerów (0 - bez wątku sprawdzającego)
+        """
+        if endpoints is None:
+            config = load_config(config_path)
+            endpoints = config.get("endpoints") or [(config["host"], config["port"])]
+            pool_size = config.get("pool_size", pool_size)
+            strategy = config.get("pool_strategy", strategy)
+            timeout = config.get("timeout", timeout)
+            window = config.get("window", window)
+            protocol = config.get("protocol", protocol)
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Nieznana strategia: {strategy} (dostępne: {', '.join(STRATEGIES)})")
+
+        self.strategy = strategy
+        self.timeout = timeout
+        self.logger = logger
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.health_interval = health_interval
+
+        self.endpoints: List[Endpoint] = []
+        for endpoint in endpoints:
+            if isinstance(endpoint, str):
+                host, _, port = endpoint.rpartition(":")
+            else:
+                host, port = endpoint
+            connections = []
+            for _ in range(pool_size):
+                # Jedna próba na połączenie - ponowienia obsługuje pula, wysyłając do innego serwera
+                client = NetworkClient(host, int(port), timeout=timeout, retries=1, logger=logger,
+                                       window=window, protocol=protocol)
+                client.keep_alive = True
+                connections.append(client)
+            self.endpoints.append(Endpoint(host, int(port), connections))
+        if not self.endpoints:
+            raise ValueError("Pula wymaga co najmniej jednego serwera")
+
+        self._condition = threading.Condition()
+        self._next = 0  # round_robin
+        self._stopping = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        if health_interval:
+            self._health_thread = threading.Thread(target=self._health_loop, name="ClientPoolHealth", daemon=True)
+            self._health_thread.start()
+
+    def send(self, data: dict) -> bool:
+        """Wysyła wiadomość przez pulę i czeka na potwierdzenie."""
+        return self.send_many([data]) == 1
+
+    def send_many(self, items: Iterable[dict]) -> int:
+        """
+        Wysyła partię jednym połączeniem wybranym według strategii. Niepotwierdzoną
+        resztę wysyła do kolejnych serwerów (każdy najwyżej raz). Zwraca liczbę potwierdzonych wiadomości.
+        """
+        remaining = list(items)
+        acked = 0
+        tried = set()
+        while remaining and len(tried) < len(self.endpoints):
+            endpoint, client = self._acquire(len(remaining), tried)
+            tried.add(id(endpoint))
+            done = 0
+            try:
+                done = client.send_many(remaining)
+            except OSError as e:  # błędy połączenia spoza obsługi NetworkClient (np. brak trasy)
+                client.close()
+                if self.logger:
+                    self.logger.error(f"Błąd wysyłania do {endpoint.address}: {e}")
+            finally:
+                self._release(endpoint, client, len(remaining), done)
+            acked += done
+            remaining = remaining[done:]
+        return acked
+
+    def send_readings(self, records: List[tuple]) -> int:
+        """Konsument partii (register_batch_callback): krotki (sensor_id, timestamp, value, unit)."""
+        return self.send_many(records_to_messages(records))
+
+    def stats(self) -> List[Dict]:
+        """Stan serwerów puli: adres, zdrowie, wiadomości w locie, wysłane, błędy i liczba wyłączeń."""
+        with self._condition:
+            return [{
+                "endpoint": endpoint.address,
+                "healthy": endpoint.healthy(),
+                "outstanding": endpoint.outstanding,
+                "idle_connections": len(endpoint.idle),
+                "sent": endpoint.sent,
+                "errors": endpoint.errors,
+                "ejections": endpoint.ejected_total,
+            } for endpoint in self.endpoints]
+
+    def close(self) -> None:
+        """Zatrzymuje sprawdzanie stanu i zamyka wszystkie połączenia."""
+        self._stopping.set()
+        if self._health_thread:
+            self._health_thread.join()
+            self._health_thread = None
+        for endpoint in self.endpoints:
+            for client in endpoint.connections:
+                client.close()
+
+    def _acquire(self, count: int, tried: set) -> tuple:
+        """Wybiera serwer według strategii i zajmuje jego wolne połączenie (czeka, gdy wszystkie są zajęte)."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                candidates = [e for e in self.endpoints if id(e) not in tried]
+                healthy = [e for e in candidates if e.healthy()
+                           or (self._health_thread is None and e.may_probe(now))]  # bez wątku: próba wysyłką
+                candidates = healthy or candidates  # wszystkie wyłączone - próbuj mimo to
+
+                if self.strategy == "round_robin":
+                    start = self._next % len(candidates)
+                    self._next += 1
+                    order = candidates[start:] + candidates[:start]
+                else:
+                    order = sorted(candidates, key=lambda e: e.outstanding)
+
+                for endpoint in order:
+                    if endpoint.idle:
+                        endpoint.outstanding += count
+                        return endpoint, endpoint.idle.pop()
+                self._condition.wait()
+
+    def _release(self, endpoint: Endpoint, client: NetworkClient, count: int, acked: int) -> None:
+        with self._condition:
+            endpoint.idle.append(client)
+            endpoint.outstanding -= count
+            endpoint.sent += acked
+            if acked == count:
+                endpoint.failures = 0
+                if not endpoint.healthy():
+                    self._reintroduce(endpoint, "wysyłka potwierdzona")
+            else:
+                endpoint.errors += 1
+                self._record_failure(endpoint, f"potwierdzono {acked}/{count}")
+            self._condition.notify_all()  # czekający mogą mieć różne zbiory serwerów do wyboru
+
+    def _record_failure(self, endpoint: Endpoint, reason: str) -> None:
+        """Zlicza błąd serwera i po eject_after kolejnych błędach wyłącza go z puli (wywoływane pod blokadą)."""
+        endpoint.failures += 1
+        if endpoint.failures < self.eject_after or not endpoint.healthy():
+            return
+        endpoint.ejections += 1
+        endpoint.ejected_total += 1
+        duration = min(self.eject_seconds * 2 ** (endpoint.ejections - 1), self.max_eject_seconds)
+        endpoint.ejected_until = time.monotonic() + duration
+        if self.logger:
+            self.logger.error(f"Serwer {endpoint.address} wyłączony z puli na co najmniej {duration:.0f} s ({reason})")
+
+    def _reintroduce(self, endpoint: Endpoint, reason: str) -> None:
+        """Przywraca serwer do puli po udanym sprawdzeniu (wywoływane pod blokadą)."""
+        endpoint.ejected_until = None
+        endpoint.failures = 0
+        endpoint.ejections = 0
+        if self.logger:
+            self.logger.info(f"Serwer {endpoint.address} przywrócony do puli ({reason})")
+        self._condition.notify_all()
+
+    def _health_loop(self) -> None:
+        """Wątek sprawdzający: próbne połączenie TCP z każdym serwerem co health_interval sekund."""
+        while not self._stopping.wait(self.health_interval):
+            for endpoint in self.endpoints:
+                try:
+                    with socket.create_connection((endpoint.host, endpoint.port), timeout=self.timeout):
+                        pass
+                except OSError as e:
+                    with self._condition:
+                        self._record_failure(endpoint, f"sprawdzenie: {e}")
+                    continue
+
+                with self._condition:
+                    if endpoint.may_probe(time.monotonic()):
+                        self._reintroduce(endpoint, "sprawdzenie")
+
+    def __len__(self):
+        return len(self.endpoints)
@@ -0,0 +1,213 @@
+import json
+import struct
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+# Negocjacja: klient po połączeniu wysyła linię HELLO. Celowo nie jest to JSON:
+# starszy serwer traktuje każdą poprawną linię JSON jako odczyt (on_data_received),
+# a na linię spoza JSON odpowiada "ERROR" i niczego nie przekazuje dalej.
+# Serwer obsługujący tryb binarny odpowiada {"status": "ok", "protocol": "binary"}
+# i od tej chwili obie strony używają ramek binarnych. Każda inna odpowiedź
+# (w tym "ERROR") oznacza, że klient zostaje przy JSON.
+PROTOCOL_VERSION = 1
+HELLO = f"HELLO binary/{PROTOCOL_VERSION}\n".encode("ascii")
+
+# Ramka: długość (typ + treść), typ, treść
+FRAME_HEADER = struct.Struct("!IB")
+FRAME_DEFINE = 1   # wpis słownika: indeks -> (sensor_id, unit)
+FRAME_RECORDS = 2  # partia odczytów: seq, liczba, rekordy
+FRAME_JSON = 3     # pojedyncza wiadomość JSON (gdy nie pasuje do rekordu)
+FRAME_ACK = 4      # skumulowane potwierdzenie: seq, liczba
+FRAME_ERROR = 5
+
+DEFINE_HEAD = struct.Struct("!HB")   # indeks, długość sensor_id (potem długość unit)
+RECORDS_HEAD = struct.Struct("!QH")  # seq ostatniego rekordu, liczba rekordów
+RECORD = struct.Struct("!Hqd")       # indeks w słowniku, epoka w mikrosekundach, wartość
+SEQ = struct.Struct("!Q")
+ACK = struct.Struct("!QI")
+
+MAX_RECORDS_PER_FRAME = 0xFFFF
+MAX_DICTIONARY_SIZE = 0xFFFF
+RECORD_KEYS = frozenset(("sensor_id", "timestamp", "value", "unit"))
+
+
+def is_hello(line: bytes) -> bool:
+    """Sprawdza, czy linia (bez końca linii) jest prośbą o przejście na protokół binarny."""
+    return line == HELLO[:-1]
+
+
+def parse_hello_reply(line: bytes) -> bool:
+    """Sprawdza, czy odpowiedź serwera na HELLO potwierdza protokół binarny."""
+    try:
+        reply = json.loads(line)
+    except ValueError:
+        return False  # np. "ERROR" od serwera bez obsługi trybu binarnego
+    return isinstance(reply, dict) and reply.get("protocol") == "binary"
+
+
+def encode_frame(kind: int, payload: bytes = b"") -> bytes:
+    return FRAME_HEADER.pack(len(payload) + 1, kind) + payload
+
+
+def encode_ack(seq: int, count: int) -> bytes:
+    return encode_frame(FRAME_ACK, ACK.pack(seq, count))
+
+
+def _to_micros(timestamp) -> Optional[int]:
+    """Zamienia znacznik czasu (datetime lub ISO) na mikrosekundy epoki; None dla stref czasowych."""
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return None
+    if not isinstance(timestamp, datetime) or timestamp.tzinfo is not None:
+        return None
+    return int(timestamp.replace(microsecond=0).timestamp()) * 1_000_000 + timestamp.microsecond
+
+
+class BinaryEncoder:
+    """Koduje wiadomości klienta do ramek binarnych (słownik jest per połączenie)."""
+
+    def __init__(self):
+        self._indexes = {}
+
+    def encode(self, seq: int, items: List[dict]) -> bytes:
+        """
+        Koduje partię wiadomości. Ramka RECORDS dostaje numer seq (ostatniej wiadomości),
+        więc serwer potwierdza całą partię jednym ACK.
+        Wiadomości, które nie pasują do rekordu, są wysyłane jako ramki JSON.
+        """
+        frames = []
+        records = []
+        for item in items:
+            record = self._pack_record(item, frames)
+            if record is not None:
+                records.append(record)
+                continue
+            # Zachowaj kolejność: najpierw zaległe rekordy, potem wiadomość JSON
+            self._flush_records(seq, records, frames)
+            frames.append(encode_frame(FRAME_JSON, SEQ.pack(seq) + json.dumps(item).encode("utf-8")))
+
+        self._flush_records(seq, records, frames)
+        return b"".join(frames)
+
+    @staticmethod
+    def _flush_records(seq: int, records: list, frames: list) -> None:
+        for start in range(0, len(records), MAX_RECORDS_PER_FRAME):
+            chunk = records[start:start + MAX_RECORDS_PER_FRAME]
+            frames.append(encode_frame(FRAME_RECORDS, RECORDS_HEAD.pack(seq, len(chunk)) + b"".join(chunk)))
+        records.clear()
+
+    def _pack_record(self, item: dict, frames: list) -> Optional[bytes]:
+        if item.keys() != RECORD_KEYS:
+            return None
+        value = item["value"]
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return None
+        micros = _to_micros(item["timestamp"])
+        if micros is None:
+            return None
+
+        key = (str(item["sensor_id"]), str(item["unit"]))
+        index = self._indexes.get(key)
+        if index is None:
+            sensor_id, unit = key[0].encode("utf-8"), key[1].encode("utf-8")
+            if len(self._indexes) >= MAX_DICTIONARY_SIZE or len(sensor_id) > 255 or len(unit) > 255:
+                return None
+            index = len(self._indexes)
+            self._indexes[key] = index
+            payload = DEFINE_HEAD.pack(index, len(sensor_id)) + sensor_id + bytes((len(unit),)) + unit
+            frames.append(encode_frame(FRAME_DEFINE, payload))
+        return RECORD.pack(index, micros, float(value))
+
+
+class BinaryDecoder:
+    """Dekoduje ramki binarne po stronie serwera (stan słownika per połączenie)."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._entries: List[Tuple[str, str]] = []
+        self._last_second = None
+        self._last_datetime = None
+
+    def _format_micros(self, micros: int) -> str:
+        """Zamienia mikrosekundy epoki na ISO (z pamięcią ostatniej sekundy - odczyty są zwykle bliskie w czasie)."""
+        seconds, microsecond = divmod(micros, 1_000_000)
+        if seconds != self._last_second:
+            self._last_second = seconds
+            self._last_datetime = datetime.fromtimestamp(seconds)
+        return self._last_datetime.replace(microsecond=microsecond).isoformat()
+
+    def feed(self, data: bytes) -> Tuple[List[dict], Optional[int], int]:
+        """
+        Dodaje odebrane bajty i dekoduje wszystkie kompletne ramki.
+        Zwraca (wiadomości, ostatni seq lub None, liczba błędnych ramek).
+        """
+        self._buffer += data
+        with memoryview(self._buffer) as view:
+            messages, last_seq, errors, consumed = self.decode(view)
+        del self._buffer[:consumed]
+        return messages, last_seq, errors
+
+    def decode(self, view: memoryview) -> Tuple[List[dict], Optional[int], int, int]:
+        """
+        Dekoduje kompletne ramki wprost z widoku bufora odbiorczego (bez kopiowania danych).
+        Zwraca (wiadomości, ostatni seq lub None, liczba błędnych ramek, liczba zużytych bajtów);
+        niekompletna ostatnia ramka zostaje w buforze wywołującego.
+        """
+        messages = []
+        last_seq = None
+        errors = 0
+        offset = 0
+
+        while len(view) - offset >= FRAME_HEADER.size:
+            length, kind = FRAME_HEADER.unpack_from(view, offset)
+            end = offset + 4 + length
+            if end > len(view):
+                break  # Niekompletna ramka - czekaj na resztę
+            start = offset + FRAME_HEADER.size
+            offset = end
+
+            try:
+                if kind == FRAME_RECORDS:
+                    last_seq, count = RECORDS_HEAD.unpack_from(view, start)
+                    entries = self._entries
+                    for pos in range(start + RECORDS_HEAD.size, end, RECORD.size):
+                        index, micros, value = RECORD.unpack_from(view, pos)
+                        sensor_id, unit = entries[index]
+                        messages.append({
+                            "sensor_id": sensor_id,
+                            "timestamp": self._format_micros(micros),
+                            "value": value,
+                            "unit": unit
+                        })
+                elif kind == FRAME_DEFINE:
+                    index, id_length = DEFINE_HEAD.unpack_from(view, start)
+                    pos = start + DEFINE_HEAD.size
+                    sensor_id = bytes(view[pos:pos + id_length]).decode("utf-8")
+                    pos += id_length
+                    unit = bytes(view[pos + 1:pos + 1 + view[pos]]).decode("utf-8")
+                    if index == len(self._entries):
+                        self._entries.append((sensor_id, unit))
+                    else:
+                        self._entries[index] = (sensor_id, unit)
+                elif kind == FRAME_JSON:
+                    (last_seq,) = SEQ.unpack_from(view, start)
+                    messages.append(json.loads(bytes(view[start + SEQ.size:end])))
+                else:
+                    errors += 1
+            except (struct.error, IndexError, ValueError):
+                errors += 1
+
+        return messages, last_seq, errors, offset
+
+
+def read_frame(buffer: bytes) -> Tuple[Optional[Tuple[int, bytes]], bytes]:
+    """Wydziela pierwszą kompletną ramkę z bufora: ((typ, treść) lub None, reszta bufora)."""
+    if len(buffer) < FRAME_HEADER.size:
+        return None, buffer
+    length, kind = FRAME_HEADER.unpack_from(buffer)
+    end = 4 + length
+    if len(buffer) < end:
+        return None, buffer
+    return (kind, buffer[FRAME_HEADER.size:end]), buffer[end:]
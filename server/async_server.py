@@ -0,0 +1,167 @@
+# server/async_server.py
+import asyncio
+import sys
+import time
+from typing import Optional, Set
+
+from server.server import DEFAULT_CONFIG_PATH, NetworkServer, ConnectionState
+
+try:
+    import resource
+except ImportError:  # Windows - brak modułu resource
+    resource = None
+
+
+class AsyncNetworkServer(NetworkServer):
+    """
+    Serwer oparty o asyncio: wszystkie połączenia obsługuje jedna pętla zdarzeń
+    zamiast osobnego wątku na klienta. Protokół (JSON rozdzielany \\n + ACK)
+    oraz hook on_data_received pozostają bez zmian.
+    """
+
+    READ_CHUNK = 65536
+
+    def __init__(self, port: int = None, config_path: str = DEFAULT_CONFIG_PATH, backlog: int = None,
+                 debug: bool = False, metrics_port: Optional[int] = None,
+                 consumer_workers: Optional[int] = None, ack_mode: Optional[str] = None,
+                 idle_timeout: Optional[float] = 30.0):
+        """
+        :param idle_timeout: Czas (s) bez danych, po którym połączenie jest zamykane (None - bez limitu)
+        """
+        super().__init__(port=port, config_path=config_path, backlog=backlog,
+                         debug=debug, metrics_port=metrics_port,
+                         consumer_workers=consumer_workers, ack_mode=ack_mode)
+        self.idle_timeout = idle_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Uruchamia pętlę zdarzeń i blokuje do czasu wywołania stop()."""
+        asyncio.run(self.serve())
+
+    async def serve(self) -> None:
+        """Nasłuchuje połączeń w bieżącej pętli zdarzeń."""
+        self._raise_nofile_limit()
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+
+        if self.server_socket is not None:
+            # Gniazdo przygotowane wcześniej (np. odziedziczone po procesie nadrzędnym)
+            server = await asyncio.start_server(self._handle_connection, sock=self.server_socket, backlog=self.backlog)
+        else:
+            server = await asyncio.start_server(
+                self._handle_connection, self.host, self.port,
+                backlog=self.backlog, reuse_address=True, reuse_port=self.reuse_port or None
+            )
+        self.server_socket = server.sockets[0] if server.sockets else None
+        self.running = True
+        self._start_metrics_endpoint()
+        if self.pipeline:
+            self.pipeline.start()
+        print(f"Serwer (asyncio) nasłuchuje na {self.host}:{self.port} (backlog={self.backlog})")
+
+        try:
+            await self._stop_event.wait()
+        finally:
+            self.running = False
+            server.close()
+            # Zamknij aktywne połączenia i poczekaj aż zakończą obsługę
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await server.wait_closed()
+            if self.pipeline:
+                self.pipeline.stop()
+            self._stop_metrics_endpoint()
+            self.server_socket = None
+            print("Serwer (asyncio) zatrzymany.")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Przetwarzaj wszystkie wiadomości w jednym połączeniu."""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        addr = writer.get_extra_info("peername")
+        print(f"Połączono z {addr}")
+        self.metrics.connection_opened()
+
+        try:
+            state = ConnectionState(blocking=False)
+            while True:
+                try:
+                    data = await asyncio.wait_for(reader.read(self.READ_CHUNK), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    print("Timeout połączenia.", file=sys.stderr)
+                    break
+                if not data:
+                    break  # Klient zamknął połączenie
+
+                # Wszystkie kompletne wiadomości z odczytu przetwarzamy jedną partią
+                received_at = time.perf_counter()
+                try:
+                    state.buffer.feed(data)
+                except ValueError as e:
+                    # Wiadomość bez końca linii przekroczyła limit bufora - zrywamy połączenie
+                    print(f"Błąd: {e} - rozłączam {addr}", file=sys.stderr)
+                    break
+                response = self._process_buffer(state)
+                if state.deferred is not None:
+                    # Kolejka potoku pełna - czekaj na miejsce poza pętlą zdarzeń (backpressure)
+                    try:
+                        state.pending = await self._loop.run_in_executor(None, self.pipeline.submit, state.deferred)
+                    except RuntimeError as e:  # potok zatrzymany - bez ACK
+                        response = b""
+                        print(f"Inny błąd: {str(e)}", file=sys.stderr)
+                    state.deferred = None
+                if state.pending is not None:
+                    # ACK dopiero po przetworzeniu partii przez potok
+                    try:
+                        # shield - przekroczenie czasu nie anuluje Future, który zakończy wątek potoku
+                        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(state.pending)), self.ack_timeout)
+                        error = None
+                    except asyncio.TimeoutError:
+                        print("Potok nie przetworzył partii w czasie - zamykam połączenie.", file=sys.stderr)
+                        break
+                    except Exception as e:
+                        error = e
+                    state.pending = None
+                    if not self._pending_succeeded(error):
+                        response = b""
+                if response:
+                    writer.write(response)
+                    self.metrics.record_io(len(data), time.perf_counter() - received_at)
+                    await writer.drain()
+                else:
+                    self.metrics.record_io(len(data))
+
+        except asyncio.CancelledError:
+            pass
+        except ConnectionError as e:
+            print(f"Błąd: {str(e)}", file=sys.stderr)
+        finally:
+            self.metrics.connection_closed()
+            self._connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            print("Połączenie z klientem zamknięte.")
+
+    def stop(self) -> None:
+        """Zatrzymuje serwer (można wywołać z dowolnego wątku)."""
+        self.running = False
+        if self._loop and self._stop_event and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+    @staticmethod
+    def _raise_nofile_limit() -> None:
+        """Podnosi miękki limit deskryptorów plików do twardego (potrzebne dla >10k połączeń)."""
+        if resource is None:
+            return
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard == resource.RLIM_INFINITY or soft < hard:
+            try:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            except (ValueError, OSError):
+                pass
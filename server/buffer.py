@@ -0,0 +1,101 @@
+# server/buffer.py
+from typing import List
+
+
+class ReceiveBuffer:
+    """
+    Bufor odbiorczy połączenia oparty o prealokowaną bytearray i memoryview.
+
+    Dane są wczytywane bezpośrednio do bufora (recv_into), a kompletne linie
+    wyszukiwane od zapamiętanego przesunięcia - bez kopiowania reszty bufora
+    po każdej wiadomości (jak przy buffer.split(b"\\n", 1)). Nieprzetworzony
+    ogon jest przesuwany na początek dopiero, gdy kończy się miejsce.
+    """
+
+    MIN_FREE = 4096
+    MAX_CAPACITY = 16 * 1024 * 1024  # ochrona przed wiadomością bez końca linii
+
+    def __init__(self, capacity: int = 65536):
+        self._data = bytearray(capacity)
+        self._view = memoryview(self._data)
+        self._start = 0  # początek nieprzetworzonych danych
+        self._end = 0    # koniec danych zapisanych w buforze
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def recv_into(self, sock) -> int:
+        """Odbiera dane z gniazda prosto do wolnej części bufora. Zwraca liczbę bajtów (0 - koniec)."""
+        self._reserve(self.MIN_FREE)
+        received = sock.recv_into(self._view[self._end:])
+        self._end += received
+        return received
+
+    def feed(self, data: bytes) -> None:
+        """Dopisuje dane odebrane w inny sposób (np. z asyncio.StreamReader)."""
+        self._reserve(len(data))
+        self._data[self._end:self._end + len(data)] = data
+        self._end += len(data)
+
+    def pop_lines(self, max_lines: int = -1) -> List[bytes]:
+        """
+        Zwraca kompletne linie (bez \\n) i przesuwa początek bufora za ostatnią z nich.
+        :param max_lines: Maksymalna liczba zwracanych linii (-1 - wszystkie)
+        """
+        lines = []
+        data = self._data
+        view = self._view
+        pos = self._start
+        end = self._end
+
+        newline = data.find(b"\n", pos, end)
+        while newline >= 0 and len(lines) != max_lines:
+            lines.append(bytes(view[pos:newline]))
+            pos = newline + 1
+            newline = data.find(b"\n", pos, end)
+
+        if pos == end:
+            # Wszystko przetworzone - tanie wyzerowanie zamiast przesuwania danych
+            self._start = self._end = 0
+        else:
+            self._start = pos
+        return lines
+
+    def view(self) -> memoryview:
+        """Widok nieprzetworzonych danych (bez kopiowania) - zwolnij go (release) przed kolejnym odbiorem."""
+        return self._view[self._start:self._end]
+
+    def consume(self, size: int) -> None:
+        """Usuwa z początku bufora `size` przetworzonych bajtów."""
+        self._start += size
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def take(self) -> bytes:
+        """Zwraca i usuwa wszystkie nieprzetworzone dane (np. przy zmianie protokołu)."""
+        data = bytes(self._view[self._start:self._end])
+        self._start = self._end = 0
+        return data
+
+    def _reserve(self, size: int) -> None:
+        """Zapewnia co najmniej `size` wolnych bajtów na końcu bufora."""
+        if len(self._data) - self._end >= size:
+            return
+
+        # Najpierw przesuń nieprzetworzony ogon na początek
+        pending = self._end - self._start
+        if self._start:
+            self._data[:pending] = bytes(self._view[self._start:self._end])
+            self._start, self._end = 0, pending
+            if len(self._data) - self._end >= size:
+                return
+
+        # Za mało miejsca - powiększ bufor (memoryview trzeba zwolnić przed zmianą rozmiaru)
+        capacity = len(self._data)
+        while capacity - pending < size:
+            capacity *= 2
+        if capacity > self.MAX_CAPACITY:
+            raise ValueError(f"Przekroczono maksymalny rozmiar bufora ({self.MAX_CAPACITY} B)")
+        self._view.release()
+        self._data.extend(bytes(capacity - len(self._data)))
+        self._view = memoryview(self._data)
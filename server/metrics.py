@@ -0,0 +1,178 @@
+# server/metrics.py
+import bisect
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+
+class ServerMetrics:
+    """
+    Liczniki serwera aktualizowane raz na partię wiadomości (nie na wiadomość).
+
+    Zbiera: liczbę wiadomości i bajtów, odczyty per czujnik, błędy parsowania,
+    aktywne połączenia oraz histogram czasu od odebrania danych do wysłania ACK.
+    snapshot() zwraca sumy i tempo (na sekundę) od poprzedniego wywołania.
+    W `sources` można zarejestrować dodatkowe źródła statystyk (nazwa -> funkcja zwracająca dict).
+    """
+
+    # Górne granice przedziałów histogramu opóźnienia ACK (ms)
+    LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 500, 1000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.messages = 0
+        self.bytes = 0
+        self.parse_errors = 0
+        self.connections = 0
+        self.per_sensor = Counter()
+        self.latency_histogram = [0] * (len(self.LATENCY_BUCKETS_MS) + 1)
+        self.latency_sum_ms = 0.0
+        self._last_snapshot = (self._started, 0, 0, Counter())
+        self.sources: Dict[str, Callable[[], Dict]] = {}
+
+    def record_messages(self, messages: List[dict], parse_errors: int = 0) -> None:
+        """Rejestruje partię przetworzonych wiadomości."""
+        sensors = Counter(
+            message.get("sensor_id", "unknown") for message in messages if isinstance(message, dict)
+        )
+        with self._lock:
+            self.messages += len(messages)
+            self.parse_errors += parse_errors
+            self.per_sensor.update(sensors)
+
+    def record_io(self, received_bytes: int, latency: Optional[float] = None) -> None:
+        """Rejestruje odebrane bajty i opóźnienie ACK (s) dla jednego odczytu z gniazda."""
+        with self._lock:
+            self.bytes += received_bytes
+            if latency is not None:
+                latency_ms = latency * 1000
+                self.latency_histogram[bisect.bisect_left(self.LATENCY_BUCKETS_MS, latency_ms)] += 1
+                self.latency_sum_ms += latency_ms
+
+    def connection_opened(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def connection_closed(self) -> None:
+        with self._lock:
+            self.connections -= 1
+
+    def counters(self) -> Dict:
+        """Surowe, narastające liczniki I/O (bez tempa) - do przekazania z procesu roboczego."""
+        with self._lock:
+            return {
+                "bytes": self.bytes,
+                "parse_errors": self.parse_errors,
+                "connections": self.connections,
+                "latency_histogram": list(self.latency_histogram),
+                "latency_sum_ms": self.latency_sum_ms,
+            }
+
+    def add_counters(self, counters: Dict, previous: Optional[Dict] = None) -> None:
+        """Dolicza przyrost liczników innego procesu (counters()) od jego poprzedniego raportu `previous`."""
+        previous = previous or {}
+        old_histogram = previous.get("latency_histogram") or [0] * len(self.latency_histogram)
+        with self._lock:
+            self.bytes += counters["bytes"] - previous.get("bytes", 0)
+            self.parse_errors += counters["parse_errors"] - previous.get("parse_errors", 0)
+            self.connections += counters["connections"] - previous.get("connections", 0)
+            self.latency_sum_ms += counters["latency_sum_ms"] - previous.get("latency_sum_ms", 0.0)
+            for i, (new, old) in enumerate(zip(counters["latency_histogram"], old_histogram)):
+                self.latency_histogram[i] += new - old
+
+    def snapshot(self) -> Dict:
+        """Zwraca migawkę liczników oraz tempo od poprzedniej migawki."""
+        now = time.monotonic()
+        with self._lock:
+            last_time, last_messages, last_bytes, last_sensors = self._last_snapshot
+            per_sensor = Counter(self.per_sensor)
+            histogram = list(self.latency_histogram)
+            snapshot = {
+                "uptime_s": round(now - self._started, 3),
+                "messages": self.messages,
+                "bytes": self.bytes,
+                "parse_errors": self.parse_errors,
+                "connections": self.connections,
+                "acks": sum(histogram),
+                "ack_latency_avg_ms": round(self.latency_sum_ms / sum(histogram), 3) if sum(histogram) else 0.0,
+            }
+            self._last_snapshot = (now, self.messages, self.bytes, per_sensor)
+
+        interval = max(now - last_time, 1e-9)
+        snapshot["messages_per_s"] = round((snapshot["messages"] - last_messages) / interval, 1)
+        snapshot["bytes_per_s"] = round((snapshot["bytes"] - last_bytes) / interval, 1)
+        snapshot["sensor_rates"] = {
+            sensor_id: round((count - last_sensors.get(sensor_id, 0)) / interval, 2)
+            for sensor_id, count in per_sensor.items()
+        }
+        snapshot["ack_latency_ms"] = {
+            (f"le_{bound}" if i < len(self.LATENCY_BUCKETS_MS) else "inf"): count
+            for i, (bound, count) in enumerate(zip(self.LATENCY_BUCKETS_MS + (None,), histogram))
+        }
+        for name, source in self.sources.items():
+            snapshot[name] = source()
+        return snapshot
+
+    def render_text(self, snapshot: Optional[Dict] = None) -> str:
+        """Formatuje migawkę jako prosty tekst (jedna metryka w linii)."""
+        snapshot = snapshot or self.snapshot()
+        lines = []
+        for key, value in snapshot.items():
+            if isinstance(value, dict):
+                for label, item in value.items():
+                    lines.append(f'server_{key}{{key="{label}"}} {item}')
+            else:
+                lines.append(f"server_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class ConsoleSink:
+    """Ujście diagnostyczne: wypisuje każdą odebraną wiadomość na konsolę (tryb --debug)."""
+
+    def __call__(self, messages: List[dict]) -> None:
+        for data in messages:
+            print("\n--- Odebrane dane ---")
+            for key, value in data.items():
+                print(f"{key.upper():<15}: {value}")
+            print("---------------------\n")
+
+
+class MetricsHTTPServer:
+    """Lokalny endpoint HTTP z metrykami: /metrics (tekst) oraz /metrics.json."""
+
+    def __init__(self, metrics: ServerMetrics, port: int, host: str = "127.0.0.1"):
+        self.metrics = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path == "/metrics.json":
+                    body = json.dumps(metrics.snapshot()).encode()
+                    content_type = "application/json"
+                elif handler.path == "/metrics":
+                    body = metrics.render_text().encode()
+                    content_type = "text/plain; charset=utf-8"
+                else:
+                    handler.send_error(404)
+                    return
+                handler.send_response(200)
+                handler.send_header("Content-Type", content_type)
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass  # Bez logowania każdego zapytania
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="MetricsHTTPServer", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,231 @@
+# server/multiproc.py
+import multiprocessing
+import queue
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from server.server import DEFAULT_CONFIG_PATH, NetworkServer
+
+# Odstęp raportów metryk z procesów roboczych (sekundy)
+METRICS_INTERVAL = 1.0
+
+
+class QueueSink:
+    """Ujście przekazujące partie wiadomości z procesu roboczego do procesu nadrzędnego."""
+
+    def __init__(self, readings_queue):
+        self.readings_queue = readings_queue
+
+    def __call__(self, messages: List[dict]) -> None:
+        self.readings_queue.put(("messages", messages))
+
+
+def _worker_main(index: int, options: dict, mode: str, listen_socket: Optional[socket.socket],
+                 readings_queue, stop_event) -> None:
+    """
+    Proces roboczy: obsługuje swoją część połączeń i przekazuje do kolejki odczyty,
+    zgłoszenie gotowości ("ready") oraz co METRICS_INTERVAL narastające liczniki I/O ("metrics").
+    """
+    if mode == "asyncio":
+        from server.async_server import AsyncNetworkServer
+        server = AsyncNetworkServer(**options)
+    else:
+        server = NetworkServer(**options)
+
+    if listen_socket is not None:
+        server.server_socket = listen_socket  # model pre-fork: wspólne gniazdo
+    else:
+        server.reuse_port = True              # SO_REUSEPORT: jądro rozdziela połączenia
+        try:
+            server.server_socket = server._create_server_socket()
+        except OSError as e:
+            print(f"Proces roboczy {index}: nie można otworzyć portu {server.port}: {e}", file=sys.stderr)
+            sys.exit(1)
+    server.sinks = [QueueSink(readings_queue)]
+
+    def report_metrics():
+        try:
+            readings_queue.put_nowait(("metrics", (index, server.metrics.counters())))
+        except queue.Full:
+            pass  # liczniki są narastające - kolejny raport uzupełni brak
+
+    def report_until_stop():
+        while not stop_event.wait(METRICS_INTERVAL):
+            report_metrics()
+        server.stop()
+
+    readings_queue.put(("ready", index))
+    threading.Thread(target=report_until_stop, daemon=True).start()
+    try:
+        server.start()
+    except KeyboardInterrupt:
+        pass
+    report_metrics()
+
+
+class MultiProcessServer(NetworkServer):
+    """
+    Serwer wieloprocesowy: N procesów roboczych obsługuje połączenia (każdy z własnym GIL),
+    a odczyty trafiają partiami przez multiprocessing.Queue do tego procesu, gdzie
+    wywoływane są on_data_received i ujścia (sinks).
+
+    Na Linuksie każdy proces otwiera własne gniazdo z SO_REUSEPORT. Na innych systemach
+    gniazdo jest tworzone przed uruchomieniem procesów i dziedziczone (pre-fork).
+
+    Procesy robocze raportują liczniki I/O (bajty, połączenia, opóźnienie ACK), które
+    są sumowane w metrykach tego procesu i dostępne także per proces (worker_*).
+    """
+
+    def __init__(self, port: int = None, config_path: str = DEFAULT_CONFIG_PATH, backlog: int = None,
+                 debug: bool = False, metrics_port: Optional[int] = None,
+                 consumer_workers: Optional[int] = None, ack_mode: Optional[str] = None,
+                 workers: int = None, mode: str = "threaded", queue_size: int = 10000):
+        """
+        :param workers: Liczba procesów roboczych (domyślnie liczba rdzeni)
+        :param mode: Tryb procesów roboczych: "threaded" lub "asyncio"
+        :param queue_size: Maksymalna liczba partii oczekujących w kolejce do konsumenta
+        """
+        super().__init__(port=port, config_path=config_path, backlog=backlog,
+                         debug=debug, metrics_port=metrics_port,
+                         consumer_workers=consumer_workers, ack_mode=ack_mode)
+        self.workers = workers or multiprocessing.cpu_count()
+        self.mode = mode
+        self.queue_size = queue_size
+        self._processes: List[multiprocessing.Process] = []
+        self._stop_event = None
+        self._ready = set()
+        self._worker_counters: Dict[int, Dict] = {}  # ostatni raport liczników każdego procesu
+        self._dead = set()
+        self.metrics.sources["worker_alive"] = self._worker_alive
+        self.metrics.sources["worker_bytes"] = lambda: self._worker_stat("bytes")
+        self.metrics.sources["worker_connections"] = lambda: self._worker_stat("connections")
+
+    def start(self) -> None:
+        """Uruchamia procesy robocze i konsumuje odczyty do czasu wywołania stop()."""
+        # SO_REUSEPORT rozdziela połączenia między gniazda tylko na Linuksie (BSD/macOS - nie)
+        use_reuse_port = sys.platform.startswith("linux") and hasattr(socket, "SO_REUSEPORT")
+        if use_reuse_port:
+            context = multiprocessing.get_context()
+            listen_socket = None
+        elif "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+            listen_socket = self._create_server_socket()
+        else:
+            raise RuntimeError("Tryb wieloprocesowy wymaga SO_REUSEPORT lub fork().")
+
+        readings_queue = context.Queue(maxsize=self.queue_size)
+        self._stop_event = context.Event()
+        # Procesy robocze tylko dekodują i przekazują dane - potok działa w tym procesie
+        options = dict(port=self.port, backlog=self.backlog, consumer_workers=0)
+
+        for index in range(self.workers):
+            process = context.Process(
+                target=_worker_main,
+                args=(index, options, self.mode, listen_socket, readings_queue, self._stop_event),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+        if listen_socket is not None:
+            listen_socket.close()  # Procesy robocze mają własne kopie gniazda
+
+        try:
+            self._wait_for_workers(readings_queue)
+        except Exception:
+            self._shutdown_workers()
+            raise
+
+        self.running = True
+        self._start_metrics_endpoint()
+        print(f"Serwer ({self.workers} procesów, {self.mode}) nasłuchuje na {self.host}:{self.port}")
+
+        if self.pipeline:
+            self.pipeline.start()
+        try:
+            self._consume_queue(readings_queue)
+        finally:
+            self._shutdown_workers()
+
+    def _wait_for_workers(self, readings_queue, timeout: float = 10.0) -> None:
+        """Czeka, aż każdy proces roboczy zgłosi otwarte gniazdo; błąd, gdy któryś zakończy się wcześniej."""
+        deadline = time.monotonic() + timeout
+        while len(self._ready) < len(self._processes):
+            failed = [process.exitcode for process in self._processes if process.exitcode is not None]
+            if failed:
+                raise RuntimeError(f"Procesy robocze zakończyły się przy starcie (kody wyjścia: {failed})")
+            if time.monotonic() > deadline:
+                raise RuntimeError("Procesy robocze nie uruchomiły się w wyznaczonym czasie")
+            try:
+                self._handle_item(*readings_queue.get(timeout=0.1))
+            except queue.Empty:
+                continue
+
+    def _consume_queue(self, readings_queue) -> None:
+        """Przekazuje partie odczytów z procesów roboczych do on_data_received i ujść."""
+        while self.running:
+            try:
+                item = readings_queue.get(timeout=0.2)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            self._handle_item(*item)
+
+    def _handle_item(self, kind: str, payload) -> None:
+        """Obsługuje wpis kolejki od procesu roboczego: partię odczytów, raport metryk lub gotowość."""
+        if kind == "ready":
+            self._ready.add(payload)
+        elif kind == "metrics":
+            index, counters = payload
+            if index not in self._dead:
+                self.metrics.add_counters(counters, self._worker_counters.get(index))
+                self._worker_counters[index] = counters
+        else:
+            self.metrics.record_messages(payload)
+            try:
+                if self.pipeline:
+                    self.pipeline.submit(payload)
+                else:
+                    self._consume(payload)
+            except Exception as e:
+                print(f"Inny błąd: {str(e)}", file=sys.stderr)
+
+    def _check_workers(self) -> None:
+        """Zgłasza procesy robocze, które zakończyły się w trakcie pracy (ich połączenia przestają się liczyć)."""
+        for index, process in enumerate(self._processes):
+            if index in self._dead or process.exitcode is None:
+                continue
+            self._dead.add(index)
+            print(f"Proces roboczy {index} zakończył się (kod wyjścia {process.exitcode})", file=sys.stderr)
+            counters = self._worker_counters.get(index)
+            if counters:
+                closed = dict(counters, connections=0)
+                self.metrics.add_counters(closed, counters)
+                self._worker_counters[index] = closed
+
+    def _worker_alive(self) -> Dict[int, int]:
+        return {index: int(process.is_alive()) for index, process in enumerate(self._processes)}
+
+    def _worker_stat(self, name: str) -> Dict[int, int]:
+        return {index: counters[name] for index, counters in sorted(self._worker_counters.items())}
+
+    def _shutdown_workers(self) -> None:
+        if self._stop_event is not None:
+            self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._ready.clear()
+        if self.pipeline:
+            self.pipeline.stop()
+        self._stop_metrics_endpoint()
+        print("Serwer wieloprocesowy zatrzymany.")
+
+    def stop(self) -> None:
+        """Zatrzymuje konsumenta i procesy robocze."""
+        self.running = False
@@ -0,0 +1,164 @@
+# server/pipeline.py
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Dict
+
+
+class IngestPipeline:
+    """
+    Potok przyjmowania danych: wątki I/O dekodują wiadomości i wrzucają partie
+    do ograniczonej kolejki, a pula wątków konsumentów przekazuje je dalej
+    (on_data_received, ujścia). Pełna kolejka blokuje wątek I/O (backpressure),
+    co jest widoczne w statystykach.
+
+    ack_mode:
+      - "before": ACK wysyłany zaraz po przyjęciu partii do kolejki,
+      - "after": ACK dopiero po przetworzeniu partii przez konsumenta
+                 (błąd konsumenta = brak ACK, klient wyśle dane ponownie).
+    """
+
+    ACK_MODES = ("before", "after")
+
+    def __init__(self, consumer: Callable[[List[dict]], None], workers: int = 4, queue_size: int = 1000,
+                 ack_mode: str = "after", max_batch: int = 1024):
+        """
+        :param consumer: Funkcja przetwarzająca partię wiadomości
+        :param workers: Liczba wątków konsumentów
+        :param queue_size: Maksymalna liczba partii w kolejce
+        :param ack_mode: "before" lub "after" (patrz opis klasy)
+        :param max_batch: Maksymalna liczba wiadomości łączonych w jedną partię dla konsumenta
+        """
+        if ack_mode not in self.ACK_MODES:
+            raise ValueError(f"Nieznany tryb ACK: {ack_mode}")
+        self.consumer = consumer
+        self.workers = workers
+        self.ack_mode = ack_mode
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+        self._stats_lock = threading.Lock()
+        self.submitted_batches = 0
+        self.processed_batches = 0
+        self.processed_messages = 0
+        self.failed_batches = 0
+        self.blocked_puts = 0
+        self.blocked_time = 0.0
+        self.consumer_time = 0.0
+        self.max_depth = 0
+
+    def start(self) -> None:
+        """Uruchamia wątki konsumentów."""
+        if self._running:
+            return
+        self._running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"IngestWorker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Przetwarza zawartość kolejki i zatrzymuje wątki konsumentów."""
+        self._running = False
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+        # Partie wrzucone w trakcie zatrzymywania, po wyjściu konsumentów - kończą się błędem (bez ACK)
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if future is not None:
+                future.set_exception(RuntimeError("Potok zatrzymany - partia nieprzetworzona"))
+
+    def submit(self, messages: List[dict], block: bool = True) -> Optional[Future]:
+        """
+        Wrzuca partię do kolejki; gdy kolejka jest pełna, blokuje (block=True)
+        albo zgłasza queue.Full (block=False - np. dla pętli asyncio).
+        W trybie "after" zwraca Future zakończony po przetworzeniu partii.
+        Po stop() (lub przed start()) zgłasza RuntimeError - partia nie zostałaby przetworzona.
+        """
+        if not self._running:
+            raise RuntimeError("Potok nie działa - partia odrzucona")
+        future = Future() if self.ack_mode == "after" else None
+        item = (messages, future)
+
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if not block:
+                raise
+            started = time.perf_counter()
+            self._queue.put(item)
+            with self._stats_lock:
+                self.blocked_puts += 1
+                self.blocked_time += time.perf_counter() - started
+
+        with self._stats_lock:
+            self.submitted_batches += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return future
+
+    def _worker_loop(self) -> None:
+        while self._running or not self._queue.empty():
+            try:
+                batch = [self._queue.get(timeout=0.2)]
+            except queue.Empty:
+                continue
+
+            # Połącz małe partie z kolejki w jedną większą
+            size = len(batch[0][0])
+            while size < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            messages = [message for item in batch for message in item[0]]
+            started = time.perf_counter()
+            error = None
+            try:
+                self.consumer(messages)
+            except Exception as e:
+                error = e
+                print(f"Błąd konsumenta potoku: {str(e)}", file=sys.stderr)
+            elapsed = time.perf_counter() - started
+
+            for _, future in batch:
+                if future is None:
+                    continue
+                if error is None:
+                    future.set_result(len(messages))
+                else:
+                    future.set_exception(error)
+
+            with self._stats_lock:
+                self.processed_batches += len(batch)
+                self.processed_messages += len(messages)
+                self.consumer_time += elapsed
+                if error is not None:
+                    self.failed_batches += len(batch)
+
+    def stats(self) -> Dict:
+        """Zwraca statystyki potoku (m.in. głębokość kolejki i czas blokowania wątków I/O)."""
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_max_depth": self.max_depth,
+                "queue_capacity": self._queue.maxsize,
+                "submitted_batches": self.submitted_batches,
+                "processed_batches": self.processed_batches,
+                "processed_messages": self.processed_messages,
+                "failed_batches": self.failed_batches,
+                "blocked_puts": self.blocked_puts,
+                "blocked_time_s": round(self.blocked_time, 6),
+                "consumer_time_s": round(self.consumer_time, 6),
+            }
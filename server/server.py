@@ -1,16 +1,64 @@
 # server/server.py
+import os
 import socket
 import json
+import queue
+import time
 import yaml
 import sys
 from threading import Thread
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Domyślna konfiguracja względem repozytorium, a nie katalogu roboczego (python server.py i python -m server.server)
+DEFAULT_CONFIG_PATH = os.path.join(ROOT_DIR, "config.yaml")
+
+if not __package__:
+    # Uruchomienie jako skrypt (python server.py): pakiety network/ i server/ importowane
+    # od katalogu głównego repozytorium, a nie od katalogu server/
+    sys.path[0] = ROOT_DIR
+
+from network.protocol import BinaryDecoder, is_hello, encode_ack, encode_frame, FRAME_ERROR
+from server.buffer import ReceiveBuffer
+from server.metrics import ServerMetrics, ConsoleSink, MetricsHTTPServer
+from server.pipeline import IngestPipeline
+
+
+class ConnectionState:
+    """
+    Stan pojedynczego połączenia: bufor linii JSON lub dekoder ramek binarnych
+    oraz partie oczekujące w potoku przyjmowania danych.
+    """
+    __slots__ = ("buffer", "decoder", "negotiated", "blocking", "pending", "deferred")
+
+    def __init__(self, blocking: bool = True):
+        self.buffer = ReceiveBuffer()
+        self.decoder: Optional[BinaryDecoder] = None
+        self.negotiated = False
+        self.blocking = blocking                 # False - wątek I/O nie może czekać (asyncio)
+        self.pending: Optional[Future] = None    # partia, której przetworzenie poprzedza ACK
+        self.deferred: Optional[List[dict]] = None  # partia niewrzucona do pełnej kolejki potoku
 
 
 class NetworkServer:
-    def __init__(self, port: int = None, config_path: str = "../config.yaml"):
-        """Inicjalizuje serwer na wskazanym porcie."""
+    DEFAULT_BACKLOG = 128
+    ACK_OK = (json.dumps({"status": "ok"}) + "\n").encode()
+    ACK_BINARY = (json.dumps({"status": "ok", "protocol": "binary"}) + "\n").encode()
+
+    def __init__(self, port: int = None, config_path: str = DEFAULT_CONFIG_PATH, backlog: int = None,
+                 debug: bool = False, metrics_port: Optional[int] = None,
+                 consumer_workers: Optional[int] = None, ack_mode: Optional[str] = None):
+        """
+        Inicjalizuje serwer na wskazanym porcie.
+        :param debug: Wypisuj każdą odebraną wiadomość na konsolę (ConsoleSink)
+        :param metrics_port: Port lokalnego endpointu HTTP z metrykami (None - wyłączony)
+        :param consumer_workers: Liczba wątków potoku przekazujących dane do on_data_received
+                                 i ujść (0 - przetwarzanie w wątku połączenia)
+        :param ack_mode: Tryb ACK potoku: "before" lub "after" przetworzenia
+        """
+        config = self._load_config(config_path)
         if port is None:
-            config = self._load_config(config_path)
             # Szukaj portu w sekcjach 'server' lub 'network'
             self.port = (
                     config.get("server", {}).get("port")
@@ -21,26 +69,55 @@ class NetworkServer:
         else:
             self.port = port
 
+        # Długość kolejki oczekujących połączeń (listen backlog)
+        self.backlog = backlog or config.get("server", {}).get("backlog") or self.DEFAULT_BACKLOG
+
         self.host = "0.0.0.0"
         self.running = False
         self.server_socket = None
         self.on_data_received = None
+        # SO_REUSEPORT: kilka procesów może nasłuchiwać na tym samym porcie (tryb --workers)
+        self.reuse_port = False
+
+        # Metryki i ujścia danych: sink to funkcja przyjmująca listę odebranych wiadomości
+        self.metrics = ServerMetrics()
+        self.sinks = [ConsoleSink()] if debug else []
+        self.metrics_port = metrics_port or config.get("server", {}).get("metrics_port")
+        self._metrics_http: Optional[MetricsHTTPServer] = None
+
+        # Potok przyjmowania danych: dekodowanie w wątku I/O, przetwarzanie w puli konsumentów
+        pipeline_config = config.get("server", {}).get("pipeline", {})
+        workers = consumer_workers if consumer_workers is not None else pipeline_config.get("workers", 0)
+        self.pipeline: Optional[IngestPipeline] = None
+        if workers:
+            self.pipeline = IngestPipeline(
+                self._consume,
+                workers=workers,
+                queue_size=pipeline_config.get("queue_size", 1000),
+                ack_mode=ack_mode or pipeline_config.get("ack_mode", "after")
+            )
+            self.metrics.sources["pipeline"] = self.pipeline.stats
+        # Maksymalny czas oczekiwania na przetworzenie partii przed ACK (potem połączenie jest zamykane)
+        self.ack_timeout = pipeline_config.get("ack_timeout", 30.0)
 
     def _load_config(self, config_path: str) -> dict:
         """Wczytuje konfigurację z pliku YAML."""
         try:
             with open(config_path, "r") as f:
                 config = yaml.safe_load(f)
-                return config
+                return config or {}
         except FileNotFoundError:
             return {}
 
     def start(self) -> None:
         """Uruchamia nasłuchiwanie połączeń i obsługę klientów."""
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
+        # Gniazdo może być już przygotowane (np. odziedziczone po procesie nadrzędnym)
+        if self.server_socket is None:
+            self.server_socket = self._create_server_socket()
         self.running = True
+        self._start_metrics_endpoint()
+        if self.pipeline:
+            self.pipeline.start()
         print(f"Serwer nasłuchuje na {self.host}:{self.port}")
 
         while self.running:
@@ -55,67 +132,242 @@ class NetworkServer:
             except OSError:
                 break
 
+    def _create_server_socket(self) -> socket.socket:
+        """Tworzy gniazdo nasłuchujące na porcie serwera."""
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if self.reuse_port:
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        server_socket.bind((self.host, self.port))
+        server_socket.listen(self.backlog)
+        return server_socket
+
     def _handle_client(self, client_socket) -> None:
         """Przetwarzaj wszystkie wiadomości w jednym połączeniu."""
+        self.metrics.connection_opened()
         try:
             client_socket.settimeout(30.0)
-            buffer = b""
+            state = ConnectionState()
 
             while True:
-                # Odbierz dane partiami (do 4096 bajtów)
-                data = client_socket.recv(4096)
-                if not data:
+                # Odbierz dane prosto do bufora połączenia (bez kopiowania)
+                received = state.buffer.recv_into(client_socket)
+                if not received:
                     break  # Klient zamknął połączenie
+                received_at = time.perf_counter()
 
-                buffer += data
-
-                # Przetwarzaj wszystkie kompletne wiadomości (rozdzielone \n)
-                while b"\n" in buffer:
-                    message_part, buffer = buffer.split(b"\n", 1)
+                response = self._process_buffer(state)
+                if state.pending is not None:
+                    # ACK dopiero po przetworzeniu partii przez potok
                     try:
-                        decoded = message_part.decode().strip()
-                        if not decoded:
-                            continue  # Pomiń puste linie
-
-                        data = json.loads(decoded)
-                        self._print_data(data)
-
-                        if self.on_data_received and callable(self.on_data_received):
-                            self.on_data_received(data)
-
-                        # Wyślij ACK
-                        ack = json.dumps({"status": "ok"}) + "\n"
-                        client_socket.sendall(ack.encode())
-
-                    except json.JSONDecodeError as e:
-                        print(f"Błąd parsowania JSON: {e}\nDane: {decoded}", file=sys.stderr)
-                        client_socket.sendall(b"ERROR\n")
-
-                    except Exception as e:
-                        print(f"Inny błąd: {str(e)}", file=sys.stderr)
+                        error = state.pending.exception(timeout=self.ack_timeout)
+                    except FutureTimeoutError:
+                        # Bez ACK - klient wyśle partię ponownie po ponownym połączeniu
+                        print("Potok nie przetworzył partii w czasie - zamykam połączenie.", file=sys.stderr)
                         break
+                    if not self._pending_succeeded(error):
+                        response = b""
+                    state.pending = None
+                if response:
+                    client_socket.sendall(response)
+                    self.metrics.record_io(received, time.perf_counter() - received_at)
+                else:
+                    self.metrics.record_io(received)
 
         except socket.timeout:
             print("Timeout połączenia.", file=sys.stderr)
         except Exception as e:
             print(f"Błąd: {str(e)}", file=sys.stderr)
         finally:
+            self.metrics.connection_closed()
             client_socket.close()
             print("Połączenie z klientem zamknięte.")
 
-    def _print_data(self, data: dict) -> None:
-        """Wyświetla dane w czytelnej formie."""
-        print("\n--- Odebrane dane ---")
-        for key, value in data.items():
-            print(f"{key.upper():<15}: {value}")
-        print("---------------------\n")
+    def _process_buffer(self, state: ConnectionState) -> bytes:
+        """Przetwarza dane z bufora połączenia (JSON lub ramki binarne) i zwraca odpowiedź."""
+        if state.decoder is not None:
+            return self._handle_frames(state)
+
+        # Pierwsza linia połączenia może być prośbą o przejście na protokół binarny
+        if not state.negotiated:
+            first_line = state.buffer.pop_lines(max_lines=1)
+            if not first_line:
+                return b""
+            state.negotiated = True
+            if is_hello(first_line[0].strip()):
+                state.decoder = BinaryDecoder()
+                return self.ACK_BINARY + (self._handle_frames(state) if len(state.buffer) else b"")
+            return self._handle_messages(state, first_line + state.buffer.pop_lines())
+
+        # Przetwarzaj wszystkie kompletne wiadomości (rozdzielone \n) jedną partią
+        return self._handle_messages(state, state.buffer.pop_lines())
+
+    def _handle_frames(self, state: ConnectionState) -> bytes:
+        """Przetwarza ramki binarne wprost z bufora połączenia i zwraca skumulowany ACK (ramkę)."""
+        view = state.buffer.view()
+        try:
+            messages, last_seq, errors, consumed = state.decoder.decode(view)
+        finally:
+            view.release()  # przed kolejnym odbiorem bufor może zmienić rozmiar
+        state.buffer.consume(consumed)
+
+        try:
+            self._deliver(state, messages, errors)
+        except Exception as e:
+            # Bez ACK - klient wyśle partię ponownie
+            print(f"Inny błąd: {str(e)}", file=sys.stderr)
+            return b""
+
+        response = b""
+        if errors:
+            print(f"Błąd dekodowania ramek binarnych: {errors}", file=sys.stderr)
+            response += encode_frame(FRAME_ERROR)
+        if last_seq is not None:
+            response += encode_ack(last_seq, len(messages))
+        return response
+
+    def _handle_messages(self, state: ConnectionState, lines: List[bytes]) -> bytes:
+        """
+        Przetwarza partię wiadomości i zwraca zbiorczą odpowiedź.
+
+        Wiadomości bez pola 'seq' dostają osobny ACK ({"status": "ok"}).
+        Wiadomości z polem 'seq' (tryb potokowy klienta) są potwierdzane jednym
+        skumulowanym ACK na partię: {"status": "ok", "ack": <ostatni seq>, "count": n}.
+        """
+        responses = []
+        messages = []
+        parse_errors = 0
+        last_seq = None
+        count = 0
+
+        for message_part in lines:
+            try:
+                decoded = message_part.decode().strip()
+                if not decoded:
+                    continue  # Pomiń puste linie
+
+                data = json.loads(decoded)
+                seq = data.pop("seq", None) if isinstance(data, dict) else None
+                messages.append(data)
+
+                if seq is None:
+                    responses.append(self.ACK_OK)
+                else:
+                    last_seq = seq
+                    count += 1
+
+            except json.JSONDecodeError as e:
+                print(f"Błąd parsowania JSON: {e}\nDane: {decoded}", file=sys.stderr)
+                responses.append(b"ERROR\n")
+                parse_errors += 1
+
+            except Exception as e:
+                # Linia jest już zdjęta z bufora - odpowiedz błędem i przetwarzaj dalsze linie
+                print(f"Inny błąd: {str(e)}", file=sys.stderr)
+                responses.append(b"ERROR\n")
+                parse_errors += 1
+
+        try:
+            self._deliver(state, messages, parse_errors)
+        except Exception as e:
+            # Bez ACK - klient wyśle partię ponownie
+            print(f"Inny błąd: {str(e)}", file=sys.stderr)
+            return b""
+
+        if last_seq is not None:
+            responses.append((json.dumps({"status": "ok", "ack": last_seq, "count": count}) + "\n").encode())
+        return b"".join(responses)
+
+    def _deliver(self, state: ConnectionState, messages: List[dict], parse_errors: int = 0) -> None:
+        """Przekazuje zdekodowaną partię do przetworzenia: od razu albo przez potok."""
+        self.metrics.record_messages(messages, parse_errors)
+        if not messages:
+            return
+
+        if self.pipeline is None:
+            self._consume(messages)
+            return
+
+        try:
+            future = self.pipeline.submit(messages, block=state.blocking)
+        except queue.Full:
+            state.deferred = messages  # Wątek I/O wrzuci partię, gdy zwolni się miejsce
+            return
+        if future is not None:
+            state.pending = future
+
+    def _consume(self, messages: List[dict]) -> None:
+        """Przetwarza partię: hook on_data_received dla każdej wiadomości i ujścia (sinks)."""
+        if self.on_data_received and callable(self.on_data_received):
+            for message in messages:
+                self.on_data_received(message)
+        for sink in self.sinks:
+            try:
+                sink(messages)
+            except Exception as e:
+                print(f"Błąd ujścia danych: {str(e)}", file=sys.stderr)
+
+    @staticmethod
+    def _pending_succeeded(error: Optional[BaseException]) -> bool:
+        """Zwraca True, jeśli partia została przetworzona bez błędu."""
+        if error is not None:
+            print(f"Inny błąd: {str(error)}", file=sys.stderr)
+            return False
+        return True
+
+    def _start_metrics_endpoint(self) -> None:
+        """Uruchamia endpoint HTTP z metrykami, jeśli skonfigurowano metrics_port."""
+        if self.metrics_port and not self._metrics_http:
+            self._metrics_http = MetricsHTTPServer(self.metrics, self.metrics_port)
+            self._metrics_http.start()
+            print(f"Metryki dostępne na http://127.0.0.1:{self.metrics_port}/metrics")
+
+    def _stop_metrics_endpoint(self) -> None:
+        if self._metrics_http:
+            self._metrics_http.stop()
+            self._metrics_http = None
 
     def stop(self) -> None:
         """Zatrzymuje serwer."""
         self.running = False
         if self.server_socket:
+            try:
+                # Samo close() nie przerywa zablokowanego accept() w innym wątku
+                self.server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             self.server_socket.close()
+            self.server_socket = None
+        if self.pipeline:
+            self.pipeline.stop()
+        self._stop_metrics_endpoint()
 
 if __name__ == "__main__":
-    server = NetworkServer()
-    server.start()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serwer odbiorczy danych z czujników")
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH)
+    parser.add_argument("--backlog", type=int, default=None)
+    parser.add_argument("--mode", choices=["threaded", "asyncio"], default="threaded")
+    parser.add_argument("--debug", action="store_true", help="wypisuj każdą odebraną wiadomość")
+    parser.add_argument("--metrics-port", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1, help="liczba procesów obsługujących połączenia")
+    parser.add_argument("--consumer-workers", type=int, default=None, help="wątki potoku przetwarzania danych")
+    parser.add_argument("--ack-mode", choices=["before", "after"], default=None)
+    args = parser.parse_args()
+
+    options = dict(port=args.port, config_path=args.config, backlog=args.backlog,
+                   debug=args.debug, metrics_port=args.metrics_port,
+                   consumer_workers=args.consumer_workers, ack_mode=args.ack_mode)
+    if args.workers > 1:
+        from server.multiproc import MultiProcessServer
+        server = MultiProcessServer(workers=args.workers, mode=args.mode, **options)
+    elif args.mode == "asyncio":
+        from server.async_server import AsyncNetworkServer
+        server = AsyncNetworkServer(**options)
+    else:
+        server = NetworkServer(**options)
+    try:
+        server.start()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,282 @@
+# storage/columnar.py
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy jest opcjonalny - bez niego czytnik zwraca array.array i listy
+    np = None
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+SEGMENT_HEAD = struct.Struct("<4sI")  # magia, długość nagłówka JSON
+SEGMENT_MAGIC = b"COL1"
+
+# Kolumny: znacznik czasu (int64, kodowanie różnicowe), wartość (float64),
+# klucz słownika (sensor_id, unit) (uint16); każda kolumna kompresowana osobno (zlib)
+COLUMN_TYPES = {"timestamp": "q", "value": "d", "key": "H"}
+NUMPY_TYPES = {"timestamp": "<i8", "value": "<f8", "key": "<u2"}
+MAX_DICTIONARY_SIZE = 0xFFFF
+
+
+def to_micros(timestamp: datetime) -> int:
+    """
+    Mikrosekundy od 1970-01-01 liczone w czasie lokalnym (bez strefy - jak datetime64[us]).
+    Znacznik ze strefą czasową jest najpierw przeliczany na czas lokalny.
+    """
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class ColumnarStore:
+    """
+    Kolumnowy magazyn odczytów dla Loggera (obok CSV).
+
+    Wiersze są zbierane w pamięci i zapisywane jako niezmienne segmenty <numer>.col
+    po `segment_rows` wierszach (oraz przy flush()). Segment zawiera nagłówek JSON
+    (liczba wierszy, zakres czasu, słownik par (sensor_id, unit)) i trzy skompresowane
+    kolumny typowane. Pola level/message nie są przechowywane, a wiersze z poziomem
+    (komunikaty SYSTEM/NETWORK loggera) są pomijane - jak w agregatach (RollupStore).
+    read() pomija segmenty spoza zakresu lub bez danego czujnika i filtruje wektorowo
+    (NumPy, gdy jest dostępny).
+    """
+
+    SEGMENT_SUFFIX = ".col"
+
+    def __init__(self, directory: str, segment_rows: int = 65536, compression_level: int = 6):
+        """
+        :param directory: Katalog segmentów
+        :param segment_rows: Liczba wierszy, po której zapisywany jest segment
+        :param compression_level: Poziom kompresji zlib kolumn (1-9)
+        """
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.compression_level = compression_level
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._next_segment = max(self._segment_numbers(), default=0) + 1
+        self._reset_pending()
+
+    def _reset_pending(self) -> None:
+        self._timestamps = array("q")
+        self._values = array("d")
+        self._keys = array("H")
+        self._dictionary: Dict[Tuple[str, str], int] = {}
+
+    def _segment_numbers(self) -> List[int]:
+        suffix = self.SEGMENT_SUFFIX
+        return sorted(
+            int(name[:-len(suffix)])
+            for name in os.listdir(self.directory)
+            if name.endswith(suffix) and name[:-len(suffix)].isdigit()
+        )
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"{number:08d}{self.SEGMENT_SUFFIX}")
+
+    def write_rows(self, rows: List[list]) -> None:
+        """Dopisuje wiersze w formacie Loggera: [timestamp ISO, sensor_id, value, unit, level, message]."""
+        with self._lock:
+            for row in rows:
+                if row[4]:
+                    continue
+                try:
+                    timestamp = to_micros(datetime.fromisoformat(row[0]))
+                except (TypeError, ValueError):
+                    continue  # błędny znacznik nie może przerwać zapisu partii
+                key = (str(row[1]), str(row[3]))
+                index = self._dictionary.get(key)
+                if index is None:
+                    if len(self._dictionary) >= MAX_DICTIONARY_SIZE:
+                        self._write_segment()
+                    index = self._dictionary[key] = len(self._dictionary)
+                try:
+                    value = float(row[2])
+                except (TypeError, ValueError):
+                    value = math.nan
+                self._timestamps.append(timestamp)
+                self._values.append(value)
+                self._keys.append(index)
+                if len(self._timestamps) >= self.segment_rows:
+                    self._write_segment()
+
+    def flush(self) -> None:
+        """Zapisuje niepełny segment z pamięci na dysk."""
+        with self._lock:
+            self._write_segment()
+
+    def close(self) -> None:
+        self.flush()
+
+    def _write_segment(self) -> None:
+        if not self._timestamps:
+            return
+        timestamps = self._timestamps
+        # Kodowanie różnicowe - kolejne odczyty są blisko w czasie, więc różnice dobrze się kompresują
+        deltas = array("q", (timestamps[0],))
+        deltas.extend(b - a for a, b in zip(timestamps, timestamps[1:]))
+
+        blobs = [
+            zlib.compress(_to_bytes(column), self.compression_level)
+            for column in (deltas, self._values, self._keys)
+        ]
+        columns = {}
+        offset = 0
+        for name, blob in zip(COLUMN_TYPES, blobs):
+            columns[name] = [offset, len(blob)]
+            offset += len(blob)
+
+        header = json.dumps({
+            "rows": len(timestamps),
+            "min": min(timestamps),
+            "max": max(timestamps),
+            "dictionary": [list(key) for key in self._dictionary],
+            "columns": columns,
+        }).encode("utf-8")
+
+        path = self._segment_path(self._next_segment)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SEGMENT_HEAD.pack(SEGMENT_MAGIC, len(header)))
+            f.write(header)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+        self._next_segment += 1
+        self._reset_pending()
+
+    @staticmethod
+    def _read_header(f) -> Optional[Dict]:
+        head = f.read(SEGMENT_HEAD.size)
+        if len(head) != SEGMENT_HEAD.size:
+            return None
+        magic, length = SEGMENT_HEAD.unpack(head)
+        if magic != SEGMENT_MAGIC:
+            return None
+        return json.loads(f.read(length))
+
+    def _segments(self, start: int, end: int, sensor_id: Optional[str]) -> Iterator[Tuple[List, Dict[str, bytes]]]:
+        """Zwraca (słownik, surowe kolumny) segmentów, które mogą zawierać pasujące wiersze."""
+        for number in self._segment_numbers():
+            try:
+                with open(self._segment_path(number), "rb") as f:
+                    header = self._read_header(f)
+                    if header is None or header["max"] < start or header["min"] > end:
+                        continue
+                    if sensor_id is not None and all(key[0] != sensor_id for key in header["dictionary"]):
+                        continue
+                    data = f.read()
+            except FileNotFoundError:
+                continue  # usunięty przez retencję w trakcie zapytania
+            columns = {
+                name: zlib.decompress(data[offset:offset + length])
+                for name, (offset, length) in header["columns"].items()
+            }
+            yield header["dictionary"], columns
+
+        # Wiersze jeszcze niezapisane w segmencie
+        with self._lock:
+            if not self._timestamps:
+                return
+            dictionary = [list(key) for key in self._dictionary]
+            deltas = array("q", (self._timestamps[0],))
+            deltas.extend(b - a for a, b in zip(self._timestamps, self._timestamps[1:]))
+            columns = {"timestamp": _to_bytes(deltas), "value": _to_bytes(self._values),
+                       "key": _to_bytes(self._keys)}
+        yield dictionary, columns
+
+    def read(self, start: datetime, end: datetime, sensor_id: Optional[str] = None) -> Dict:
+        """
+        Zwraca kolumny odczytów z zakresu [start, end] (opcjonalnie jednego czujnika):
+        {"timestamp", "value", "sensor_id", "unit"}.
+        Z NumPy: datetime64[us], float64 i tablice obiektów; bez NumPy: array('q') mikrosekund
+        (patrz to_micros), array('d') i listy.
+        """
+        start_us, end_us = to_micros(start), to_micros(end)
+        if np is not None:
+            return self._read_numpy(start_us, end_us, sensor_id)
+
+        result = {"timestamp": array("q"), "value": array("d"), "sensor_id": [], "unit": []}
+        for dictionary, columns in self._segments(start_us, end_us, sensor_id):
+            timestamps = accumulate(_from_bytes("q", columns["timestamp"]))
+            values = _from_bytes("d", columns["value"])
+            keys = _from_bytes("H", columns["key"])
+            wanted = None
+            if sensor_id is not None:
+                wanted = {i for i, key in enumerate(dictionary) if key[0] == sensor_id}
+            for timestamp, value, key in zip(timestamps, values, keys):
+                if start_us <= timestamp <= end_us and (wanted is None or key in wanted):
+                    result["timestamp"].append(timestamp)
+                    result["value"].append(value)
+                    result["sensor_id"].append(dictionary[key][0])
+                    result["unit"].append(dictionary[key][1])
+        return result
+
+    def _read_numpy(self, start_us: int, end_us: int, sensor_id: Optional[str]) -> Dict:
+        parts = {"timestamp": [], "value": [], "sensor_id": [], "unit": []}
+        for dictionary, columns in self._segments(start_us, end_us, sensor_id):
+            timestamps = np.cumsum(np.frombuffer(columns["timestamp"], dtype=NUMPY_TYPES["timestamp"]))
+            values = np.frombuffer(columns["value"], dtype=NUMPY_TYPES["value"])
+            keys = np.frombuffer(columns["key"], dtype=NUMPY_TYPES["key"])
+
+            mask = (timestamps >= start_us) & (timestamps <= end_us)
+            if sensor_id is not None:
+                wanted = [i for i, key in enumerate(dictionary) if key[0] == sensor_id]
+                mask &= np.isin(keys, wanted)
+            keys = keys[mask]
+            sensor_ids = np.array([key[0] for key in dictionary], dtype=object)
+            units = np.array([key[1] for key in dictionary], dtype=object)
+
+            parts["timestamp"].append(timestamps[mask])
+            parts["value"].append(values[mask])
+            parts["sensor_id"].append(sensor_ids[keys])
+            parts["unit"].append(units[keys])
+
+        return {
+            "timestamp": (np.concatenate(parts["timestamp"]) if parts["timestamp"]
+                          else np.empty(0, dtype=np.int64)).astype("datetime64[us]"),
+            "value": np.concatenate(parts["value"]) if parts["value"] else np.empty(0),
+            "sensor_id": np.concatenate(parts["sensor_id"]) if parts["sensor_id"] else np.empty(0, dtype=object),
+            "unit": np.concatenate(parts["unit"]) if parts["unit"] else np.empty(0, dtype=object),
+        }
+
+    def remove_older_than(self, days: float) -> None:
+        """Usuwa segmenty starsze (wg czasu modyfikacji) niż podana liczba dni."""
+        limit = time.time() - days * 86400
+        for number in self._segment_numbers():
+            path = self._segment_path(number)
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def size_bytes(self) -> int:
+        return sum(os.path.getsize(self._segment_path(number)) for number in self._segment_numbers())
@@ -0,0 +1,165 @@
+# storage/rollups.py
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Rozdzielczość -> (długość prefiksu znacznika ISO wyznaczającego przedział,
+#                   długość prefiksu wyznaczającego plik partycji)
+RESOLUTIONS = {
+    "1min": (16, 10),  # "2025-06-03T15:43" w plikach dziennych
+    "1h": (13, 7),     # "2025-06-03T15" w plikach miesięcznych
+    "1d": (10, 4),     # "2025-06-03" w plikach rocznych
+}
+BUCKET_SUFFIX = {16: "", 13: ":00", 10: "T00:00"}
+
+
+class RollupStore:
+    """
+    Agregaty odczytów (count, sum, min, max) per czujnik w przedziałach 1 min / 1 h / 1 dzień.
+
+    Aktualizowane przy każdym zapisie bufora Loggera (write_rows), a utrwalane przy flush()
+    (wątek zapisu w tle Loggera, rotacja, stop) w plikach JSON <katalog>/<rozdzielczość>/<partycja>.json.
+    Przedział wyznaczany jest z prefiksu znacznika ISO, bez parsowania daty.
+    Wiersze z poziomem (info/error Loggera) nie są agregowane.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        for resolution in RESOLUTIONS:
+            os.makedirs(os.path.join(self.directory, resolution), exist_ok=True)
+        self._lock = threading.Lock()
+        # Zmiany od ostatniego utrwalenia: rozdzielczość -> czujnik -> przedział -> [count, sum, min, max]
+        self._pending: Dict[str, Dict[str, Dict[str, list]]] = {resolution: {} for resolution in RESOLUTIONS}
+
+    def write_rows(self, rows: List[list]) -> None:
+        """Dodaje wiersze w formacie Loggera: [timestamp ISO, sensor_id, value, unit, level, message]."""
+        # Najpierw agregaty minutowe samej partii, potem scalenie ich do wszystkich rozdzielczości
+        batch: Dict[tuple, list] = {}
+        for row in rows:
+            if row[4]:
+                continue
+            try:
+                value = float(row[2])
+            except (TypeError, ValueError):
+                continue
+            key = (row[1], row[0][:16])
+            stats = batch.get(key)
+            if stats is None:
+                batch[key] = [1, value, value, value]
+            else:
+                stats[0] += 1
+                stats[1] += value
+                if value < stats[2]:
+                    stats[2] = value
+                if value > stats[3]:
+                    stats[3] = value
+
+        with self._lock:
+            for (sensor_id, minute), stats in batch.items():
+                sensor_id = str(sensor_id)
+                for resolution, (bucket_length, _) in RESOLUTIONS.items():
+                    buckets = self._pending[resolution].setdefault(sensor_id, {})
+                    bucket = minute[:bucket_length]
+                    buckets[bucket] = self._merge(buckets.get(bucket), stats)
+
+    def flush(self) -> None:
+        """Scala zmiany z plikami partycji (zapis atomowy) i czyści je z pamięci."""
+        with self._lock:
+            for resolution, sensors in self._pending.items():
+                partition_length = RESOLUTIONS[resolution][1]
+                partitions: Dict[str, Dict[str, Dict[str, list]]] = {}
+                for sensor_id, buckets in sensors.items():
+                    for bucket, stats in buckets.items():
+                        partitions.setdefault(bucket[:partition_length], {}).setdefault(sensor_id, {})[bucket] = stats
+
+                for partition, changes in partitions.items():
+                    path = self._partition_path(resolution, partition)
+                    data = self._load(path)
+                    for sensor_id, buckets in changes.items():
+                        stored = data.setdefault(sensor_id, {})
+                        for bucket, stats in buckets.items():
+                            stored[bucket] = self._merge(stored.get(bucket), stats)
+                    tmp_path = path + ".tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(data, f, separators=(",", ":"))
+                    os.replace(tmp_path, path)
+                sensors.clear()
+
+    def close(self) -> None:
+        self.flush()
+
+    def read(self, start: datetime, end: datetime, sensor_id: Optional[str] = None,
+             resolution: str = "1min") -> List[Dict]:
+        """
+        Zwraca agregaty przedziałów nachodzących na [start, end] posortowane po czasie i czujniku:
+        {"timestamp", "sensor_id", "count", "min", "max", "mean"}.
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Nieznana rozdzielczość: {resolution} (dostępne: {', '.join(RESOLUTIONS)})")
+        bucket_length, partition_length = RESOLUTIONS[resolution]
+        suffix = BUCKET_SUFFIX[bucket_length]
+        first = start.isoformat()[:bucket_length]
+        last = end.isoformat()[:bucket_length]
+
+        merged: Dict[tuple, list] = {}
+        folder = os.path.join(self.directory, resolution)
+        for name in os.listdir(folder):
+            partition = name[:-len(".json")]
+            if not name.endswith(".json") or not first[:partition_length] <= partition <= last[:partition_length]:
+                continue
+            for sensor, buckets in self._load(os.path.join(folder, name)).items():
+                if sensor_id is None or sensor == sensor_id:
+                    for bucket, stats in buckets.items():
+                        merged[(bucket, sensor)] = stats
+
+        with self._lock:
+            for sensor, buckets in self._pending[resolution].items():
+                if sensor_id is None or sensor == sensor_id:
+                    for bucket, stats in buckets.items():
+                        merged[(bucket, sensor)] = self._merge(merged.get((bucket, sensor)), stats)
+
+        result = []
+        for (bucket, sensor), (count, total, minimum, maximum) in sorted(merged.items()):
+            if first <= bucket <= last:
+                result.append({
+                    "timestamp": datetime.fromisoformat(bucket + suffix),
+                    "sensor_id": sensor,
+                    "count": count,
+                    "min": minimum,
+                    "max": maximum,
+                    "mean": total / count,
+                })
+        return result
+
+    def remove_older_than(self, days: float) -> None:
+        """Usuwa pliki partycji starsze (wg czasu modyfikacji) niż podana liczba dni."""
+        limit = time.time() - days * 86400
+        for resolution in RESOLUTIONS:
+            folder = os.path.join(self.directory, resolution)
+            for name in os.listdir(folder):
+                path = os.path.join(folder, name)
+                try:
+                    if os.path.getmtime(path) < limit:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _partition_path(self, resolution: str, partition: str) -> str:
+        return os.path.join(self.directory, resolution, f"{partition}.json")
+
+    @staticmethod
+    def _load(path: str) -> Dict:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _merge(stored: Optional[list], stats: list) -> list:
+        if stored is None:
+            return list(stats)
+        return [stored[0] + stats[0], stored[1] + stats[1], min(stored[2], stats[2]), max(stored[3], stats[3])]
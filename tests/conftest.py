@@ -0,0 +1,121 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from server.server import NetworkServer
+
+
+def free_port() -> int:
+    """Zwraca wolny port TCP na localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    """Czeka, aż condition() zwróci True (False po przekroczeniu czasu)."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def reading(seq=None, value=1.0):
+    data = {"sensor_id": "S1", "timestamp": "2025-01-01T12:00:00", "value": value, "unit": "°C"}
+    if seq is not None:
+        data["seq"] = seq
+    return data
+
+
+def send_lines(sock, items):
+    sock.sendall(b"".join(json.dumps(item).encode() + b"\n" for item in items))
+
+
+def read_lines(sock, count):
+    data = b""
+    while data.count(b"\n") < count:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return [json.loads(line) if line.startswith(b"{") else line for line in data.splitlines()]
+
+
+def readings(count):
+    return [reading(value=float(i)) for i in range(count)]
+
+
+class FlakyServer:
+    """Serwer testowy ze skumulowanym ACK, który zrywa pierwsze połączenie po odebraniu danych (bez ACK)."""
+
+    def __init__(self, drop_first=True):
+        self.port = free_port()
+        self.drop_first = drop_first
+        self.received = []  # wszystkie odebrane wiadomości, także powtórzone
+        self.connections = 0
+        self._sock = socket.create_server(("127.0.0.1", self.port))
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn, self.connections), daemon=True).start()
+
+    def _handle(self, conn, number):
+        buffer = b""
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    return
+                if number == 1 and self.drop_first:
+                    return  # zerwane połączenie - klient musi wysłać dane ponownie
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                messages = [json.loads(line) for line in lines if line]
+                if messages:
+                    self.received += messages
+                    ack = {"status": "ok", "ack": messages[-1]["seq"], "count": len(messages)}
+                    conn.sendall(json.dumps(ack).encode() + b"\n")
+
+    def close(self):
+        self._sock.close()
+
+
+@pytest.fixture
+def start_server():
+    """Uruchamia serwer w wątku: start_server(port=None, server_class=NetworkServer, **opcje) -> (serwer, odebrane)."""
+    servers = []
+
+    def factory(port=None, server_class=NetworkServer, **options):
+        server = server_class(port=port or free_port(), config_path="nonexistent.yaml", **options)
+        received = []
+        server.on_data_received = received.append
+        thread = threading.Thread(target=server.start, daemon=True)
+        thread.start()
+        assert wait_until(lambda: server.running and server.server_socket is not None
+                          and (server.pipeline is None or server.pipeline._running))
+        servers.append((server, thread))
+        return server, received
+
+    yield factory
+    for server, thread in servers:
+        server.stop()
+        thread.join(5)
+
+
+@pytest.fixture
+def flaky_server():
+    server = FlakyServer()
+    yield server
+    server.close()
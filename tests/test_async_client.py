@@ -0,0 +1,28 @@
+import asyncio
+
+from network.async_client import AsyncNetworkClient
+from tests.conftest import readings
+
+
+def test_async_client_reconnects_and_resends(flaky_server):
+    async def run():
+        client = AsyncNetworkClient("127.0.0.1", flaky_server.port, timeout=5, retries=3, window=8, backoff=0.01)
+        try:
+            return await client.send_many(readings(30))
+        finally:
+            await client.close()
+
+    assert asyncio.run(run()) == 30
+    assert {message["value"] for message in flaky_server.received} == {float(i) for i in range(30)}
+    assert flaky_server.connections >= 2
+
+
+def test_async_client_concurrent_senders(start_server):
+    server, received = start_server()
+
+    async def run():
+        async with AsyncNetworkClient("127.0.0.1", server.port, window=16) as client:
+            return await asyncio.gather(*(client.send_many(readings(25)) for _ in range(4)))
+
+    assert asyncio.run(run()) == [25, 25, 25, 25]
+    assert len(received) == 100
@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+import pytest
+
+from Sensors.AsyncSensorRunner import AsyncSensorRunner
+from tests.test_scheduler import FakeSensor
+
+
+def test_groups_read_on_deadlines_with_shared_timestamps():
+    runner = AsyncSensorRunner()
+    sensors = [FakeSensor(f"S{i}", 0.05) for i in range(3)]
+    slow = FakeSensor("slow", 0.2)
+    for sensor in sensors + [slow]:
+        runner.add(sensor)
+    batches = []
+    runner.register_batch_callback(batches.append)
+
+    asyncio.run(runner.run(duration=1.0))
+
+    # Takty bezwzględne (start + k * okres): takt 0 od razu, potem co okres
+    assert all(20 <= sensor.reads <= 21 for sensor in sensors)
+    assert 5 <= slow.reads <= 6
+    assert runner.skipped == 0
+    group_batches = [batch for batch in batches if batch[0][0] == "S0"]
+    for batch in group_batches:
+        assert [record[0] for record in batch] == ["S0", "S1", "S2"]
+        assert len({record[1] for record in batch}) == 1
+
+
+def test_overdue_ticks_are_skipped():
+    runner = AsyncSensorRunner()
+    sensor = FakeSensor("A", 0.05, delay=0.12)  # odczyt blokuje pętlę dłużej niż okres
+    runner.add(sensor)
+
+    started = time.monotonic()
+    asyncio.run(runner.run(duration=1.0))  # kończy się mimo odczytów dłuższych niż okres
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 3
+    assert runner.skipped > sensor.reads / 2
+    # Każdy takt jest albo wykonany, albo policzony jako pominięty
+    assert sensor.reads + runner.skipped == pytest.approx(elapsed / 0.05, abs=3)
+
+
+def test_slow_sensors_read_in_threads():
+    runner = AsyncSensorRunner()
+    fast, slow = FakeSensor("fast", 0.05), FakeSensor("slow", 0.05, delay=0.2)
+    runner.add(fast)
+    runner.add(slow, slow=True)
+
+    asyncio.run(runner.run(duration=0.6))
+
+    assert fast.reads >= 11  # wolny odczyt w wątku nie blokuje pętli zdarzeń
+    assert slow.reads <= 4
+
+
+def test_max_pending_applies_backpressure():
+    async def scenario():
+        runner = AsyncSensorRunner(max_pending=2)
+        sensor = FakeSensor("A", 0.02)
+        runner.add(sensor)
+        release = asyncio.Event()
+        delivered = []
+
+        async def send(records):
+            await release.wait()
+            delivered.append(records)
+
+        runner.register_batch_callback(send)
+        task = asyncio.ensure_future(runner.run())
+        await asyncio.sleep(0.3)
+        # Dwie wysyłki trwają, trzecia partia czeka na wolne miejsce - kolejne odczyty wstrzymane
+        assert len(runner._pending) == 2
+        assert sensor.reads == 3
+
+        release.set()
+        await asyncio.sleep(0.2)
+        assert sensor.reads > 3
+        runner.stop()
+        await task
+        assert len(delivered) == sensor.reads
+        assert not runner._pending
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_run_cancels_pending_sends():
+    async def scenario():
+        runner = AsyncSensorRunner()
+        sensor = FakeSensor("A", 0.02)
+        runner.add(sensor)
+        cancelled = []
+
+        async def send(records):
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(records)
+                raise
+
+        runner.register_batch_callback(send)
+        task = asyncio.ensure_future(runner.run())
+        await asyncio.sleep(0.1)
+        started = time.monotonic()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert time.monotonic() - started < 1
+        assert sensor.reads > 0 and len(cancelled) == sensor.reads  # żadna wysyłka nie czeka do końca
+        assert not runner._pending
+
+    asyncio.run(scenario())
+
+
+def test_stop_waits_for_pending_sends():
+    async def scenario():
+        runner = AsyncSensorRunner()
+        runner.add(FakeSensor("A", 0.05))
+        delivered = []
+
+        async def send(records):
+            await asyncio.sleep(0.2)
+            delivered.append(records)
+
+        runner.register_batch_callback(send)
+        asyncio.get_running_loop().call_later(0.12, runner.stop)
+        await runner.run()
+        return runner.reads, delivered
+
+    reads, delivered = asyncio.run(scenario())
+    assert reads >= 3 and len(delivered) == reads
@@ -0,0 +1,24 @@
+import pytest
+
+from server.buffer import ReceiveBuffer
+
+
+def test_receive_buffer_lines_and_view():
+    buffer = ReceiveBuffer(capacity=16)
+    buffer.feed(b"one\ntwo\nthr")
+    assert buffer.pop_lines() == [b"one", b"two"]
+    buffer.feed(b"ee\n" + b"x" * 40)  # bufor rośnie ponad początkową pojemność
+    assert buffer.pop_lines(max_lines=1) == [b"three"]
+
+    view = buffer.view()
+    assert bytes(view) == b"x" * 40
+    view.release()
+    buffer.consume(40)
+    assert len(buffer) == 0
+
+
+def test_receive_buffer_limit():
+    buffer = ReceiveBuffer(capacity=16)
+    buffer.MAX_CAPACITY = 64
+    with pytest.raises(ValueError):
+        buffer.feed(b"x" * 100)
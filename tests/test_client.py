@@ -0,0 +1,140 @@
+import errno
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+
+from network.client import NetworkClient
+from tests.conftest import free_port, readings, wait_until
+
+
+def test_release_acked_is_cumulative():
+    in_flight = OrderedDict((seq, {}) for seq in range(1, 6))
+    assert NetworkClient._release_acked(in_flight, {"status": "ok", "ack": 3, "count": 3}) == 3
+    assert list(in_flight) == [4, 5]
+    assert NetworkClient._release_acked(in_flight, {"status": "ok", "ack": 3}) == 0  # nieaktualny ACK
+    assert NetworkClient._release_acked(in_flight, {"status": "ok"}) == 1  # starszy serwer: ACK na wiadomość
+    assert list(in_flight) == [5]
+
+
+@pytest.mark.parametrize("protocol", ["json", "binary"])
+def test_send_many_pipelined(start_server, protocol):
+    server, received = start_server()
+    client = NetworkClient("127.0.0.1", server.port, window=8, protocol=protocol)
+    assert client.send_many(readings(200)) == 200
+    assert [message["value"] for message in received] == [float(i) for i in range(200)]
+
+
+def test_send_many_resends_unacked_after_reconnect(flaky_server):
+    client = NetworkClient("127.0.0.1", flaky_server.port, timeout=2, retries=3, window=16)
+    assert client.send_many(readings(50)) == 50
+    # Co najmniej raz: wszystkie wiadomości dotarły, numery seq rosną w kolejnych partiach
+    assert {message["value"] for message in flaky_server.received} == {float(i) for i in range(50)}
+    assert flaky_server.connections == 2
+
+
+def stall_sending(client):
+    """Wstrzymuje wysyłkę wątku wysyłającego do wywołania zwróconej funkcji (kolejka się zapełnia)."""
+    release = threading.Event()
+    send_many = client.send_many
+
+    def stalled(items):
+        release.wait(5)
+        return send_many(items)
+
+    client.send_many = stalled
+    return release.set
+
+
+def test_background_sender_drains_queue_on_stop(start_server):
+    server, received = start_server()
+    client = NetworkClient("127.0.0.1", server.port, window=16)
+    client.start_background(queue_size=100, batch_size=32)
+    for item in readings(500):
+        assert client.enqueue(item)
+    client.stop_background()
+
+    assert [message["value"] for message in received] == [float(i) for i in range(500)]
+    assert client._sender_thread is None and client.socket is None
+    with pytest.raises(RuntimeError):
+        client.enqueue(readings(1)[0])
+
+
+def test_overflow_block_waits_for_space(start_server):
+    server, received = start_server()
+    client = NetworkClient("127.0.0.1", server.port)
+    client.start_background(queue_size=2, batch_size=1, overflow="block")
+    release = stall_sending(client)
+    producer = threading.Thread(target=lambda: [client.enqueue(item) for item in readings(10)], daemon=True)
+    producer.start()
+
+    producer.join(0.3)
+    assert producer.is_alive()  # pełna kolejka - enqueue czeka zamiast gubić dane
+    release()
+    producer.join(5)
+    client.stop_background()
+    assert [message["value"] for message in received] == [float(i) for i in range(10)]
+
+
+def test_overflow_drop_oldest_keeps_newest(start_server):
+    server, received = start_server()
+    client = NetworkClient("127.0.0.1", server.port)
+    client.start_background(queue_size=3, batch_size=10, overflow="drop_oldest")
+    release = stall_sending(client)
+    client.enqueue(readings(1)[0])  # odebrana przez wątek wysyłający, czeka w send_many
+    assert wait_until(client._queue.empty)
+    results = [client.enqueue(item) for item in readings(10)[1:]]
+    release()
+    client.stop_background()
+
+    assert results == [True] * 3 + [False] * 6
+    assert client.dropped == 6
+    assert [message["value"] for message in received] == [0.0, 7.0, 8.0, 9.0]
+
+
+def test_overflow_spill_replays_under_steady_load(start_server, tmp_path):
+    server, received = start_server()
+    client = NetworkClient("127.0.0.1", server.port, outbox_dir=str(tmp_path / "outbox"))
+    client.connect()  # połączenie trwa - zaległości nie zostaną odtworzone przy ponownym połączeniu
+    client.start_background(queue_size=2, batch_size=1, overflow="spill")
+    release = stall_sending(client)
+    results = [client.enqueue(item) for item in readings(20)]
+    assert results.count(False) == client.outbox.pending() > 0
+    release()
+
+    # Kolejka w pamięci nigdy nie jest pusta dłużej niż kilka ms, a zaległości z dysku i tak są wysyłane
+    deadline = time.monotonic() + 5
+    value = 100.0
+    while not client.outbox.empty() and time.monotonic() < deadline:
+        client.enqueue(readings(1)[0] | {"value": value})
+        value += 1
+        time.sleep(0.02)
+    assert client.outbox.empty()
+    client.stop_background()
+    assert {message["value"] for message in received} >= {float(i) for i in range(20)}
+
+
+def test_sender_survives_unreachable_network(start_server, tmp_path, monkeypatch):
+    def unreachable(sock, address):
+        raise OSError(errno.ENETUNREACH, "Network is unreachable")
+
+    monkeypatch.setattr(socket.socket, "connect", unreachable)
+    port = free_port()
+    client = NetworkClient("127.0.0.1", port, timeout=1, retries=1, outbox_dir=str(tmp_path / "outbox"))
+    client.REPLAY_BACKOFF = 0.1
+    client.start_background(queue_size=5, batch_size=5, overflow="block")
+    producer = threading.Thread(target=lambda: [client.enqueue(item) for item in readings(20)], daemon=True)
+    producer.start()
+    producer.join(10)
+
+    assert not producer.is_alive()  # enqueue nie zawisa - wątek wysyłający działa dalej
+    assert client._sender_thread.is_alive()
+    assert wait_until(lambda: client.outbox.pending() == 20, timeout=10)
+
+    monkeypatch.undo()  # sieć wraca
+    server, received = start_server(port=port)
+    assert wait_until(client.outbox.empty, timeout=10)
+    client.stop_background()
+    assert sorted(message["value"] for message in received) == [float(i) for i in range(20)]
@@ -0,0 +1,77 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import storage.columnar
+from storage.columnar import ColumnarStore, to_micros
+
+BASE = datetime(2025, 1, 1)
+
+
+def make_rows(count, seed=1):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        timestamp = BASE + timedelta(seconds=i, microseconds=rng.randint(0, 2_000_000))  # lekko nieuporządkowane
+        rows.append([timestamp.isoformat(), f"S{i % 5}", round(rng.uniform(-10, 40), 2), "°C", "", ""])
+    return rows
+
+
+def expected(rows, start, end, sensor_id=None):
+    return sorted((row[0], row[1], row[2]) for row in rows
+                  if start <= datetime.fromisoformat(row[0]) <= end and (sensor_id is None or row[1] == sensor_id))
+
+
+def columns_to_rows(columns):
+    timestamps = columns["timestamp"]
+    if storage.columnar.np is not None:
+        timestamps = [value.item().isoformat() for value in timestamps]
+    else:
+        timestamps = [(storage.columnar.EPOCH + timedelta(microseconds=value)).isoformat() for value in timestamps]
+    return sorted(zip(timestamps, list(columns["sensor_id"]), [float(value) for value in columns["value"]]))
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def columnar(request, tmp_path, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(storage.columnar, "np", None)
+    return ColumnarStore(str(tmp_path / "columnar"), segment_rows=128)
+
+
+@pytest.mark.parametrize("start, end, sensor_id", [
+    (BASE, BASE + timedelta(days=1), None),
+    (BASE + timedelta(seconds=100), BASE + timedelta(seconds=300), None),
+    (BASE + timedelta(seconds=250), BASE + timedelta(seconds=900), "S3"),
+    (BASE - timedelta(days=1), BASE - timedelta(seconds=1), None),
+    (BASE, BASE + timedelta(days=1), "missing"),
+])
+def test_columnar_query_matches_rows(columnar, start, end, sensor_id):
+    rows = make_rows(1000)
+    columnar.write_rows(rows[:900])
+    columnar.flush()
+    columnar.write_rows(rows[900:])  # część wierszy tylko w pamięci
+
+    assert columns_to_rows(columnar.read(start, end, sensor_id)) == expected(rows, start, end, sensor_id)
+
+
+def test_columnar_reopen_and_filters(tmp_path):
+    directory = str(tmp_path / "columnar")
+    store = ColumnarStore(directory, segment_rows=64)
+    rows = make_rows(200)
+    rows.append([BASE.isoformat(), "SYSTEM", 0.0, "LOG", "INFO", "start"])  # komunikat loggera - pomijany
+    rows.append(["bad timestamp", "S1", 1.0, "°C", "", ""])
+    store.write_rows(rows)
+    store.close()
+
+    reopened = ColumnarStore(directory, segment_rows=64)
+    columns = reopened.read(BASE, BASE + timedelta(days=1))
+    assert len(columns["value"]) == 200
+    assert "SYSTEM" not in set(columns["sensor_id"])
+
+
+def test_to_micros_accepts_aware_timestamps():
+    aware = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    assert to_micros(aware) == to_micros(aware.astimezone().replace(tzinfo=None))
@@ -0,0 +1,287 @@
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from Logger import Logger, INDEX_SUFFIX
+from tests.conftest import wait_until
+
+BASE = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def make_logger(tmp_path):
+    """Tworzy Logger z konfiguracją w katalogu tymczasowym (nadpisania jako argumenty)."""
+    loggers = []
+
+    def factory(**overrides):
+        config = {
+            "log_dir": str(tmp_path / "logs"),
+            "filename_pattern": "sensors_%Y%m%d.csv",
+            "buffer_size": 10,
+            "rotate_every_hours": 24,
+            "max_size_mb": 5,
+            "rotate_after_lines": 100000,
+            "retention_days": 30,
+            "index_every_rows": 20,
+            "async_archive": False,
+            "rollups": False,
+        }
+        config.update(overrides)
+        config = {key: value for key, value in config.items() if value is not None}
+        config_path = tmp_path / "config.json"
+        config_path.write_text(json.dumps(config), encoding="utf-8")
+        logger = Logger(str(config_path))
+        loggers.append(logger)
+        return logger
+
+    yield factory
+    for logger in loggers:
+        if logger.current_file is not None:
+            logger.stop()
+
+
+def archive_names(logger, suffix=".zip"):
+    return sorted(name for name in os.listdir(os.path.join(logger.log_dir, "archive")) if name.endswith(suffix))
+
+
+def log_rows(logger, count, sensor_id="S1", first=0):
+    for i in range(first, first + count):
+        logger.log_reading(sensor_id, BASE + timedelta(seconds=i), float(i), "u")
+
+
+def test_rotation_after_line_count(make_logger):
+    logger = make_logger(rotate_after_lines=50)
+    logger.start()
+    log_rows(logger, 120)
+    logger.stop()
+
+    # Rotacja po 50 i 100 zapisanych wierszach (licznik aktualizowany przy zapisie bufora)
+    assert archive_names(logger) == ["sensors_%s(1).zip" % datetime.now().strftime("%Y%m%d"),
+                                     "sensors_%s.zip" % datetime.now().strftime("%Y%m%d")]
+    values = sorted(entry["value"] for entry in logger.read_logs(BASE, BASE + timedelta(days=1)))
+    assert values == [float(i) for i in range(120)]
+
+
+def test_rotation_after_size_uses_tracked_size(make_logger):
+    logger = make_logger(max_size_mb=0.002)  # ok. 2 KB
+    logger.start()
+    log_rows(logger, 30)
+    # Rozmiar śledzony przy zapisie bufora odpowiada rozmiarowi pliku
+    assert logger.current_size == os.path.getsize(logger.current_file_path)
+    log_rows(logger, 170, first=30)
+    logger.stop()
+
+    assert archive_names(logger)
+    values = sorted(entry["value"] for entry in logger.read_logs(BASE, BASE + timedelta(days=1)))
+    assert values == [float(i) for i in range(200)]
+
+
+def test_rotation_after_deadline(make_logger):
+    logger = make_logger(rotate_every_hours=1)
+    logger.start()
+    assert logger._rotate_deadline == pytest.approx(time.monotonic() + 3600, abs=5)
+    log_rows(logger, 5)
+    assert archive_names(logger) == []
+
+    logger._rotate_deadline = time.monotonic() - 1  # termin rotacji minął
+    log_rows(logger, 1, first=5)
+    assert len(archive_names(logger)) == 1
+    assert logger._rotate_deadline > time.monotonic()
+
+
+def test_async_archive_and_retention(make_logger):
+    logger = make_logger(rotate_after_lines=30, async_archive=True, retention_days=7)
+    archive_dir = os.path.join(logger.log_dir, "archive")
+    old_archive = os.path.join(archive_dir, "sensors_20000101.zip")
+    for path in (old_archive, old_archive + INDEX_SUFFIX):
+        with open(path, "wb"):
+            pass
+    old = time.time() - 10 * 86400
+    os.utime(old_archive, (old, old))
+
+    logger.start()
+    log_rows(logger, 70)
+    logger.stop()  # czeka na archiwizację zleconą przy rotacji
+
+    assert not os.path.exists(old_archive) and not os.path.exists(old_archive + INDEX_SUFFIX)
+    assert len(archive_names(logger)) == 2
+    assert archive_names(logger, ".csv") == []  # pliki czekające na spakowanie zostały usunięte
+    assert logger._detached == {}
+    values = sorted(entry["value"] for entry in logger.read_logs(BASE, BASE + timedelta(days=1)))
+    assert values == [float(i) for i in range(70)]
+
+
+def test_concurrent_writer_keeps_all_rows(make_logger):
+    logger = make_logger(concurrent=True, buffer_size=50, rotate_after_lines=700)
+    logger.start()
+    threads, per_thread = 8, 400
+
+    def produce(number):
+        sensor_id = f"T{number}"
+        for i in range(0, per_thread, 2):
+            logger.log_reading(sensor_id, BASE + timedelta(seconds=i), float(i), "u")
+            logger.log_readings([(sensor_id, BASE + timedelta(seconds=i + 1), float(i + 1), "u")])
+
+    workers = [threading.Thread(target=produce, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    logger.stop()  # opróżnia kolejkę wątku zapisującego
+
+    assert archive_names(logger)
+    for n in range(threads):
+        entries = list(logger.read_logs(BASE, BASE + timedelta(days=1), sensor_id=f"T{n}"))
+        assert sorted(entry["value"] for entry in entries) == [float(i) for i in range(per_thread)]
+
+
+def test_concurrent_writer_stop_flushes_queue(make_logger):
+    logger = make_logger(concurrent=True, buffer_size=1000)
+    logger.start()
+    log_rows(logger, 25)
+    logger.stop()
+
+    with open(logger.current_file_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 1 + 25 + 1  # nagłówek, wiersze, znacznik końca sesji
+    assert logger._writer_thread is None
+
+
+def data_rows(logger):
+    with open(logger.current_file_path, encoding="utf-8") as f:
+        return len(f.read().splitlines()) - 1  # bez nagłówka
+
+
+def record_flushes(logger):
+    """Zapisuje nazwy wątków wykonujących _flush."""
+    threads = []
+    flush = logger._flush
+
+    def recorded():
+        threads.append(threading.current_thread().name)
+        flush()
+
+    logger._flush = recorded
+    return threads
+
+
+def test_time_based_flush_without_full_buffer(make_logger):
+    logger = make_logger(buffer_size=1000, flush_interval_ms=100)
+    logger.start()
+    log_rows(logger, 5)
+    assert data_rows(logger) == 0
+
+    started = time.monotonic()
+    assert wait_until(lambda: data_rows(logger) == 5, timeout=2)
+    assert time.monotonic() - started < 1
+    logger.stop()
+
+
+def test_full_buffer_is_written_by_flusher(make_logger):
+    logger = make_logger(buffer_size=10, flush_interval_ms=60000)
+    threads = record_flushes(logger)
+    logger.start()
+    log_rows(logger, 10)
+
+    assert wait_until(lambda: data_rows(logger) == 10, timeout=2)
+    assert threads == ["LogFlusher"]  # producent tylko budzi wątek w tle
+    logger.stop()
+
+
+def test_producer_flushes_when_flusher_falls_behind(make_logger):
+    logger = make_logger(buffer_size=10, flush_interval_ms=60000)
+    threads = record_flushes(logger)
+    logger.start()
+    logger._flusher_wakeup.set = lambda: None  # wątek w tle nie nadąża (nie zostaje obudzony)
+
+    log_rows(logger, 39)
+    assert threads == [] and len(logger.buffer) == 39
+    log_rows(logger, 1, first=39)
+    assert threads == ["MainThread"]  # przy 4 * buffer_size zapisuje sam producent
+    assert data_rows(logger) == 40
+
+    del logger._flusher_wakeup.set
+    logger.stop()
+
+
+def test_fsync_every_flushes_runs_in_background(make_logger, monkeypatch):
+    calls = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: calls.append(threading.current_thread().name) or fsync(fd))
+    logger = make_logger(buffer_size=5, fsync_every_flushes=2)
+    logger.start()
+    for first in range(0, 20, 5):
+        log_rows(logger, 5, first=first)
+        assert wait_until(lambda: not logger.buffer, timeout=2)  # kolejny zapis dopiero po poprzednim
+
+    assert wait_until(lambda: len(calls) == 2, timeout=2)  # co drugi z czterech zapisów
+    assert set(calls) == {"LogFlusher"}
+    logger.stop()
+    assert len(calls) == 3  # oraz przy zamknięciu pliku
+    assert data_rows(logger) == 20 + 1  # wiersze i znacznik końca sesji
+
+
+@pytest.mark.parametrize("start, end, sensor_id", [
+    (BASE, BASE + timedelta(days=1), None),
+    (BASE + timedelta(seconds=150), BASE + timedelta(seconds=420), None),
+    (BASE + timedelta(seconds=100), BASE + timedelta(seconds=700), "S2"),
+    (BASE + timedelta(days=2), BASE + timedelta(days=3), None),
+    (BASE, BASE + timedelta(days=1), "missing"),
+])
+def test_read_logs_with_index_matches_brute_force(make_logger, start, end, sensor_id):
+    logger = make_logger(rotate_after_lines=250)
+    logger.start()
+    rng = random.Random(7)
+    written = []
+    for i in range(800):
+        timestamp = BASE + timedelta(seconds=i + rng.uniform(-30, 30))  # znaczniki czasu nie rosną monotonicznie
+        sensor = f"S{i % 4}"
+        logger.log_reading(sensor, timestamp, float(i), "u")
+        written.append((timestamp, sensor, float(i)))
+    logger.stop()
+
+    assert archive_names(logger)  # część danych w archiwach
+    expected = sorted(value for timestamp, sensor, value in written
+                      if start <= timestamp <= end and sensor_id in (None, sensor))
+    entries = list(logger.read_logs(start, end, sensor_id))
+    assert sorted(entry["value"] for entry in entries) == expected
+    assert os.path.exists(logger.current_file_path + INDEX_SUFFIX)
+
+
+def test_read_logs_parallel_builds_missing_index(make_logger):
+    logger = make_logger()
+    logger.start()
+    log_rows(logger, 60)
+    logger.stop()
+    index_path = logger.current_file_path + INDEX_SUFFIX
+    if os.path.exists(index_path):
+        os.remove(index_path)
+
+    entries = list(logger.read_logs_parallel(BASE + timedelta(seconds=10), BASE + timedelta(seconds=19), workers=1))
+    assert [entry["value"] for entry in entries] == [float(i) for i in range(10, 20)]
+    assert os.path.exists(index_path)  # zbudowany jak w read_logs (_get_index)
+
+
+def test_rollups_disabled_by_default(make_logger):
+    logger = make_logger(rollups=None)  # brak klucza - wartość domyślna
+    assert logger.rollups is None
+
+
+def test_rollups_persisted_by_flusher(make_logger):
+    logger = make_logger(rollups=True, flush_interval_ms=100)
+    logger.start()
+    log_rows(logger, 30)
+    partition = os.path.join(logger.log_dir, "rollups", "1min", "2025-01-01.json")
+    deadline = time.monotonic() + 5
+    while not os.path.exists(partition) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert os.path.exists(partition)  # bez rotacji i stop()
+    with open(partition, encoding="utf-8") as f:
+        stored = json.load(f)
+    assert sum(stats[0] for stats in stored["S1"].values()) == 30
+    logger.stop()
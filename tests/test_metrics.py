@@ -0,0 +1,103 @@
+import json
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+import server.metrics
+from server.metrics import ServerMetrics
+from tests.conftest import free_port, reading, read_lines, send_lines, wait_until
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(server.metrics.time, "monotonic", clock)
+    return clock
+
+
+def test_counters_and_rates(clock):
+    metrics = ServerMetrics()
+    metrics.record_messages([reading(), reading(), {"value": 1}, "not a dict"], parse_errors=1)
+    metrics.record_io(400, latency=0.0003)
+    metrics.record_io(100)
+    metrics.connection_opened()
+    clock.now += 2
+
+    snapshot = metrics.snapshot()
+    assert (snapshot["messages"], snapshot["bytes"], snapshot["parse_errors"], snapshot["connections"]) == (4, 500, 1, 1)
+    assert snapshot["messages_per_s"] == 2.0
+    assert snapshot["bytes_per_s"] == 250.0
+    assert snapshot["sensor_rates"] == {"S1": 1.0, "unknown": 0.5}
+
+    # Tempo liczone od poprzedniej migawki
+    metrics.record_messages([reading()] * 10)
+    clock.now += 5
+    snapshot = metrics.snapshot()
+    assert snapshot["messages_per_s"] == 2.0
+    assert snapshot["sensor_rates"]["S1"] == 2.0
+    assert snapshot["bytes_per_s"] == 0.0
+
+
+def test_latency_histogram(clock):
+    metrics = ServerMetrics()
+    for latency_ms in (0.05, 0.1, 0.3, 7, 5000):
+        metrics.record_io(10, latency=latency_ms / 1000)
+
+    snapshot = metrics.snapshot()
+    histogram = snapshot["ack_latency_ms"]
+    assert histogram["le_0.1"] == 2  # granice przedziałów włącznie
+    assert histogram["le_0.5"] == 1
+    assert histogram["le_10"] == 1
+    assert histogram["inf"] == 1
+    assert sum(histogram.values()) == snapshot["acks"] == 5
+    assert snapshot["ack_latency_avg_ms"] == pytest.approx((0.05 + 0.1 + 0.3 + 7 + 5000) / 5, abs=1e-3)
+
+
+def test_render_text(clock):
+    metrics = ServerMetrics()
+    metrics.sources["pipeline"] = lambda: {"queued": 3}
+    metrics.record_messages([reading()])
+    lines = metrics.render_text().splitlines()
+
+    assert "server_messages 1" in lines
+    assert 'server_ack_latency_ms{key="inf"} 0' in lines
+    assert 'server_pipeline{key="queued"} 3' in lines
+
+
+def fetch(port, path):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+        return response.headers["Content-Type"], response.read().decode()
+
+
+def test_metrics_endpoint(start_server):
+    metrics_port = free_port()
+    server, received = start_server(metrics_port=metrics_port)
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        send_lines(sock, [reading(seq) for seq in range(1, 6)])
+        acks = []
+        while not acks or acks[-1]["ack"] < 5:
+            acks += read_lines(sock, 1)
+        assert wait_until(lambda: server.metrics.snapshot()["acks"] == len(acks))
+
+        content_type, body = fetch(metrics_port, "/metrics.json")
+        assert content_type == "application/json"
+        snapshot = json.loads(body)
+        assert snapshot["messages"] == 5
+        assert snapshot["connections"] == 1
+        assert snapshot["bytes"] > 0
+
+    content_type, body = fetch(metrics_port, "/metrics")
+    assert content_type.startswith("text/plain")
+    assert "server_messages 5" in body.splitlines()
+    with pytest.raises(urllib.error.HTTPError):
+        fetch(metrics_port, "/other")
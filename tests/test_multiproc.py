@@ -0,0 +1,88 @@
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+from server.metrics import ServerMetrics
+from server.multiproc import MultiProcessServer
+from tests.conftest import free_port, reading, read_lines, send_lines, wait_until
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="SO_REUSEPORT tylko na Linuksie")
+
+
+def counters(bytes_, connections, histogram, latency_sum_ms=0.0, parse_errors=0):
+    return {"bytes": bytes_, "parse_errors": parse_errors, "connections": connections,
+            "latency_histogram": histogram, "latency_sum_ms": latency_sum_ms}
+
+
+def test_add_counters_sums_increments_per_worker():
+    metrics = ServerMetrics()
+    size = len(metrics.latency_histogram)
+    first = counters(100, 2, [1] + [0] * (size - 1), 0.5)
+    other = counters(40, 1, [0, 2] + [0] * (size - 2), 1.0, parse_errors=1)
+    metrics.add_counters(first)
+    metrics.add_counters(other)
+    # Kolejny raport pierwszego procesu - doliczany jest tylko przyrost
+    metrics.add_counters(counters(150, 1, [3] + [0] * (size - 1), 0.75), first)
+
+    assert (metrics.bytes, metrics.connections, metrics.parse_errors) == (190, 2, 1)
+    assert metrics.latency_histogram[:2] == [3, 2]
+    assert metrics.latency_sum_ms == pytest.approx(1.75)
+
+
+@pytest.fixture
+def multiproc_server():
+    servers = []
+
+    def factory(**options):
+        server = MultiProcessServer(port=free_port(), config_path="nonexistent.yaml", **options)
+        received = []
+        server.on_data_received = received.append
+        thread = threading.Thread(target=server.start, daemon=True)
+        thread.start()
+        assert wait_until(lambda: server.running, timeout=10)
+        servers.append((server, thread))
+        return server, received
+
+    yield factory
+    for server, thread in servers:
+        server.stop()
+        thread.join(10)
+
+
+@linux_only
+@pytest.mark.parametrize("mode", ["threaded", "asyncio"])
+def test_two_workers_deliver_each_reading_once(multiproc_server, mode):
+    server, received = multiproc_server(workers=2, mode=mode)
+    connections, per_connection = 16, 10
+    for number in range(connections):
+        with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+            items = [reading(seq, value=float(number * per_connection + seq)) for seq in range(per_connection)]
+            send_lines(sock, items)
+            acks = []
+            while not acks or acks[-1]["ack"] < per_connection - 1:
+                acks += read_lines(sock, 1)
+
+    total = connections * per_connection
+    assert wait_until(lambda: len(received) >= total)
+    time.sleep(0.2)
+    assert sorted(message["value"] for message in received) == [float(i) for i in range(total)]
+
+    # Liczniki procesów roboczych trafiają do metryk procesu nadrzędnego (raport co METRICS_INTERVAL)
+    assert wait_until(lambda: sum(server._worker_stat("bytes").values()) == server.metrics.bytes > 0)
+    snapshot = server.metrics.snapshot()
+    assert snapshot["messages"] == total
+    assert snapshot["worker_alive"] == {0: 1, 1: 1}
+
+
+@linux_only
+def test_start_fails_fast_when_workers_cannot_bind():
+    with socket.create_server(("0.0.0.0", 0)) as blocker:  # bez SO_REUSEPORT - procesy robocze nie otworzą portu
+        server = MultiProcessServer(port=blocker.getsockname()[1], config_path="nonexistent.yaml", workers=2)
+        started = time.monotonic()
+        with pytest.raises(RuntimeError, match="zakończyły się przy starcie"):
+            server.start()
+        assert time.monotonic() - started < 5
+        assert server._processes == []
@@ -0,0 +1,37 @@
+from network.client import NetworkClient
+from network.outbox import Outbox
+from tests.conftest import free_port, readings
+
+
+def test_outbox_persists_and_replays_after_reopen(tmp_path):
+    outbox = Outbox(str(tmp_path), segment_bytes=256)
+    for item in readings(10):
+        outbox.append([item])  # kilka segmentów po ok. 256 B
+    items, positions = outbox.read(4)
+    assert [item["value"] for item in items] == [0.0, 1.0, 2.0, 3.0]
+    outbox.commit(positions[-1])
+    assert outbox.pending() == 6
+    outbox.close()
+
+    reopened = Outbox(str(tmp_path), segment_bytes=256)
+    assert reopened.pending() == 6
+    items, positions = reopened.read(100)
+    assert [item["value"] for item in items] == [float(i) for i in range(4, 10)]
+    reopened.commit(positions[-1])
+    assert reopened.empty()
+    # W pełni wysłane segmenty są usuwane
+    assert not (tmp_path / "00000001.seg").exists()
+    reopened.close()
+
+
+def test_client_outbox_replays_after_server_returns(start_server, tmp_path):
+    port = free_port()
+    client = NetworkClient("127.0.0.1", port, timeout=1, retries=1, outbox_dir=str(tmp_path / "outbox"))
+    assert not client.send(readings(1)[0])
+    assert client.outbox.pending() == 1
+
+    server, received = start_server(port=port)
+    client.connect()  # po połączeniu najpierw odtwarzana jest kolejka trwała
+    client.close()
+    assert [message["value"] for message in received] == [0.0]
+    assert client.outbox.empty()
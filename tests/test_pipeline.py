@@ -0,0 +1,34 @@
+import socket
+import time
+
+import pytest
+
+from server.pipeline import IngestPipeline
+from tests.conftest import reading, read_lines, send_lines
+
+
+def test_pipeline_ack_after_processing(start_server):
+    server, received = start_server(consumer_workers=2, ack_mode="after")
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        send_lines(sock, [reading(seq) for seq in range(1, 4)])
+        acks = read_lines(sock, 1)
+        # ACK dopiero po przetworzeniu - dane są już przekazane dalej
+        assert acks[0]["status"] == "ok"
+        assert len(received) >= acks[0]["count"]
+
+
+def test_pipeline_timeout_closes_connection(start_server):
+    server, received = start_server(consumer_workers=1, ack_mode="after")
+    server.ack_timeout = 0.2
+    server.on_data_received = lambda message: time.sleep(1)
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        send_lines(sock, [reading(seq=1)])
+        assert sock.recv(100) == b""  # bez ACK - połączenie zamknięte
+
+
+def test_pipeline_rejects_submit_after_stop():
+    pipeline = IngestPipeline(lambda messages: None, workers=1)
+    pipeline.start()
+    pipeline.stop()
+    with pytest.raises(RuntimeError):
+        pipeline.submit([reading()])
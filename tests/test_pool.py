@@ -0,0 +1,40 @@
+from network.pool import ClientPool
+from tests.conftest import free_port, readings, wait_until
+
+
+def test_pool_ejects_dead_endpoint_until_probe_succeeds(start_server):
+    live, live_received = start_server()
+    dead_port = free_port()
+    pool = ClientPool([("127.0.0.1", live.port), ("127.0.0.1", dead_port)], pool_size=1, timeout=1,
+                      strategy="round_robin", eject_after=1, eject_seconds=0.1, health_interval=0.05)
+    try:
+        for _ in range(4):
+            assert pool.send_many(readings(10)) == 10  # niepotwierdzone trafia do innego serwera
+        assert len(live_received) == 40
+        dead = pool.endpoints[1]
+        assert not dead.healthy()
+
+        # Po upływie czasu wyłączenia serwer nadal jest wyłączony - sprawdzenia się nie udają
+        assert not wait_until(dead.healthy, timeout=0.5)
+        assert pool.stats()[1]["ejections"] >= 1
+
+        server, dead_received = start_server(port=dead_port)
+        assert wait_until(dead.healthy)
+        assert dead.ejections == 0  # przywrócenie zeruje wydłużanie czasu wyłączenia
+        assert pool.send_many(readings(10)) == 10
+    finally:
+        pool.close()
+
+
+def test_pool_without_health_thread_probes_with_a_send(start_server):
+    live, _ = start_server()
+    dead_port = free_port()
+    pool = ClientPool([("127.0.0.1", live.port), ("127.0.0.1", dead_port)], pool_size=1, timeout=1,
+                      strategy="round_robin", eject_after=1, eject_seconds=0.1, health_interval=0)
+    try:
+        while pool.endpoints[1].healthy():
+            assert pool.send_many(readings(5)) == 5
+        start_server(port=dead_port)
+        assert wait_until(lambda: pool.send_many(readings(5)) == 5 and pool.endpoints[1].healthy())
+    finally:
+        pool.close()
@@ -0,0 +1,83 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from network.protocol import (HELLO, FRAME_ACK, BinaryDecoder, BinaryEncoder, encode_ack, is_hello,
+                              parse_hello_reply, read_frame)
+
+
+def readings(count, sensors=3):
+    return [{
+        "sensor_id": f"S{i % sensors}",
+        "timestamp": datetime(2025, 1, 1, 12, 0, i % 60, 1000 * i).isoformat(),
+        "value": i * 0.5,
+        "unit": "°C",
+    } for i in range(count)]
+
+
+def test_binary_round_trip():
+    items = readings(100)
+    encoder, decoder = BinaryEncoder(), BinaryDecoder()
+
+    messages, last_seq, errors = decoder.feed(encoder.encode(100, items))
+
+    assert (messages, last_seq, errors) == (items, 100, 0)
+
+
+def test_binary_dictionary_is_kept_per_connection():
+    encoder, decoder = BinaryEncoder(), BinaryDecoder()
+    first = encoder.encode(3, readings(3))
+    second = encoder.encode(6, readings(3))  # bez ramek DEFINE - słownik już przesłany
+
+    assert len(second) < len(first)
+    decoder.feed(first)
+    assert decoder.feed(second) == (readings(3), 6, 0)
+
+
+def test_binary_falls_back_to_json_frames_in_order():
+    items = readings(2)
+    items.insert(1, {"sensor_id": "X", "timestamp": "2025-01-01T12:00:00", "value": 1, "unit": "x", "extra": True})
+    items.append({"status": "not a reading"})
+
+    messages, last_seq, errors = BinaryDecoder().feed(BinaryEncoder().encode(4, items))
+
+    assert messages == items
+    assert (last_seq, errors) == (4, 0)
+
+
+def test_binary_partial_frames():
+    data = BinaryEncoder().encode(10, readings(10))
+    decoder = BinaryDecoder()
+    messages = []
+    for i in range(len(data)):  # po jednym bajcie - ramki składane z fragmentów
+        decoded, _, errors = decoder.feed(data[i:i + 1])
+        assert errors == 0
+        messages += decoded
+    assert messages == readings(10)
+
+
+def test_decode_from_view_reports_consumed_bytes():
+    data = BinaryEncoder().encode(5, readings(5))
+    buffer = bytearray(data + data[:7])  # cała partia i początek kolejnej ramki
+
+    with memoryview(buffer) as view:
+        messages, last_seq, errors, consumed = BinaryDecoder().decode(view)
+
+    assert (len(messages), last_seq, errors, consumed) == (5, 5, 0, len(data))
+
+
+def test_ack_frame():
+    frame, rest = read_frame(encode_ack(42, 7) + b"rest")
+    assert frame[0] == FRAME_ACK
+    assert rest == b"rest"
+
+
+def test_hello_negotiation():
+    assert is_hello(HELLO.strip())
+    assert parse_hello_reply(json.dumps({"status": "ok", "protocol": "binary"}).encode())
+    assert not parse_hello_reply(b"ERROR")
+    assert not parse_hello_reply(json.dumps({"status": "ok"}).encode())
+    # Starszy serwer odrzuca HELLO jako niepoprawny JSON zamiast przyjąć go jako odczyt
+    with pytest.raises(ValueError):
+        json.loads(HELLO)
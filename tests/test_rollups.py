@@ -0,0 +1,23 @@
+import random
+from datetime import datetime, timedelta
+
+from storage.rollups import RollupStore
+
+BASE = datetime(2025, 1, 1)
+
+
+def test_rollups_aggregate_and_persist(tmp_path):
+    store = RollupStore(str(tmp_path / "rollups"))
+    rng = random.Random(1)
+    rows = [[(BASE + timedelta(seconds=i * 7)).isoformat(), f"S{i % 3}", round(rng.uniform(-10, 40), 2), "°C", "", ""]
+            for i in range(600)]
+    store.write_rows(rows)
+    pending = store.read(BASE, BASE + timedelta(days=1), "S1", resolution="1h")
+    store.flush()
+    persisted = RollupStore(str(tmp_path / "rollups")).read(BASE, BASE + timedelta(days=1), "S1", resolution="1h")
+
+    values = [row[2] for row in rows if row[1] == "S1"]
+    assert pending == persisted
+    assert sum(bucket["count"] for bucket in persisted) == len(values)
+    assert min(bucket["min"] for bucket in persisted) == min(values)
+    assert max(bucket["max"] for bucket in persisted) == max(values)
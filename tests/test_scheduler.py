@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from Sensors.Sensor import Sensor
+from Sensors.SensorScheduler import SensorScheduler, _Entry
+
+
+class FakeSensor(Sensor):
+    """Czujnik testowy: stała wartość i opcjonalnie wolny odczyt."""
+
+    def __init__(self, sensor_id, frequency=0.05, delay=0.0):
+        super().__init__(sensor_id, sensor_id, "u", 0, 1, frequency)
+        self.delay = delay
+        self.reads = 0
+
+    def read_value(self, timestamp=None):
+        if self.delay:
+            time.sleep(self.delay)
+        self.reads += 1
+        return 1.0
+
+
+def collect(scheduler):
+    batches = []
+    lock = threading.Lock()
+
+    def callback(records):
+        with lock:
+            batches.append(list(records))
+
+    scheduler.register_batch_callback(callback)
+    return batches
+
+
+def test_reads_follow_deadlines():
+    scheduler = SensorScheduler()
+    fast, slow = FakeSensor("A", 0.05), FakeSensor("B", 0.1)
+    scheduler.add(fast)
+    scheduler.add(slow)
+    scheduler.run(1.0)
+
+    # Terminy bezwzględne - bez dryfu liczba odczytów zgadza się z okresem
+    assert 17 <= fast.reads <= 22
+    assert 8 <= slow.reads <= 11
+    stats = scheduler.stats()
+    assert stats["A"]["reads"] == fast.reads
+    assert stats["A"]["skipped"] == 0
+    assert stats["A"]["late_mean_ms"] < 20
+
+
+def test_same_period_sensors_share_batch_and_timestamp():
+    scheduler = SensorScheduler()
+    batches = collect(scheduler)
+    sensors = [FakeSensor(f"S{i}") for i in range(3)]
+    for sensor in sensors:
+        scheduler.add(sensor)
+    scheduler.run(0.3)
+
+    assert batches
+    for batch in batches:
+        assert sorted(record[0] for record in batch) == ["S0", "S1", "S2"]
+        assert len({record[1] for record in batch}) == 1
+
+
+def test_skip_policy_drops_overdue_ticks():
+    scheduler = SensorScheduler(policy="skip")
+    sensor = FakeSensor("A", 0.05, delay=0.2)
+    scheduler.add(sensor)
+    scheduler.run(1.0)
+
+    stats = scheduler.stats()["A"]
+    assert sensor.reads <= 6
+    assert stats["skipped"] >= 10
+
+
+def test_slow_sensor_in_pool_does_not_delay_others():
+    scheduler = SensorScheduler(workers=1)
+    batches = collect(scheduler)
+    fast, slow = FakeSensor("fast", 0.05), FakeSensor("slow", 0.05, delay=0.3)
+    scheduler.add(fast)
+    scheduler.add(slow, slow=True)
+    scheduler.run(1.0)
+
+    stats = scheduler.stats()
+    assert fast.reads >= 17
+    assert stats["fast"]["late_max_ms"] < 100
+    assert stats["slow"]["skipped"] > 0  # takty w trakcie trwającego odczytu pominięte
+    assert any(record[0] == "slow" for batch in batches for record in batch)
+
+
+@pytest.mark.parametrize("policy, keep", [("skip", 1), ("catch_up", 3)])
+def test_reschedule_policy(policy, keep):
+    scheduler = SensorScheduler(policy=policy, max_catch_up=3)
+    entry = _Entry(FakeSensor("A"), 1.0, origin=0.0, order=0, slow=False)
+    scheduler._reschedule(entry, now=10.5)  # minęły terminy 1..10
+
+    assert entry.skipped == 10 - keep
+    assert entry.deadline == 10 - keep + 1
+
+
+def test_add_validates_arguments():
+    scheduler = SensorScheduler()
+    with pytest.raises(ValueError):
+        scheduler.add(FakeSensor("A"), frequency=0)
+    with pytest.raises(ValueError):
+        scheduler.add(FakeSensor("B"), slow=True)
+    with pytest.raises(ValueError):
+        SensorScheduler(policy="unknown")
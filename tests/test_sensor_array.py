@@ -0,0 +1,71 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Sensors.SensorArray import (AIR_QUALITY_BOUNDS, HUMIDITY_BOUNDS, LIGHT_BOUNDS, TEMPERATURE_BOUNDS,
+                                 SensorArray)
+
+
+@pytest.mark.parametrize("time_of_day", ["day", "night"])
+def test_values_stay_within_bounds(time_of_day):
+    array = SensorArray(500, time_of_day=time_of_day, seed=1)
+    for _ in range(200):
+        array.step()
+        assert TEMPERATURE_BOUNDS[time_of_day][0] <= array.temperature.min()
+        assert array.temperature.max() <= TEMPERATURE_BOUNDS[time_of_day][1]
+        assert LIGHT_BOUNDS[time_of_day][0] <= array.light.min() <= array.light.max() <= LIGHT_BOUNDS[time_of_day][1]
+        assert HUMIDITY_BOUNDS[0] <= array.humidity.min() <= array.humidity.max() <= HUMIDITY_BOUNDS[1]
+        assert AIR_QUALITY_BOUNDS[0] <= array.air_quality.min()
+        assert array.air_quality.max() <= AIR_QUALITY_BOUNDS[1]
+    # Temperatura przy granicy jest przycinana, a nie odbijana - część stacji stoi na granicy
+    assert np.isin(array.temperature, TEMPERATURE_BOUNDS[time_of_day]).any()
+
+
+def test_humidity_moves_against_temperature():
+    array = SensorArray(1000, seed=2)
+    half = array.count // 2
+    # Pierwsza połowa: spadek temperatury o ok. 10 stopni, druga: wzrost
+    array.last_temperature[:half] = array.temperature[:half] + 10
+    array.last_temperature[half:] = array.temperature[half:] - 10
+    before = array.humidity.copy()
+    array.step()
+
+    change = array.humidity - before
+    assert change[:half].min() >= 0.5 - 0.01 and change[:half].max() <= 2 + 0.01
+    assert change[half:].min() >= -2 - 0.01 and change[half:].max() <= -0.5 + 0.01
+    assert np.array_equal(array.last_temperature, array.temperature)
+
+
+def test_air_quality_shocks_are_at_least_20():
+    array = SensorArray(2000, seed=3)
+    shocks = 0
+    for _ in range(20):
+        before = array.air_quality.copy()
+        array.step()
+        change = np.abs(array.air_quality - before)
+        at_bound = np.isin(array.air_quality, AIR_QUALITY_BOUNDS)
+        jumps = change > 10 + 0.01
+        # Zwykła zmiana to najwyżej ±10, skok - co najmniej ±20 (chyba że przycięty do granicy)
+        assert not (jumps & (change < 20 - 0.01) & ~at_bound).any()
+        assert np.count_nonzero(jumps) <= array.last_shocks
+        shocks += array.last_shocks
+    assert shocks == pytest.approx(20 * 2000 * 0.05, rel=0.1)
+
+
+def test_seed_makes_simulation_repeatable():
+    first, second = SensorArray(100, seed=4), SensorArray(100, seed=4)
+    for _ in range(5):
+        assert np.array_equal(first.step(), second.step())
+
+
+def test_read_batch_shares_timestamp():
+    array = SensorArray(3, seed=5)
+    batches = []
+    array.register_batch_callback(batches.append)
+    records = array.read_batch()
+
+    assert batches == [records]
+    assert len(records) == len(array) == 12
+    assert len({record[1] for record in records}) == 1
+    assert [record[0] for record in records[:4]] == ["T00000", "T00001", "T00002", "H00000"]
+    assert [record[2] for record in records] == array.values.tolist()
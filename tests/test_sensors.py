@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pytest
+
+from Sensors.AirQualitySensor import AirQualitySensor
+from Sensors.HumiditySensor import HumiditySensor
+from Sensors.LightSensor import LightSensor
+from Sensors.Sensor import Sensor
+from Sensors.SensorGroup import SensorGroup
+from Sensors.TemperatureSensor import TemperatureSensor
+from network.client import NetworkClient
+
+TIMESTAMP = datetime(2025, 1, 1, 12, 0, 0, 123456)
+
+
+def make_sensors():
+    temperature = TemperatureSensor("T1", time_of_day="day")
+    return [
+        temperature,
+        HumiditySensor("H1", temperature),
+        LightSensor("L1", time_of_day="night"),
+        AirQualitySensor("AQ1"),
+        Sensor("X1", "Generic", "u", 0, 1),
+    ]
+
+
+class Recorder:
+    """Zbiera wywołania callbacków pojedynczych odczytów i partii."""
+
+    def __init__(self):
+        self.readings = []
+        self.batches = []
+
+    def reading(self, sensor_id, timestamp, value, unit):
+        self.readings.append((sensor_id, timestamp, value, unit))
+
+    def batch(self, records):
+        self.batches.append(list(records))
+
+
+@pytest.mark.parametrize("index", range(5))
+def test_sensor_passes_one_timestamp_to_both_callbacks(index):
+    sensor = make_sensors()[index]
+    recorder = Recorder()
+    sensor.register_callback(recorder.reading)
+    sensor.register_batch_callback(recorder.batch)
+
+    value = sensor.read_value()
+    sensor.read_value(TIMESTAMP)
+
+    first = recorder.readings[0]
+    assert first == (sensor.sensor_id, first[1], value, sensor.unit)
+    assert recorder.batches[0] == [first]  # ten sam znacznik czasu w obu callbackach
+    assert recorder.readings[1][1] is TIMESTAMP
+    assert recorder.batches[1][0][1] is TIMESTAMP
+
+
+def test_sensor_group_reads_with_a_shared_timestamp():
+    sensors = make_sensors()
+    sensors[2].active = False
+    group = SensorGroup(sensors)
+    recorder = Recorder()
+    group.register_batch_callback(recorder.batch)
+    for sensor in sensors:
+        sensor.register_callback(recorder.reading)
+
+    records = group.read_all()
+
+    assert recorder.batches == [records]  # jedna partia z grupy
+    assert [record[0] for record in records] == ["T1", "H1", "AQ1", "X1"]  # wyłączony pominięty
+    assert len({record[1] for record in records}) == 1
+    assert {reading[1] for reading in recorder.readings} == {records[0][1]}
+    assert group.read_all(TIMESTAMP)[0][1] is TIMESTAMP
+
+
+def test_send_readings_sends_the_batch(start_server):
+    server, received = start_server()
+    client = NetworkClient("127.0.0.1", server.port)
+    records = [("T1", TIMESTAMP, 21.5, "°C"), ("H1", TIMESTAMP, 40.0, "%")]
+
+    assert client.send_readings(records) == 2
+    assert received == [
+        {"sensor_id": "T1", "timestamp": TIMESTAMP.isoformat(), "value": 21.5, "unit": "°C"},
+        {"sensor_id": "H1", "timestamp": TIMESTAMP.isoformat(), "value": 40.0, "unit": "%"},
+    ]
+
+
+def test_send_readings_enqueues_with_background_sender(start_server):
+    server, received = start_server()
+    client = NetworkClient("127.0.0.1", server.port)
+    client.start_background()
+    group = SensorGroup(make_sensors())
+    group.register_batch_callback(client.send_readings)
+    batches = [group.read_all() for _ in range(3)]
+    client.stop_background()
+
+    assert [message["value"] for message in received] == [record[2] for batch in batches for record in batch]
+    assert {message["timestamp"] for message in received} == {batch[0][1].isoformat() for batch in batches}
@@ -0,0 +1,136 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+import yaml
+
+from network.protocol import HELLO, FRAME_ACK, ACK, BinaryEncoder, read_frame
+from server.async_server import AsyncNetworkServer
+from server.buffer import ReceiveBuffer
+from server.server import NetworkServer
+from tests.conftest import free_port, reading, read_lines, send_lines, wait_until
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_cli(args, cwd):
+    """Uruchamia serwer z wiersza poleceń i zwraca pierwszą linię wyjścia (po jej wypisaniu proces jest kończony)."""
+    process = subprocess.Popen([sys.executable, "-u", *args], cwd=cwd, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True)
+    try:
+        return process.stdout.readline()
+    finally:
+        process.kill()
+        process.wait()
+        process.stdout.close()
+
+
+@pytest.fixture(params=["threaded", "asyncio"])
+def server_kwargs(request):
+    return {} if request.param == "threaded" else {"server_class": AsyncNetworkServer}
+
+
+def test_messages_without_seq_get_separate_acks(start_server, server_kwargs):
+    server, received = start_server(**server_kwargs)
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        send_lines(sock, [reading(value=1.0)])
+        assert read_lines(sock, 1) == [{"status": "ok"}]
+    assert received == [reading(value=1.0)]
+
+
+def test_many_concurrent_connections(start_server, server_kwargs):
+    server, received = start_server(backlog=64, **server_kwargs)
+    clients = 32
+
+    def client(number):
+        with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+            send_lines(sock, [reading(value=float(number))])
+            assert read_lines(sock, 1) == [{"status": "ok"}]
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(message["value"] for message in received) == [float(n) for n in range(clients)]
+
+
+def test_cumulative_ack_for_pipelined_batch(start_server, server_kwargs):
+    server, received = start_server(**server_kwargs)
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        send_lines(sock, [reading(seq, value=float(seq)) for seq in range(1, 6)])
+        acks = []
+        while not acks or acks[-1]["ack"] < 5:
+            acks += read_lines(sock, 1)
+
+    # Jedno skumulowane potwierdzenie na odczyt z gniazda - łącznie wszystkie wiadomości
+    assert acks[-1]["ack"] == 5
+    assert sum(ack["count"] for ack in acks) == 5
+    assert [message["value"] for message in received] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_invalid_line_gets_error_and_processing_continues(start_server, server_kwargs):
+    server, received = start_server(**server_kwargs)
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        sock.sendall(b"not json\n")
+        assert read_lines(sock, 1) == [b"ERROR"]
+        send_lines(sock, [reading(seq=1)])
+        assert read_lines(sock, 1)[0]["ack"] == 1
+    assert len(received) == 1
+
+
+def test_binary_protocol_negotiation(start_server, server_kwargs):
+    server, received = start_server(**server_kwargs)
+    items = [reading(value=float(i)) for i in range(20)]
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        sock.sendall(HELLO)
+        assert read_lines(sock, 1) == [{"status": "ok", "protocol": "binary"}]
+        sock.sendall(BinaryEncoder().encode(20, items))
+        data = b""
+        frame = None
+        while frame is None:
+            data += sock.recv(4096)
+            frame, data = read_frame(data)
+    assert frame[0] == FRAME_ACK
+    assert ACK.unpack(frame[1]) == (20, 20)
+    assert [message["value"] for message in received] == [float(i) for i in range(20)]
+
+
+def test_async_server_drops_oversized_message(start_server, monkeypatch):
+    monkeypatch.setattr(ReceiveBuffer, "MAX_CAPACITY", 128 * 1024)
+    server, received = start_server(server_class=AsyncNetworkServer)
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        try:
+            for _ in range(64):
+                sock.sendall(b"x" * 65536)  # bez końca linii
+            closed = sock.recv(4096) == b""
+        except OSError:
+            closed = True
+    assert closed
+    assert wait_until(lambda: server.metrics.connections == 0)
+
+
+def test_server_runs_as_script_from_its_directory():
+    port = free_port()
+    line = run_cli(["server.py", "--port", str(port)], cwd=os.path.join(ROOT, "server"))
+    assert f"nasłuchuje na 0.0.0.0:{port}" in line
+
+
+@pytest.mark.parametrize("args, cwd", [
+    (["-m", "server.server", "--mode", "asyncio"], ROOT),
+    (["server.py", "--mode", "asyncio"], os.path.join(ROOT, "server")),
+])
+def test_asyncio_cli(args, cwd):
+    port = free_port()
+    line = run_cli(args + ["--port", str(port)], cwd=cwd)
+    assert f"(asyncio) nasłuchuje na 0.0.0.0:{port}" in line
+
+
+def test_default_config_does_not_depend_on_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open(os.path.join(ROOT, "config.yaml"), encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    assert NetworkServer().port == config["server"]["port"]
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from gui.windowed import WindowedAverage
+
+
+def test_empty_window_has_no_average():
+    assert WindowedAverage(60).average(1000.0) is None
+
+
+def test_average_matches_brute_force():
+    window = WindowedAverage(60, buckets=60)
+    rng = random.Random(3)
+    readings = []
+    now = 10_000.0
+    for _ in range(2000):
+        now += rng.uniform(0, 0.5)
+        value = rng.uniform(-20, 40)
+        window.add(now, value)
+        readings.append((now, value))
+        # Granica okna dokładna z rozdzielczością jednego przedziału (1 s)
+        inside = [v for t, v in readings if int(t) > int(now) - 60]
+        assert window.average(now) == pytest.approx(sum(inside) / len(inside))
+
+
+def test_old_readings_expire():
+    window = WindowedAverage(10, buckets=10)
+    window.add(100.0, 1.0)
+    window.add(105.0, 3.0)
+    assert window.average(105.0) == pytest.approx(2.0)
+    assert window.average(110.5) == pytest.approx(3.0)
+    assert window.average(200.0) is None
+    window.add(200.0, 5.0)
+    assert window.average(200.0) == pytest.approx(5.0)
+
+
+def test_readings_older_than_window_are_ignored():
+    window = WindowedAverage(10, buckets=10)
+    window.add(100.0, 1.0)
+    window.add(50.0, 100.0)
+    assert window.average(100.0) == pytest.approx(1.0)
+    assert window.count == 1